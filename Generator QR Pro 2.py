@@ -1,22 +1,33 @@
+import os
 import sys
-import subprocess
-import importlib.util
-import urllib.parse
+import queue
+from concurrent.futures import ThreadPoolExecutor
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, colorchooser
-import qrcode
-from PIL import Image, ImageTk
-from qrcode.image.styledpil import StyledPilImage
-from qrcode.image.styles.moduledrawers import (
-    SquareModuleDrawer, 
-    GappedSquareModuleDrawer,
-    CircleModuleDrawer,
-    RoundedModuleDrawer,
-    VerticalBarsDrawer,
-    HorizontalBarsDrawer
-)
+import qr_engine
+import qr_timing
+
+PREVIEW_DELAY_MS = 300  # Opóźnienie podglądu na żywo po ostatniej zmianie
+CAPACITY_DELAY_MS = 150  # Opóźnienie licznika pojemności po ostatnim klawiszu
+RESULT_POLL_MS = 50     # Jak często wątek Tk odbiera wyniki renderowania
+VERIFY_MIN_BOX_SIZE = 4  # Najmniejszy moduł (px) przy sprawdzaniu odczytu w podglądzie
+STRIP_MIN_SIDE = 4000   # Od takiego boku (px) PNG jest zapisywany pasami, bez obrazu w pamięci
+MAX_BOX_SIZE = 100      # Moduł do wydruku wielkoformatowego
+# Znacznik udanego sprawdzenia zależności - kolejne uruchomienia go pomijają
+DEPS_STAMP = os.path.join(os.path.expanduser("~"), ".qr_code_pro_deps")
+
+def dependencies_checked():
+    """Czy zależności zostały już sprawdzone dla tego interpretera"""
+    try:
+        with open(DEPS_STAMP, encoding='utf-8') as f:
+            return f.read() == sys.executable
+    except OSError:
+        return False
 
 def install_dependencies():
+    # Wywoływane tylko przy pierwszym uruchomieniu lub z opcją --check-deps
+    import subprocess
+    import importlib.util
     required = {
         'qrcode': 'qrcode[pil]',
         'PIL': 'Pillow'
@@ -34,6 +45,12 @@ def install_dependencies():
         except Exception as e:
             messagebox.showerror("Błąd", f"Błąd instalacji:\n{str(e)}\nZainstaluj ręcznie: pip install {' '.join(missing)}")
             sys.exit(1)
+    
+    try:
+        with open(DEPS_STAMP, 'w', encoding='utf-8') as f:
+            f.write(sys.executable)
+    except OSError:
+        pass  # Bez znacznika sprawdzimy ponownie przy następnym starcie
 
 class QRGeneratorPro:
     def __init__(self, root):
@@ -42,10 +59,25 @@ class QRGeneratorPro:
         self.root.geometry("800x700")
 
         # Inicjalizacja stałych i zmiennych PRZED tworzeniem widgetów
-        self.MAX_TEXT_CHARS = 500  # Dodane tutaj
+        self.capacity_meter = None  # Tworzony przy pierwszym wpisanym znaku
+        self.capacity_after_id = None
+        self.capacity_edit_from = None  # Pozycja najwcześniejszej zmiany od ostatniego pomiaru
         self.logo_path = None
         self.qr_image = None
         self.qr_data = None
+        self.qr_matrix = None
+        self.qr_render_options = None
+        
+        # Renderowanie w osobnym wątku - wyniki wracają przez kolejkę i root.after
+        self.render_executor = ThreadPoolExecutor(max_workers=1)
+        self.render_results = queue.Queue()
+        self.render_generation = 0
+        self.render_future = None
+        self.preview_after_id = None
+        
+        # Pomiar czasu etapów - QR_TIMINGS zapisuje je do pliku, QR_PROFILE włącza cProfile
+        self.timing_log = qr_timing.log_from_env()
+        self.profiler = qr_timing.profiler_from_env()
         
         # Kolory dla motywu jasnego
         self.light_theme = {
@@ -78,15 +110,8 @@ class QRGeneratorPro:
         # Inicjalizacja zmiennych kolorów
         self.primary_color = "#000000"
         self.bg_color = "#FFFFFF"
-        
-        self.module_drawers = {
-            "Kwadraty": SquareModuleDrawer(),
-            "Kwadraty z przerwami": GappedSquareModuleDrawer(),
-            "Kropki": CircleModuleDrawer(),
-            "Zaokrąglone": RoundedModuleDrawer(),
-            "Pionowe paski": VerticalBarsDrawer(),
-            "Poziome paski": HorizontalBarsDrawer()
-        }
+        self.end_color = qr_engine.DEFAULT_END_COLOR
+        self.fill_image = None
         
         self.current_theme = "light"
         self.theme_data = self.light_theme
@@ -96,11 +121,15 @@ class QRGeneratorPro:
         
         self.create_widgets()
         self.setup_layout()
+        self.bind_live_preview()
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self.root.after(RESULT_POLL_MS, self.poll_render_results)
+        # qrcode, PIL i NumPy ładujemy w tle, gdy okno jest już widoczne
+        self.root.after_idle(lambda: self.render_executor.submit(self.warm_up))
         
         self.logo_path = None
         self.qr_image = None
         self.qr_data = None
-        self.MAX_TEXT_CHARS = 500
 
     def setup_theme(self):
         """Konfiguruje styl aplikacji na podstawie bieżącego motywu"""
@@ -207,13 +236,15 @@ class QRGeneratorPro:
         # Tworzenie głównego notatnika
         self.notebook = ttk.Notebook(self.root)
         
-        # Tworzenie zakładek
-        self.create_text_tab()
-        self.create_url_tab()
-        self.create_wifi_tab()
-        self.create_email_tab()
-        self.create_sms_tab()
-        self.create_vcard_tab()
+        # Zakładki są puste do pierwszego wyświetlenia - zawartość buduje build_tab
+        self.tab_builders = {}
+        for text, builder in (("Tekst", self.create_text_tab), ("URL", self.create_url_tab),
+                              ("Wi-Fi", self.create_wifi_tab), ("Email", self.create_email_tab),
+                              ("SMS", self.create_sms_tab), ("Wizytówka", self.create_vcard_tab)):
+            frame = ttk.Frame(self.notebook)
+            self.notebook.add(frame, text=text)
+            self.tab_builders[str(frame)] = builder
+        self.build_tab(self.notebook.tabs()[0])
         
         # Tworzenie kontrolek i podglądu
         self.create_controls()
@@ -239,26 +270,24 @@ class QRGeneratorPro:
     def setup_layout(self):
         self.notebook.pack(padx=15, pady=10, fill=tk.BOTH, expand=True)
         self.controls_frame.pack(padx=15, pady=5, fill=tk.X)
+        self.status_bar.pack(side=tk.BOTTOM, fill=tk.X, padx=5, pady=(0, 2))
         self.preview_frame.pack(padx=15, pady=10, fill=tk.BOTH, expand=True)
 
-    def create_text_tab(self):
-        frame = ttk.Frame(self.notebook)
+    def create_text_tab(self, frame):
         ttk.Label(frame, text="Wprowadź tekst do zakodowania:", style='Header.TLabel').pack(pady=(10,5), anchor=tk.W)
         
         self.text_input = tk.Text(frame, height=8, wrap=tk.WORD, font=('Arial', 10),
                                 background=self.theme_data['entry_bg'], foreground=self.theme_data['fg'],
                                 insertbackground=self.theme_data['fg'], selectbackground=self.theme_data['accent'],
                                 relief=tk.SUNKEN, borderwidth=1)
-        self.text_input.bind("<KeyRelease>", self.update_char_counter)
+        self.text_input.bind("<KeyPress>", self.note_edit_position)
+        self.text_input.bind("<KeyRelease>", self.schedule_capacity)
         self.text_input.pack(padx=10, pady=5, fill=tk.BOTH, expand=True)
         
-        self.char_counter = ttk.Label(frame, text=f"Znaki: 0/{self.MAX_TEXT_CHARS}", style='Header.TLabel')
-        self.char_counter.pack(padx=10, anchor=tk.E)
-        
-        self.notebook.add(frame, text="Tekst")
+        self.capacity_label = ttk.Label(frame, text="Dane: 0 B", style='Header.TLabel')
+        self.capacity_label.pack(padx=10, anchor=tk.E)
 
-    def create_url_tab(self):
-        frame = ttk.Frame(self.notebook)
+    def create_url_tab(self, frame):
         ttk.Label(frame, text="Wprowadź adres URL:", style='Header.TLabel').pack(pady=(10,5), anchor=tk.W)
         
         url_example = ttk.Label(frame, text="Przykład: https://example.com", foreground=self.theme_data['accent'])
@@ -266,12 +295,8 @@ class QRGeneratorPro:
         
         self.url_entry = ttk.Entry(frame, width=40, font=('Arial', 10))
         self.url_entry.pack(padx=10, pady=10, fill=tk.X)
-        
-        self.notebook.add(frame, text="URL")
 
-    def create_wifi_tab(self):
-        frame = ttk.Frame(self.notebook)
-        
+    def create_wifi_tab(self, frame):
         ttk.Label(frame, text="Konfiguracja sieci Wi-Fi:", style='Header.TLabel').pack(pady=(10,5), anchor=tk.W)
         
         form_frame = ttk.Frame(frame)
@@ -290,15 +315,13 @@ class QRGeneratorPro:
         self.wifi_type.grid(row=2, column=1, sticky=tk.EW, padx=5, pady=5)
         
         self.wifi_hidden = tk.BooleanVar()
-        ttk.Checkbutton(form_frame, text="Ukryta sieć", variable=self.wifi_hidden).grid(row=3, column=1, sticky=tk.W, padx=5, pady=5)
+        ttk.Checkbutton(form_frame, text="Ukryta sieć", variable=self.wifi_hidden,
+                        command=self.schedule_preview).grid(row=3, column=1, sticky=tk.W, padx=5, pady=5)
         
         form_frame.columnconfigure(1, weight=1)
         form_frame.pack(fill=tk.BOTH, padx=10, pady=10, expand=True)
-        
-        self.notebook.add(frame, text="Wi-Fi")
 
-    def create_email_tab(self):
-        frame = ttk.Frame(self.notebook)
+    def create_email_tab(self, frame):
         ttk.Label(frame, text="Tworzenie wiadomości e-mail:", style='Header.TLabel').pack(pady=(10,5), anchor=tk.W)
         
         ttk.Label(frame, text="Adresat:").pack(anchor=tk.W, padx=10, pady=(10,2))
@@ -315,11 +338,8 @@ class QRGeneratorPro:
                                 insertbackground=self.theme_data['fg'], selectbackground=self.theme_data['accent'],
                                 relief=tk.SUNKEN, borderwidth=1)
         self.email_body.pack(padx=10, pady=5, fill=tk.BOTH, expand=True)
-        
-        self.notebook.add(frame, text="Email")
 
-    def create_sms_tab(self):
-        frame = ttk.Frame(self.notebook)
+    def create_sms_tab(self, frame):
         ttk.Label(frame, text="Tworzenie wiadomości SMS:", style='Header.TLabel').pack(pady=(10,5), anchor=tk.W)
         
         ttk.Label(frame, text="Numer telefonu:").pack(anchor=tk.W, padx=10, pady=(10,2))
@@ -332,11 +352,8 @@ class QRGeneratorPro:
                                  insertbackground=self.theme_data['fg'], selectbackground=self.theme_data['accent'],
                                  relief=tk.SUNKEN, borderwidth=1)
         self.sms_message.pack(padx=10, pady=5, fill=tk.BOTH, expand=True)
-        
-        self.notebook.add(frame, text="SMS")
 
-    def create_vcard_tab(self):
-        frame = ttk.Frame(self.notebook)
+    def create_vcard_tab(self, frame):
         ttk.Label(frame, text="Tworzenie wizytówki:", style='Header.TLabel').pack(pady=(10,5), anchor=tk.W)
         
         form_frame = ttk.Frame(frame)
@@ -358,8 +375,6 @@ class QRGeneratorPro:
             
         form_frame.columnconfigure(1, weight=1)
         form_frame.pack(fill=tk.BOTH, padx=10, pady=10, expand=True)
-        
-        self.notebook.add(frame, text="Wizytówka")
 
     def create_controls(self):
         self.controls_frame = ttk.Frame(self.root)
@@ -381,12 +396,24 @@ class QRGeneratorPro:
         self.bg_preview.pack(side=tk.LEFT, padx=5)
         bg_frame.pack(pady=5)
         
+        # Gradient od koloru QR do koloru końcowego albo wypełnienie obrazem
+        ttk.Label(color_frame, text="Wypełnienie:").pack(pady=(5,2))
+        self.fill_style = ttk.Combobox(color_frame, values=list(qr_engine.FILL_STYLES), state="readonly", width=18)
+        self.fill_style.current(0)
+        self.fill_style.pack(pady=(2,5))
+        end_frame = ttk.Frame(color_frame)
+        ttk.Button(end_frame, text="Kolor końcowy", command=lambda: self.set_color("end")).pack(side=tk.LEFT, padx=5)
+        self.end_preview = tk.Canvas(end_frame, width=30, height=30, bg=self.end_color, relief=tk.SUNKEN, borderwidth=1)
+        self.end_preview.pack(side=tk.LEFT, padx=5)
+        end_frame.pack(pady=5)
+        ttk.Button(color_frame, text="Obraz wypełnienia", command=self.add_fill_image).pack(pady=5)
+        
         color_frame.pack(side=tk.LEFT, padx=10, fill=tk.Y)
         
         # Ramka dla stylu punktów
         style_frame = ttk.LabelFrame(self.controls_frame, text="Styl punktów")
         ttk.Label(style_frame, text="Wybierz styl:").pack(pady=(5,2))
-        self.module_style = ttk.Combobox(style_frame, values=list(self.module_drawers.keys()), state="readonly", width=20)
+        self.module_style = ttk.Combobox(style_frame, values=list(qr_engine.MODULE_STYLES), state="readonly", width=20)
         self.module_style.current(0)
         self.module_style.pack(pady=(2,5))
         style_frame.pack(side=tk.LEFT, padx=10, fill=tk.Y)
@@ -394,18 +421,25 @@ class QRGeneratorPro:
         # Ramka dla logo
         logo_frame = ttk.LabelFrame(self.controls_frame, text="Logo")
         ttk.Button(logo_frame, text="Dodaj Logo", command=self.add_logo).pack(pady=5)
-        ttk.Button(logo_frame, text="Usuń Logo", command=lambda: setattr(self, 'logo_path', None)).pack(pady=5)
+        ttk.Button(logo_frame, text="Usuń Logo", command=self.remove_logo).pack(pady=5)
+        # Największe logo, przy którym kod nadal się odczytuje (zależy od poziomu korekcji)
+        self.fit_logo = tk.BooleanVar(value=False)
+        ttk.Checkbutton(logo_frame, text="Dopasuj rozmiar", variable=self.fit_logo,
+                        command=self.schedule_preview).pack(pady=5)
         logo_frame.pack(side=tk.LEFT, padx=10, fill=tk.Y)
         
         # Ramka dla ustawień
         settings_frame = ttk.LabelFrame(self.controls_frame, text="Ustawienia")
         ttk.Label(settings_frame, text="Rozmiar:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=2)
         self.box_size = tk.IntVar(value=10)
-        ttk.Spinbox(settings_frame, from_=5, to=20, textvariable=self.box_size, width=4).grid(row=0, column=1, padx=5, pady=2)
+        ttk.Spinbox(settings_frame, from_=5, to=MAX_BOX_SIZE, textvariable=self.box_size, width=4).grid(row=0, column=1, padx=5, pady=2)
         ttk.Label(settings_frame, text="Korekcja:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=2)
         self.error_correction = ttk.Combobox(settings_frame, values=["L", "M", "Q", "H"], width=4, state="readonly")
         self.error_correction.current(2)
         self.error_correction.grid(row=1, column=1, padx=5, pady=2)
+        self.verify_scan = tk.BooleanVar(value=True)
+        ttk.Checkbutton(settings_frame, text="Sprawdzaj skanowanie", variable=self.verify_scan).grid(
+            row=2, column=0, columnspan=2, sticky=tk.W, padx=5, pady=2)
         settings_frame.pack(side=tk.RIGHT, padx=10, fill=tk.Y)
 
     def create_preview_frame(self):
@@ -422,7 +456,13 @@ class QRGeneratorPro:
         btn_frame = ttk.Frame(self.preview_frame)
         ttk.Button(btn_frame, text="💾 Zapisz PNG", command=lambda: self.save_qr("png")).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="💾 Zapisz SVG", command=lambda: self.save_qr("svg")).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="📄 Arkusz PDF", command=lambda: self.save_qr("pdf")).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="🖼 Wiele rozmiarów",
+                   command=lambda: self.save_qr("sizes")).pack(side=tk.LEFT, padx=5)
         btn_frame.pack(pady=(5,10))
+        
+        # Pasek stanu z czasami etapów ostatniego renderowania
+        self.status_bar = ttk.Label(self.root, text="Gotowy", anchor=tk.W, font=('Helvetica', 9))
 
     def set_color(self, color_type):
         color = colorchooser.askcolor(title="Wybierz kolor")[1]
@@ -430,233 +470,554 @@ class QRGeneratorPro:
             if color_type == "primary":
                 self.primary_color = color
                 self.primary_preview.config(bg=color)
+            elif color_type == "end":
+                self.end_color = color
+                self.end_preview.config(bg=color)
             else:
                 self.bg_color = color
                 self.bg_preview.config(bg=color)
-            # Regeneruj QR jeśli już istnieje
-            if self.qr_image:
-                self.generate_qr()
+            self.schedule_preview()
+
+    def note_edit_position(self, event=None):
+        # Klawisz zmienia tekst najwcześniej znak przed kursorem albo na początku zaznaczenia
+        indexes = [tk.INSERT] + [str(index) for index in self.text_input.tag_ranges(tk.SEL)[:1]]
+        for index in indexes:
+            count = self.text_input.count("1.0", index, "chars")
+            if isinstance(count, tuple):
+                count = count[0]
+            position = max((count or 0) - 1, 0)
+            if self.capacity_edit_from is None or position < self.capacity_edit_from:
+                self.capacity_edit_from = position
+
+    def schedule_capacity(self, event=None):
+        # Debounce jak w podglądzie - liczymy dopiero po chwili bez klawiszy
+        self.note_edit_position()
+        if self.capacity_after_id:
+            self.root.after_cancel(self.capacity_after_id)
+        self.capacity_after_id = self.root.after(CAPACITY_DELAY_MS, self.update_capacity)
+
+    def update_capacity(self, event=None):
+        """Rozmiar zakodowanej treści i potrzebna wersja - licznik przyrostowy
+        liczony w wątku renderowania, więc pisanie w długim tekście nie zwalnia"""
+        import qr_split
+        self.capacity_after_id = None
+        if self.capacity_meter is None:
+            self.capacity_meter = qr_split.CapacityMeter()
+        raw = self.text_input.get("1.0", "end-1c")
+        hint = self.capacity_edit_from
+        self.capacity_edit_from = None
+        if hint is not None:
+            # Pozycja w treści po text_payload, który obcina białe znaki z początku
+            hint = max(hint - (len(raw) - len(raw.lstrip())), 0)
+        self.render_executor.submit(self.capacity_job, qr_engine.text_payload(raw), hint,
+                                    self.error_correction.get())
 
-    def update_char_counter(self, event=None):
-        count = len(self.text_input.get("1.0", tk.END)) - 1
-        self.char_counter.config(text=f"Znaki: {min(count, self.MAX_TEXT_CHARS)}/{self.MAX_TEXT_CHARS}")
+    def capacity_job(self, text, hint, error_correction):
+        # Jeden wątek renderowania - pomiary wykonują się po kolei, ostatni wynik jest aktualny
+        self.capacity_meter.update(text, hint)
+        description = self.capacity_meter.measure(error_correction).describe()
+        self.render_results.put((self.apply_capacity_result, (description,)))
+
+    def apply_capacity_result(self, description):
+        self.capacity_label.config(text=description)
 
     def add_logo(self):
         self.logo_path = filedialog.askopenfilename(filetypes=[("Obrazy", "*.png *.jpg *.jpeg")])
-        if self.logo_path and self.qr_image:
-            self.generate_qr()
+        if self.logo_path:
+            self.schedule_preview()
+
+    def remove_logo(self):
+        self.logo_path = None
+        self.schedule_preview()
 
-    def generate_qr(self):
-        data = self.get_current_data()
+    def add_fill_image(self):
+        fill_image = filedialog.askopenfilename(filetypes=[("Obrazy", "*.png *.jpg *.jpeg")])
+        if fill_image:
+            self.fill_image = fill_image
+            self.fill_style.set("Obraz")
+            self.schedule_preview()
+
+    def bind_live_preview(self):
+        """Podpina podgląd na żywo pod zmiany ustawień i przełączanie zakładek
+        (pola zakładek podpina build_tab)"""
+        for combobox in (self.module_style, self.fill_style, self.error_correction):
+            combobox.bind("<<ComboboxSelected>>", self.schedule_preview, add="+")
+        self.error_correction.bind("<<ComboboxSelected>>", self.refresh_capacity, add="+")
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed, add="+")
+        self.box_size.trace_add("write", self.schedule_preview)
+
+    def bind_fields(self, widget):
+        """Podpina podgląd na żywo pod wszystkie pola w widgecie (rekurencyjnie)"""
+        for child in widget.winfo_children():
+            if isinstance(child, ttk.Combobox):
+                child.bind("<<ComboboxSelected>>", self.schedule_preview, add="+")
+            elif isinstance(child, (ttk.Entry, tk.Text)):
+                child.bind("<KeyRelease>", self.schedule_preview, add="+")
+            self.bind_fields(child)
+
+    def build_tab(self, tab):
+        """Buduje zawartość zakładki przy pierwszym wyświetleniu"""
+        builder = self.tab_builders.pop(tab, None)
+        if builder:
+            frame = self.notebook.nametowidget(tab)
+            builder(frame)
+            self.bind_fields(frame)
+
+    def refresh_capacity(self, event=None):
+        # Zmiana poziomu korekcji zmienia pojemność, nie rozmiar treści
+        if self.capacity_meter is not None:
+            self.update_capacity()
+
+    def on_tab_changed(self, event=None):
+        self.build_tab(self.notebook.select())
+        self.schedule_preview()
+
+    def warm_up(self):
+        """Wykonywane w wątku roboczym - wczytuje moduły potrzebne do pierwszego podglądu"""
+        try:
+            qr_engine.warm_up()
+            import PIL.ImageTk
+        except ImportError:
+            pass  # Błąd pokaże się przy generowaniu
+
+    def schedule_preview(self, *args):
+        # Debounce - renderujemy dopiero po chwili bez zmian
+        if self.preview_after_id:
+            self.root.after_cancel(self.preview_after_id)
+        self.preview_after_id = self.root.after(PREVIEW_DELAY_MS, self.live_preview)
+
+    def live_preview(self):
+        self.preview_after_id = None
+        self.generate_qr(interactive=False)
+
+    def generate_qr(self, interactive=True):
+        timer = qr_timing.StageTimer("preview" if not interactive else "generate")
+        with timer.stage("payload"):
+            data = self.get_current_data()
         if not data:
-            messagebox.showerror("Błąd", "Brak danych wejściowych!")
+            if interactive:
+                messagebox.showerror("Błąd", "Brak danych wejściowych!")
             return
         
         try:
-            qr = qrcode.QRCode(
-                version=5,
-                error_correction=getattr(qrcode.constants, f"ERROR_CORRECT_{self.error_correction.get()}"),
-                box_size=self.box_size.get(),
-                border=4,
-            )
-            qr.add_data(data)
-            qr.make(fit=True)
-            
-            selected_style = self.module_style.get()
-            module_drawer = self.module_drawers[selected_style]
-            
-            img = qr.make_image(
-                fill_color=self.primary_color,
-                back_color=self.bg_color,
-                image_factory=StyledPilImage,
-                module_drawer=module_drawer
-            )
-            
-            if self.logo_path:
-                try:
-                    logo = Image.open(self.logo_path).convert("RGBA")
-                    logo_size = (img.size[0]//4, img.size[1]//4)
-                    logo.thumbnail(logo_size)
-                    pos = ((img.size[0]-logo.size[0])//2, (img.size[1]-logo.size[1])//2)
-                    img.paste(logo, pos, logo)
-                except Exception as e:
-                    messagebox.showerror("Błąd logo", f"Nie można dodać logo:\n{str(e)}")
-            
-            self.show_preview(img)
-            self.qr_image = img
-            self.generate_svg(data)
-            
+            options = {
+                "error_correction": self.error_correction.get(),
+                "fill_color": self.primary_color,
+                "back_color": self.bg_color,
+                "style": self.module_style.get(),
+                "fill_style": self.fill_style.get(),
+                "end_color": self.end_color,
+                "fill_image": self.fill_image,
+                "box_size": self.box_size.get(),
+                "logo_path": self.logo_path,
+                "fit_logo": self.fit_logo.get(),
+                "verify": self.verify_scan.get(),
+                "data": data
+            }
+        except tk.TclError:
+            if interactive:
+                messagebox.showerror("Błąd", "Nieprawidłowy rozmiar!")
+            return
+        
+        # Nowe zadanie unieważnia poprzednie - jeszcze nieuruchomione jest anulowane,
+        # a wynik już trwającego zostanie odrzucony
+        self.render_generation += 1
+        if self.render_future:
+            self.render_future.cancel()
+        self.render_future = self.render_executor.submit(
+            self.render_job, self.render_generation, data, options, interactive, timer)
+
+    def render_job(self, generation, data, options, interactive, timer):
+        """Wykonywane w wątku roboczym - bez dostępu do widgetów Tk"""
+        if generation != self.render_generation:
+            return
+        matrix = img = logo_error = scan_error = error = None
+        try:
+            with qr_timing.maybe_capture(self.profiler):
+                # Jedno kodowanie na generowanie - ta sama macierz dla podglądu, PNG i SVG
+                with timer.stage("encode"):
+                    matrix = self.encode_payload(data, options)
+                # Podgląd rysowany od razu w małej skali, pełny rozmiar dopiero przy zapisie
+                box_size = qr_engine.preview_box_size(matrix, options["box_size"])
+                # Odczyt sprawdzamy tylko po kliknięciu Generuj i przy zapisie - podgląd
+                # na żywo zostaje w swojej rozdzielczości i bez dekodera na każdy klawisz
+                verify = interactive and options["verify"]
+                if verify or options["fit_logo"]:
+                    # Zbyt drobne moduły zaniżają wynik odczytu - miniatura i tak zmniejszy obraz
+                    box_size = max(box_size, VERIFY_MIN_BOX_SIZE)
+                img, logo_error, scan_error = self.render_image(matrix, options, box_size, timer, verify)
+                with timer.stage("thumbnail"):
+                    img.thumbnail((qr_engine.PREVIEW_SIZE, qr_engine.PREVIEW_SIZE))
+        except ImportError as e:
+            error = f"{e}\nUruchom program z opcją --check-deps"
         except Exception as e:
-            messagebox.showerror("Błąd", f"Generowanie nieudane:\n{str(e)}")
+            error = str(e)
+        self.render_results.put((self.apply_render_result,
+                                 (generation, matrix, img, options, logo_error, scan_error, error, interactive,
+                                  timer)))
 
-    def generate_svg(self, data):
+    def encode_payload(self, data, options):
+        """Macierz do podglądu. Treść większa niż jeden kod jest dzielona na
+        sekwencję (options["parts"]) - podgląd, weryfikacja i dopasowanie logo
+        dotyczą pierwszego kodu"""
+        from qrcode.exceptions import DataOverflowError
         try:
-            qr = qrcode.QRCode(
-                version=5,
-                error_correction=getattr(qrcode.constants, f"ERROR_CORRECT_{self.error_correction.get()}"),
-                box_size=10,
-                border=4,
+            return qr_engine.encode(data, options["error_correction"])
+        except DataOverflowError:
+            import qr_split
+            parts = qr_split.split(data, options["error_correction"])
+            options["parts"] = parts
+            options["data"] = parts[0].text
+            return qr_split.encode_part(parts[0], options["error_correction"])
+
+    def render_image(self, matrix, options, box_size, timer, verify=True):
+        """Rysuje macierz z logo; zwraca obraz i ewentualne błędy logo i odczytu
+        (odczyt sprawdzany, gdy verify i włączone "Sprawdzaj skanowanie")"""
+        with timer.stage("rasterize"):
+            img = qr_engine.rasterize(
+                matrix,
+                fill_color=options["fill_color"],
+                back_color=options["back_color"],
+                style=options["style"],
+                box_size=box_size,
+                fill_style=options["fill_style"],
+                end_color=options["end_color"],
+                fill_image=options["fill_image"]
             )
-            qr.add_data(data)
-            qr.make(fit=True)
-            size = qr.modules_count * 10
-            svg_content = f'''<svg xmlns="http://www.w3.org/2000/svg" 
-                             width="{size}" 
-                             height="{size}" 
-                             viewBox="0 0 {size} {size}">
-                             <rect width="100%" height="100%" fill="{self.bg_color}"/>'''
-            
-            modules = qr.modules
-            box_size = 10
-            
-            for y in range(len(modules)):
-                for x in range(len(modules)):
-                    if modules[y][x]:
-                        if self.module_style.get() == "Kropki":
-                            svg_content += f'<circle cx="{(x + 0.5) * box_size}" cy="{(y + 0.5) * box_size}" r="{box_size / 2}" fill="{self.primary_color}"/>'
-                        elif self.module_style.get() == "Zaokrąglone":
-                            svg_content += f'<rect x="{x * box_size}" y="{y * box_size}" width="{box_size}" height="{box_size}" rx="{box_size / 4}" ry="{box_size / 4}" fill="{self.primary_color}"/>'
-                        else:
-                            svg_content += f'<rect x="{x * box_size}" y="{y * box_size}" width="{box_size}" height="{box_size}" fill="{self.primary_color}"/>'
-            
-            svg_content += '</svg>'
-            self.qr_svg_content = svg_content
-            
+        logo_error = scan_error = None
+        if options["logo_path"]:
+            try:
+                with timer.stage("logo"):
+                    if options["fit_logo"] and "logo_scale" not in options:
+                        import qr_verify
+                        # Rozmiar z podglądu zapamiętany w opcjach - zapis użyje tego samego
+                        options["logo_scale"] = qr_verify.find_logo_scale(
+                            img, options["data"], matrix.size, options["logo_path"])
+                    scale = options.get("logo_scale", qr_engine.LOGO_SCALE)
+                    if scale:
+                        qr_engine.paste_logo(img, options["logo_path"], scale)
+                    else:
+                        logo_error = "Logo nie mieści się w kodzie przy tym poziomie korekcji - pominięto"
+            except Exception as e:
+                logo_error = str(e)
+        if verify and options["verify"]:
+            import qr_verify
+            try:
+                with timer.stage("verify"):
+                    qr_verify.verify_image(img, options["data"], matrix.size)
+            except qr_verify.ScanError as e:
+                scan_error = str(e)
+        return img, logo_error, scan_error
+
+    def export_job(self, matrix, options, img, file_path):
+        """Pełne renderowanie (jeśli jeszcze go nie ma) i zapis - w wątku roboczym"""
+        timer = qr_timing.StageTimer("export")
+        scan_error = error = None
+        try:
+            with qr_timing.maybe_capture(self.profiler):
+                side = (matrix.size + 2 * qr_engine.DEFAULT_BORDER) * options["box_size"]
+                if img is None and side >= STRIP_MIN_SIDE and file_path.lower().endswith(".png"):
+                    # Wydruk wielkoformatowy - pasami prosto do pliku, odczyt sprawdzamy w małej skali
+                    if options["verify"] or options["fit_logo"]:
+                        _, _, scan_error = self.render_image(matrix, options, VERIFY_MIN_BOX_SIZE * 2, timer)
+                    with timer.stage("save"):
+                        qr_engine.save_png(matrix, file_path, options["fill_color"], options["back_color"],
+                                           options["style"], options["box_size"], logo_path=options["logo_path"],
+                                           logo_scale=options.get("logo_scale", qr_engine.LOGO_SCALE),
+                                           fill_style=options["fill_style"], end_color=options["end_color"],
+                                           fill_image=options["fill_image"])
+                else:
+                    if img is None:
+                        img, _, scan_error = self.render_image(matrix, options, options["box_size"], timer)
+                    with timer.stage("save"):
+                        # PNG w najmniejszym wiernym trybie (1 bit, paleta), JPEG w RGB
+                        qr_engine.save_image(img, file_path, qr_engine.image_format(file_path))
         except Exception as e:
-            messagebox.showerror("Błąd SVG", f"Generowanie SVG nieudane:\n{str(e)}")
+            error = str(e)
+        self.render_results.put((self.apply_export_result, (options, img, file_path, scan_error, error, timer)))
+
+    def export_parts_job(self, options, svg_options, file_path):
+        """Zapis wszystkich kodów sekwencji (kod-01of03.png ...) - w wątku roboczym"""
+        import qr_split
+        timer = qr_timing.StageTimer("export")
+        paths = []
+        scan_error = error = None
+        try:
+            with qr_timing.maybe_capture(self.profiler):
+                parts = options["parts"]
+                with timer.stage("encode"):
+                    # Kody sekwencji kodowane równolegle w puli procesów
+                    matrices = qr_split.encode_parts(parts, options["error_correction"])
+                base_path, extension = os.path.splitext(file_path)
+                for part, matrix in zip(parts, matrices):
+                    path = qr_split.part_path(base_path, part, extension)
+                    if extension.lower() in (".svg", ".svgz"):
+                        with timer.stage("svg"):
+                            qr_engine.save_svg(matrix, path, **svg_options)
+                    else:
+                        img, _, part_error = self.render_image(matrix, dict(options, data=part.text),
+                                                               options["box_size"], timer)
+                        if part_error and not scan_error:
+                            scan_error = f"kod {part.index + 1}: {part_error}"
+                        with timer.stage("save"):
+                            qr_engine.save_image(img, path, qr_engine.image_format(path))
+                    paths.append(path)
+        except Exception as e:
+            error = str(e)
+        self.render_results.put((self.apply_export_parts_result, (options, paths, scan_error, error, timer)))
+
+    def apply_export_parts_result(self, options, paths, scan_error, error, timer):
+        self.report_timing(timer, self.qr_matrix if options is self.qr_render_options else None, options)
+        if error:
+            messagebox.showerror("Błąd zapisu", f"Nie można zapisać pliku:\n{error}")
+            return
+        import qr_split
+        files = "\n".join(os.path.basename(path) for path in paths)
+        message = f"Zapisano {qr_split.describe(options['parts'], options['error_correction'])}:\n{files}"
+        if scan_error:
+            messagebox.showwarning("Skanowanie", f"{message}\n\nKod może być nieczytelny:\n{scan_error}")
+            return
+        messagebox.showinfo("Sukces", message)
+
+    def export_sizes_job(self, matrix, options, base_path, file_format):
+        """Eksport we wszystkich rozmiarach z jednej macierzy - w wątku roboczym"""
+        import qr_export
+        timer = qr_timing.StageTimer("export")
+        written = []
+        error = None
+        try:
+            with qr_timing.maybe_capture(self.profiler):
+                written = qr_export.export_sizes(
+                    matrix, base_path, formats=(file_format,), fill_color=options["fill_color"],
+                    back_color=options["back_color"], style=options["style"], box_size=options["box_size"],
+                    logo_path=options["logo_path"], timer=timer,
+                    logo_scale=options.get("logo_scale", qr_engine.LOGO_SCALE), fill_style=options["fill_style"],
+                    end_color=options["end_color"], fill_image=options["fill_image"])
+        except Exception as e:
+            error = str(e)
+        self.render_results.put((self.apply_export_sizes_result, (matrix, options, written, error, timer)))
+
+    def apply_export_sizes_result(self, matrix, options, written, error, timer):
+        self.report_timing(timer, matrix, options)
+        if error:
+            messagebox.showerror("Błąd zapisu", f"Nie można zapisać pliku:\n{error}")
+            return
+        files = "\n".join(f"{os.path.basename(path)} ({target.dpi} DPI)" for path, target in written)
+        messagebox.showinfo("Sukces", f"Zapisano {len(written)} plików:\n{files}")
+
+    def poll_render_results(self):
+        try:
+            while True:
+                callback, args = self.render_results.get_nowait()
+                callback(*args)
+        except queue.Empty:
+            pass
+        self.root.after(RESULT_POLL_MS, self.poll_render_results)
+
+    def apply_render_result(self, generation, matrix, img, options, logo_error, scan_error, error, interactive,
+                            timer):
+        if generation != self.render_generation:
+            return  # Wynik nieaktualny - w międzyczasie zmieniono dane
+        if error:
+            if interactive:
+                messagebox.showerror("Błąd", f"Generowanie nieudane:\n{error}")
+            return
+        if logo_error and interactive:
+            messagebox.showerror("Błąd logo", f"Nie można dodać logo:\n{logo_error}")
+        
+        with timer.stage("preview"):
+            self.show_preview(img)
+        self.qr_image = None  # Pełny obraz powstanie przy zapisie
+        self.qr_matrix = matrix
+        self.qr_render_options = options
+        with timer.stage("svg"):
+            self.generate_svg(options)
+        self.report_timing(timer, matrix, options)
+        if options.get("parts"):
+            import qr_split
+            sequence = qr_split.describe(options["parts"], options["error_correction"])
+            self.status_bar.config(text=f"Podgląd pierwszego kodu: {sequence} - zapis PNG/SVG obejmie wszystkie")
+        if scan_error:
+            # Podgląd na żywo tylko ostrzega na pasku stanu, okno pokazujemy na żądanie
+            self.status_bar.config(text=f"⚠ Kod może być nieczytelny: {scan_error}")
+            if interactive:
+                messagebox.showwarning("Skanowanie", f"Kod może być nieczytelny:\n{scan_error}\n\n"
+                                       "Zmniejsz logo, zwiększ poziom korekcji lub kontrast kolorów.")
+
+    def report_timing(self, timer, matrix, options):
+        """Pokazuje czasy etapów na pasku stanu i dopisuje je do dziennika"""
+        self.status_bar.config(text=timer.summary())
+        if self.timing_log:
+            try:
+                self.timing_log.write(timer.record(
+                    version=matrix.version if matrix else None,
+                    style=options["style"],
+                    box_size=options["box_size"],
+                    error_correction=options["error_correction"],
+                    logo=bool(options["logo_path"])
+                ))
+            except OSError:
+                pass  # Dziennik czasów nie może przerywać pracy programu
+
+    def apply_export_result(self, options, img, file_path, scan_error, error, timer):
+        self.report_timing(timer, self.qr_matrix if options is self.qr_render_options else None, options)
+        if error:
+            messagebox.showerror("Błąd zapisu", f"Nie można zapisać pliku:\n{error}")
+            return
+        if options is self.qr_render_options:
+            self.qr_image = img  # Kolejny zapis bez zmian nie renderuje ponownie
+        if scan_error:
+            messagebox.showwarning("Skanowanie", f"Zapisano PNG w:\n{file_path}\n\n"
+                                   f"Kod może być nieczytelny:\n{scan_error}")
+            return
+        messagebox.showinfo("Sukces", f"Zapisano PNG w:\n{file_path}")
+
+    def generate_svg(self, options):
+        # SVG jest zapisywany strumieniowo z macierzy dopiero przy zapisie,
+        # tu zapamiętujemy ustawienia z chwili generowania
+        self.qr_svg_options = {
+            "fill_color": options["fill_color"],
+            "back_color": options["back_color"],
+            "style": options["style"]
+        }
+
+    def close(self):
+        self.render_executor.shutdown(wait=False, cancel_futures=True)
+        if self.profiler:
+            self.profiler.dump()
+        self.root.destroy()
 
     def show_preview(self, img):
-        img.thumbnail((300, 300))
+        from PIL import ImageTk
         self.preview_image = ImageTk.PhotoImage(img)
         self.preview_label.config(image=self.preview_image)
 
     def save_qr(self, file_type):
-        if not self.qr_image:
+        if self.qr_matrix is None:
             messagebox.showwarning("Ostrzeżenie", "Najpierw wygeneruj kod QR!")
             return
+        if file_type in ("pdf", "sizes") and self.qr_render_options.get("parts"):
+            import qr_split
+            count = qr_split.codes_label(len(self.qr_render_options["parts"]))
+            messagebox.showwarning("Ostrzeżenie", f"Treść podzielona na {count} - zapisz je jako PNG lub SVG.")
+            return
         
         if file_type == "png":
             file_path = filedialog.asksaveasfilename(
                 defaultextension=".png",
                 filetypes=[("PNG", "*.png"), ("JPEG", "*.jpg"), ("Wszystkie pliki", "*.*")]
             )
-            if file_path:
-                try:
-                    # Konwertujemy na RGB jeśli jest w trybie RGBA (z przezroczystością)
-                    if self.qr_image.mode == 'RGBA':
-                        self.qr_image.convert('RGB').save(file_path)
-                    else:
-                        self.qr_image.save(file_path)
-                    messagebox.showinfo("Sukces", f"Zapisano PNG w:\n{file_path}")
-                except Exception as e:
-                    messagebox.showerror("Błąd zapisu", f"Nie można zapisać pliku:\n{str(e)}")
+            if file_path and self.qr_render_options.get("parts"):
+                self.render_executor.submit(self.export_parts_job, self.qr_render_options, self.qr_svg_options,
+                                            file_path)
+            elif file_path:
+                # Pełna rozdzielczość renderowana leniwie, dopiero przy zapisie
+                self.render_executor.submit(self.export_job, self.qr_matrix, self.qr_render_options,
+                                           self.qr_image, file_path)
         
         elif file_type == "svg":
-            if not hasattr(self, 'qr_svg_content'):
+            if self.qr_matrix is None:
                 messagebox.showerror("Błąd", "Nie wygenerowano obrazu SVG!")
                 return
                 
             file_path = filedialog.asksaveasfilename(
                 defaultextension=".svg",
-                filetypes=[("SVG", "*.svg"), ("Wszystkie pliki", "*.*")]
+                filetypes=[("SVG", "*.svg"), ("SVGZ (skompresowany)", "*.svgz"), ("Wszystkie pliki", "*.*")]
+            )
+            if file_path and self.qr_render_options.get("parts"):
+                self.render_executor.submit(self.export_parts_job, self.qr_render_options, self.qr_svg_options,
+                                            file_path)
+            elif file_path:
+                timer = qr_timing.StageTimer("export")
+                try:
+                    with qr_timing.maybe_capture(self.profiler), timer.stage("svg"):
+                        qr_engine.save_svg(self.qr_matrix, file_path, **self.qr_svg_options)
+                    self.report_timing(timer, self.qr_matrix, self.qr_render_options)
+                    messagebox.showinfo("Sukces", f"Zapisano SVG w:\n{file_path}{self.flat_fill_note()}")
+                except Exception as e:
+                    messagebox.showerror("Błąd zapisu", f"Nie można zapisać pliku:\n{str(e)}")
+
+        elif file_type == "pdf":
+            file_path = filedialog.asksaveasfilename(
+                defaultextension=".pdf",
+                filetypes=[("PDF", "*.pdf"), ("Wszystkie pliki", "*.*")]
             )
             if file_path:
+                # Strona A4 z siatką 3x8 wypełniona bieżącym kodem (arkusz naklejek)
+                import qr_labels
+                timer = qr_timing.StageTimer("export")
                 try:
-                    with open(file_path, 'w') as f:
-                        f.write(self.qr_svg_content)
-                    messagebox.showinfo("Sukces", f"Zapisano SVG w:\n{file_path}")
+                    with qr_timing.maybe_capture(self.profiler), timer.stage("pdf"):
+                        qr_labels.save_sheet(self.qr_matrix, file_path,
+                                             logo_path=self.qr_render_options["logo_path"],
+                                             logo_scale=self.qr_render_options.get("logo_scale", qr_engine.LOGO_SCALE),
+                                             **self.qr_svg_options)
+                    self.report_timing(timer, self.qr_matrix, self.qr_render_options)
+                    messagebox.showinfo("Sukces", f"Zapisano arkusz PDF w:\n{file_path}{self.flat_fill_note()}")
                 except Exception as e:
                     messagebox.showerror("Błąd zapisu", f"Nie można zapisać pliku:\n{str(e)}")
 
+        elif file_type == "sizes":
+            file_path = filedialog.asksaveasfilename(
+                defaultextension=".png",
+                filetypes=[("PNG", "*.png"), ("WebP", "*.webp"), ("Wszystkie pliki", "*.*")]
+            )
+            if file_path:
+                # Rozmiar modułu z okna to 1x; pliki kod@1x.png ... kod@600dpi.png obok siebie
+                base_path, extension = os.path.splitext(file_path)
+                file_format = "webp" if extension.lower() == ".webp" else "png"
+                self.render_executor.submit(self.export_sizes_job, self.qr_matrix, self.qr_render_options,
+                                            base_path, file_format)
+
+    def flat_fill_note(self):
+        """Dopisek do komunikatu zapisu SVG/PDF, gdy podgląd ma gradient lub obraz"""
+        if qr_engine.resolve_fill(self.qr_render_options["fill_style"]) == qr_engine.DEFAULT_FILL:
+            return ""
+        return "\n\nGradient i wypełnienie obrazem są tylko w PNG - użyto koloru QR."
+
     def get_current_data(self):
         tab = self.notebook.tab(self.notebook.select(), "text")
         
         if tab == "Tekst":
-            text = self.text_input.get("1.0", tk.END).strip()
-            return text[:self.MAX_TEXT_CHARS]
+            return qr_engine.text_payload(self.text_input.get("1.0", tk.END))
             
         elif tab == "URL":
-            url = self.url_entry.get().strip()
-            if not url:
-                return ""
-            if not url.startswith(("http://", "https://")):
-                url = "http://" + url
-            return url
+            return qr_engine.url_payload(self.url_entry.get())
             
         elif tab == "Wi-Fi":
-            ssid = self.wifi_ssid.get().strip()
-            password = self.wifi_pass.get().strip()
-            security = self.wifi_type.get()
-            hidden = self.wifi_hidden.get()
-            
-            if not ssid:
-                return ""
-            
-            # Poprawne kodowanie specjalnych znaków
-            ssid_encoded = urllib.parse.quote(ssid)
-            password_encoded = urllib.parse.quote(password)
-            
-            # Poprawne wartości dla typu szyfrowania
-            security_map = {
-                "WPA": "WPA",
-                "WPA2": "WPA",
-                "WEP": "WEP",
-                "nopass": "nopass"
-            }
-            security = security_map.get(security, "WPA")
-            
-            parts = []
-            parts.append(f"WIFI:T:{security};")
-            parts.append(f"S:{ssid_encoded};")
-            if security != "nopass":
-                parts.append(f"P:{password_encoded};")
-            if hidden:
-                parts.append("H:true;")
-            
-            return ''.join(parts) + ';'  # Kończymy dodatkowym średnikiem
+            return qr_engine.wifi_payload(
+                self.wifi_ssid.get(),
+                self.wifi_pass.get(),
+                self.wifi_type.get(),
+                self.wifi_hidden.get()
+            )
             
         elif tab == "Email":
-            to_email = self.email_to.get().strip()
-            subject = self.email_subj.get().strip()
-            body = self.email_body.get("1.0", tk.END).strip()
-            
-            if not to_email:
-                return ""
-                
-            params = []
-            if subject:
-                params.append(f"subject={urllib.parse.quote(subject)}")
-            if body:
-                params.append(f"body={urllib.parse.quote(body)}")
-                
-            return f"mailto:{to_email}?{'&'.join(params)}" if params else f"mailto:{to_email}"
+            return qr_engine.email_payload(
+                self.email_to.get(),
+                self.email_subj.get(),
+                self.email_body.get("1.0", tk.END)
+            )
             
         elif tab == "SMS":
-            number = self.sms_number.get().strip()
-            message = self.sms_message.get("1.0", tk.END).strip()
-            
-            if not number:
-                return ""
-                
-            return f"smsto:{number}:{urllib.parse.quote(message)}" if message else f"smsto:{number}"
+            return qr_engine.sms_payload(self.sms_number.get(), self.sms_message.get("1.0", tk.END))
             
         elif tab == "Wizytówka":
-            vcard = [
-                "BEGIN:VCARD",
-                "VERSION:3.0",
-                f"FN:{self.vcard_fname.get().strip()} {self.vcard_lname.get().strip()}",
-                f"ORG:{self.vcard_company.get().strip()}",
-                f"TEL:{self.vcard_phone.get().strip()}",
-                f"EMAIL:{self.vcard_email.get().strip()}",
-                f"URL:{self.vcard_url.get().strip()}",
-                "END:VCARD"
-            ]
-            return '\n'.join([line for line in vcard if not line.endswith(':')])
+            return qr_engine.vcard_payload(
+                self.vcard_fname.get(),
+                self.vcard_lname.get(),
+                self.vcard_company.get(),
+                self.vcard_phone.get(),
+                self.vcard_email.get(),
+                self.vcard_url.get()
+            )
             
         return ""
     
 if __name__ == "__main__":
-    install_dependencies()  # Sprawdź zależności przed uruchomieniem
+    # Zależności sprawdzamy przy pierwszym uruchomieniu lub na żądanie (--check-deps)
+    if "--check-deps" in sys.argv or not dependencies_checked():
+        install_dependencies()
     root = tk.Tk()
     app = QRGeneratorPro(root)
     root.mainloop()
@@ -0,0 +1,478 @@
+"""Tryb wsadowy: generowanie wielu kodów QR z pliku zadań CSV/JSONL.
+
+Każdy wiersz to jedno zadanie. Kolumna "type" wybiera rodzaj treści
+(text, url, wifi, email, sms, vcard), pozostałe kolumny to pola treści
+(np. ssid, password) i opcje renderowania (fill_color, back_color, style,
+box_size, error_correction, logo, format: png/svg/svgz, png_mode, output). Zamiast "type" można
+podać gotową treść w kolumnie "data". Kolumny version i mask ustalają
+wersję i maskę kodu - przy jednakowych treściach kodowanie niczego nie szuka.
+PNG jest zapisywany w najmniejszym wiernym trybie pikseli (1 bit dla czerni
+i bieli, paleta dla innych kolorów) - png_mode/--png-mode rgb zapisuje pełne
+RGB; --optimize i --compress-level sterują kompresją.
+
+Kolumna fill_style (albo --fill-style) wybiera gradient (radial, square,
+horizontal, vertical - od fill_color do end_color) lub wypełnienie obrazem
+(image, plik w fill_image). Gradienty są liczone w NumPy dla całego obrazu
+naraz; SVG ma tylko jednolity kolor.
+
+Z opcją --archive pliki nie trafiają do katalogu, tylko są dopisywane
+strumieniowo (w kolejności zadań, bez plików tymczasowych) do archiwum
+ZIP lub TAR (.tar, .tar.gz, .tgz). --manifest zapisuje plik CSV z treścią,
+nazwą pliku i sumą SHA-256 każdego kodu.
+
+--matrix-store wskazuje katalog trwałego magazynu macierzy (qr_store) -
+ponowny wydruk tych samych kodów pomija kodowanie, zostaje tylko rysowanie.
+
+--verify RATE odczytuje wbudowanym dekoderem (qr_verify) gotowe obrazy
+części zadań (np. 0.1 - co dziesiąte, zawsze pierwsze). Pierwszy
+nieczytelny kod przerywa przebieg - zła kombinacja kolorów, stylu czy
+logo wychodzi na początku, a nie po wydruku całej partii. Kolumna
+logo_scale (albo --logo-scale) ustala bok logo jako ułamek boku kodu;
+"auto" szuka największego logo, przy którym kod czyta się z zapasem.
+
+Pliki są zapisywane przez plik tymczasowy i zamianę nazwy. Katalog
+obserwowany, który renderuje tylko zmienione zadania, to qr_watch.
+
+Przykład:
+    python qr_batch.py etykiety.csv -o wynik -j 8 --timings czasy.jsonl
+    python qr_batch.py etykiety.csv --archive etykiety.zip --format svg
+    python qr_batch.py etykiety.csv -o wynik --matrix-store ~/.qr_store
+    python qr_batch.py etykiety.csv -o wynik --logo logo.png --logo-scale auto --verify 0.05
+"""
+import argparse
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import sys
+import tarfile
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+
+import qr_engine
+import qr_timing
+import qr_verify
+
+RENDER_OPTIONS = ("fill_color", "back_color", "style", "box_size", "error_correction", "fill_style", "end_color",
+                  "fill_image")
+ENCODE_OPTIONS = ("version", "mask")
+TRUE_VALUES = ("1", "true", "tak", "yes", "y")
+MANIFEST_FIELDS = ("index", "file", "payload", "sha256", "bytes")
+# Rozszerzenia już skompresowanych formatów - w ZIP zapisywane bez kompresji
+STORED_EXTENSIONS = (".png", ".svgz", ".jpg", ".jpeg", ".gif", ".webp")
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)  # Najwcześniejsza data w ZIP - stała jak mtime=0 w TAR
+
+
+def read_jobs(path):
+    """Czyta zadania z pliku CSV lub JSONL (po rozszerzeniu)"""
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+        else:
+            for row in csv.DictReader(f):
+                yield {key: value for key, value in row.items() if value not in (None, "")}
+
+
+def job_payload(job):
+    if "data" in job:
+        return str(job["data"])
+    fields = dict(job)
+    if isinstance(fields.get("hidden"), str):
+        fields["hidden"] = fields["hidden"].strip().lower() in TRUE_VALUES
+    return qr_engine.build_payload(job.get("type", "text"), fields)
+
+
+def job_options(job, defaults):
+    options = {key: job.get(key, defaults.get(key)) for key in RENDER_OPTIONS + ENCODE_OPTIONS}
+    options["box_size"] = int(options["box_size"])
+    for key in ENCODE_OPTIONS:
+        if options[key] is not None:
+            options[key] = int(options[key])
+    return options
+
+
+def logo_scale(job, defaults):
+    """Ułamek boku kodu zajęty przez logo albo "auto" (dopasowanie do korekcji)"""
+    value = str(job.get("logo_scale", defaults.get("logo_scale", qr_engine.LOGO_SCALE))).strip().lower()
+    if value == "auto":
+        return value
+    scale = float(value)
+    if not 0 < scale <= qr_verify.MAX_LOGO_SCALE:
+        raise ValueError(f"Nieprawidłowy rozmiar logo: {value} (0-{qr_verify.MAX_LOGO_SCALE} albo auto)")
+    return scale
+
+
+def verify_sampled(index, rate):
+    """Czy zadanie należy do próbki weryfikacji - równomiernie co 1/rate, zawsze pierwsze"""
+    if not rate:
+        return False
+    return index == 0 or int(index * rate) != int((index - 1) * rate)
+
+
+def encode_job(data, options):
+    # Podana wersja jest stała (bez dopasowania), inaczej szukamy od domyślnej
+    version = options["version"]
+    return qr_engine.encode(data, options["error_correction"], version or qr_engine.DEFAULT_VERSION,
+                            mask=options["mask"], fit=version is None)
+
+
+def output_name(index, job, defaults):
+    """Nazwa pliku zadania - kolumna output albo numer zadania.
+
+    Nazwa musi być względna i bez "..": pliki zadań przychodzą z zewnątrz
+    (katalog obserwowany), więc nie mogą wskazywać miejsca poza katalogiem wyników.
+    """
+    name = job.get("output")
+    if not name:
+        return f"{index:06d}.{job.get('format', defaults['format']).lower()}"
+    name = str(name)
+    parts = name.replace("\\", "/").split("/")
+    if (os.path.isabs(name) or os.path.splitdrive(name)[0] or name.startswith(("/", "\\")) or ".." in parts
+            or os.path.normpath(name) == "."):
+        raise ValueError(f"Nieprawidłowa nazwa pliku: {name}")
+    return name
+
+
+def output_path(output_dir, name):
+    """Ścieżka pliku wynikowego; ValueError, gdy (np. przez dowiązanie) wychodzi poza output_dir"""
+    root = os.path.realpath(output_dir)
+    path = os.path.join(output_dir, name)
+    if os.path.commonpath([root, os.path.realpath(path)]) != root:
+        raise ValueError(f"Plik poza katalogiem wyników: {name}")
+    return path
+
+
+def render_output(index, job, defaults, timer):
+    """Renderuje jedno zadanie do zawartości pliku; zwraca (nazwa, treść kodu, bajty)"""
+    with timer.stage("payload"):
+        data = job_payload(job)
+    if not data:
+        raise ValueError("Brak danych wejściowych")
+
+    options = job_options(job, defaults)
+    file_format = job.get("format", defaults["format"]).lower()
+    name = output_name(index, job, defaults)
+
+    with timer.stage("encode"):
+        matrix = encode_job(data, options)
+    if file_format in ("svg", "svgz"):
+        if qr_engine.resolve_fill(options["fill_style"]) != qr_engine.DEFAULT_FILL:
+            raise ValueError("Gradient i wypełnienie obrazem są dostępne tylko w PNG")
+        with timer.stage("svg"):
+            content = qr_engine.render_svg(matrix, options["fill_color"], options["back_color"],
+                                           options["style"]).encode('utf-8')
+            if file_format == "svgz":
+                content = gzip.compress(content, mtime=0)  # mtime=0 - stała suma kontrolna
+        if verify_sampled(index, defaults.get("verify")):
+            # SVG sprawdzamy na rastrze tej samej macierzy, kolorów i stylu
+            with timer.stage("verify"):
+                img = qr_engine.rasterize(matrix, options["fill_color"], options["back_color"],
+                                          options["style"], options["box_size"])
+                qr_verify.verify_image(img, data, matrix.size)
+        return name, data, content
+
+    with timer.stage("rasterize"):
+        img = qr_engine.rasterize(matrix, options["fill_color"], options["back_color"],
+                                  options["style"], options["box_size"], fill_style=options["fill_style"],
+                                  end_color=options["end_color"], fill_image=options["fill_image"])
+    logo_path = job.get("logo", defaults["logo"])
+    if logo_path:
+        with timer.stage("logo"):
+            scale = logo_scale(job, defaults)
+            if scale == "auto":
+                scale = qr_verify.find_logo_scale(img, data, matrix.size, logo_path)
+                if not scale:
+                    raise ValueError("Logo nie mieści się w kodzie przy tym poziomie korekcji")
+            qr_engine.paste_logo(img, logo_path, scale)
+    if verify_sampled(index, defaults.get("verify")):
+        with timer.stage("verify"):
+            qr_verify.verify_image(img, data, matrix.size)
+    with timer.stage("save"):
+        # Format jak przy img.save(ścieżka) - wg rozszerzenia nazwy
+        buffer = io.BytesIO()
+        png_mode = job.get("png_mode", defaults.get("png_mode", "auto"))
+        qr_engine.save_image(img, buffer, qr_engine.image_format(name), png_mode,
+                             defaults.get("optimize", False), defaults.get("compress_level"))
+    return name, data, buffer.getvalue()
+
+
+def render_job(task, timer=None):
+    """Renderuje jedno zadanie - uruchamiane w procesie roboczym.
+
+    Zapisuje plik w output_dir i zwraca (ścieżka, treść kodu, bajty); gdy
+    output_dir jest None, zamiast ścieżki zwraca nazwę, a bajty trafiają
+    do archiwum w procesie głównym.
+    """
+    index, job, defaults, output_dir = task
+    name, payload, content = render_output(index, job, defaults, timer or qr_timing.StageTimer("batch"))
+    if output_dir is None:
+        return name, payload, content
+    path = output_path(output_dir, name)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # Plik tymczasowy i zamiana - czytający katalog nigdy nie zobaczy połowy pliku
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as f:
+        f.write(content)
+    os.replace(temporary, path)
+    return path, payload, content
+
+
+def _run_safe(task):
+    # Zwraca też, czy macierz pochodziła z pamięci podręcznej procesu roboczego,
+    # czasy etapów oraz dane do manifestu (treść kodu i SHA-256 pliku)
+    hits = qr_engine.MATRIX_CACHE.hits
+    store = qr_engine.matrix_store()
+    store_hits = store.hits if store else 0
+    timer = qr_timing.StageTimer("batch")
+    path = payload = digest = content = error = None
+    unreadable = False
+    try:
+        path, payload, content = render_job(task, timer)
+        digest = hashlib.sha256(content).hexdigest()
+    except Exception as e:
+        error = str(e)
+        unreadable = isinstance(e, qr_verify.ScanError)
+    cache_hit = qr_engine.MATRIX_CACHE.hits > hits
+    store_hit = store is not None and store.hits > store_hits
+    timing = timer.record(index=task[0], output=path, error=error, cache_hit=cache_hit, store_hit=store_hit,
+                          verified="verify" in timer.stages, unreadable=unreadable, pid=os.getpid())
+    size = len(content) if content is not None else 0
+    if task[3] is not None:
+        content = None  # Plik już zapisany - nie przesyłamy bajtów do procesu głównego
+    return task[0], path, error, cache_hit, timing, (payload, digest, size, content)
+
+
+class ArchiveWriter:
+    """Dopisuje pliki do archiwum ZIP lub TAR (wg rozszerzenia) bez plików tymczasowych.
+
+    Daty plików (i nagłówka gzip) są stałe, jak w SVGZ - te same zadania
+    dają archiwum o tej samej sumie kontrolnej.
+    """
+
+    def __init__(self, path):
+        lower = path.lower()
+        self.gzip = None
+        if lower.endswith(".zip"):
+            self.zip = zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED)
+            self.tar = None
+        elif lower.endswith((".tar", ".tar.gz", ".tgz")):
+            self.zip = None
+            if lower.endswith((".tar.gz", ".tgz")):
+                # tarfile sam zapisałby w nagłówku gzip bieżący czas
+                self.gzip = gzip.GzipFile(path, 'wb', mtime=0)
+                self.tar = tarfile.open(fileobj=self.gzip, mode='w')
+            else:
+                self.tar = tarfile.open(path, 'w')
+        else:
+            raise ValueError(f"Nieobsługiwany format archiwum: {path} (.zip, .tar, .tar.gz, .tgz)")
+        self.names = set()
+
+    def add(self, name, content):
+        name = name.replace(os.sep, "/")
+        if name in self.names:
+            raise ValueError(f"Powtórzona nazwa pliku w archiwum: {name}")
+        self.names.add(name)
+        if self.zip:
+            info = zipfile.ZipInfo(name, date_time=ZIP_DATE_TIME)
+            info.external_attr = 0o644 << 16  # Jak writestr z samą nazwą - inaczej plik bez uprawnień
+            info.compress_type = (zipfile.ZIP_STORED if name.lower().endswith(STORED_EXTENSIONS)
+                                  else zipfile.ZIP_DEFLATED)
+            self.zip.writestr(info, content)
+        else:
+            info = tarfile.TarInfo(name)  # mtime=0 - stała suma kontrolna
+            info.size = len(content)
+            self.tar.addfile(info, io.BytesIO(content))
+
+    def close(self):
+        (self.zip or self.tar).close()
+        if self.gzip:
+            self.gzip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_tasks(tasks, workers=None, window=None):
+    """Wykonuje zadania w puli procesów, zwraca wyniki w kolejności wejścia.
+
+    Liczba zadań w locie jest ograniczona, więc pamięć nie rośnie
+    z rozmiarem pliku zadań.
+    """
+    workers = workers or os.cpu_count() or 1
+    window = window or workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        try:
+            for task in tasks:
+                pending.append(executor.submit(_run_safe, task))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            # Przerwany przebieg (np. nieczytelny kod) - nie czekamy na zadania w kolejce
+            for future in pending:
+                future.cancel()
+
+
+def add_render_arguments(parser):
+    """Domyślne opcje renderowania i magazynu macierzy (wspólne z qr_watch)"""
+    parser.add_argument("--format", choices=["png", "svg", "svgz"], default="png", help="domyślny format pliku")
+    parser.add_argument("--fill-color", default="#000000", help="domyślny kolor QR")
+    parser.add_argument("--back-color", default="#FFFFFF", help="domyślny kolor tła")
+    parser.add_argument("--style", default="Kwadraty", help="domyślny styl punktów")
+    parser.add_argument("--fill-style", default=qr_engine.DEFAULT_FILL,
+                        help="wypełnienie: solid, radial, square, horizontal, vertical, image")
+    parser.add_argument("--end-color", default=qr_engine.DEFAULT_END_COLOR, help="kolor końcowy gradientu")
+    parser.add_argument("--fill-image", default=None, help="obraz wypełnienia (dla --fill-style image)")
+    parser.add_argument("--box-size", type=int, default=10, help="domyślny rozmiar modułu")
+    parser.add_argument("--error-correction", choices=qr_engine.ERROR_CORRECTION_LEVELS, default="Q",
+                        help="domyślny poziom korekcji")
+    parser.add_argument("--logo", default=None, help="domyślne logo")
+    parser.add_argument("--logo-scale", default=str(qr_engine.LOGO_SCALE),
+                        help="bok logo jako ułamek boku kodu albo auto (największe czytelne)")
+    parser.add_argument("--verify", type=float, default=0.0, metavar="RATE",
+                        help="odczytaj taką część kodów (0-1) i przerwij na pierwszym nieczytelnym")
+    parser.add_argument("--qr-version", type=int, choices=range(1, 41), default=None, metavar="1-40",
+                        help="stała wersja kodu (bez dopasowania do treści)")
+    parser.add_argument("--mask", type=int, choices=range(8), default=None, metavar="0-7",
+                        help="stała maska (bez wyboru wg kar)")
+    parser.add_argument("--png-mode", choices=qr_engine.PNG_MODES, default="auto",
+                        help="auto - 1 bit lub paleta, gdy wystarczą; rgb - pełne RGB")
+    parser.add_argument("--optimize", action="store_true", help="dodatkowa optymalizacja PNG (wolniej)")
+    parser.add_argument("--compress-level", type=int, choices=range(10), default=None, metavar="0-9",
+                        help="poziom kompresji zlib dla PNG")
+    parser.add_argument("--matrix-store", default=None,
+                        help="katalog trwałego magazynu zakodowanych macierzy (jak QR_MATRIX_STORE)")
+    parser.add_argument("--matrix-store-mb", type=float, default=None, help="limit rozmiaru magazynu w MB")
+
+
+def render_defaults(parser, args):
+    """Sprawdza opcje z add_render_arguments i zwraca słownik domyślnych opcji zadań"""
+    if not 0 <= args.verify <= 1:
+        parser.error("--verify: podaj ułamek zadań od 0 do 1")
+    try:
+        logo_scale({}, {"logo_scale": args.logo_scale})
+        qr_engine.resolve_fill(args.fill_style)
+    except ValueError as e:
+        parser.error(str(e))
+
+    # Procesy robocze dziedziczą zmienne środowiskowe
+    if args.matrix_store:
+        os.environ[qr_engine.MATRIX_STORE_ENV] = args.matrix_store
+    if args.matrix_store_mb:
+        os.environ[qr_engine.MATRIX_STORE_MB_ENV] = str(args.matrix_store_mb)
+
+    return {
+        "fill_color": args.fill_color,
+        "back_color": args.back_color,
+        "style": args.style,
+        "fill_style": args.fill_style,
+        "end_color": args.end_color,
+        "fill_image": args.fill_image,
+        "box_size": args.box_size,
+        "error_correction": args.error_correction,
+        "logo": args.logo,
+        "logo_scale": args.logo_scale,
+        "verify": args.verify,
+        "format": args.format,
+        "png_mode": args.png_mode,
+        "optimize": args.optimize,
+        "compress_level": args.compress_level,
+        "version": args.qr_version,
+        "mask": args.mask
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Wsadowe generowanie kodów QR z pliku CSV/JSONL")
+    parser.add_argument("jobs", help="plik zadań (.csv lub .jsonl)")
+    parser.add_argument("-o", "--output-dir", default="qr_output", help="katalog wynikowy")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="liczba procesów roboczych")
+    parser.add_argument("--timings", default=None, help="zapisz czasy etapów każdego zadania (JSON lines)")
+    parser.add_argument("--archive", default=None,
+                        help="zapisuj do archiwum .zip/.tar/.tar.gz zamiast do katalogu")
+    parser.add_argument("--manifest", default=None,
+                        help="plik CSV z treścią, nazwą pliku i SHA-256 (domyślnie obok archiwum)")
+    add_render_arguments(parser)
+    args = parser.parse_args(argv)
+    defaults = render_defaults(parser, args)
+    if args.archive:
+        output_dir = None
+        archive = ArchiveWriter(args.archive)
+        manifest_path = args.manifest or args.archive + ".manifest.csv"
+    else:
+        output_dir = args.output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        archive = None
+        manifest_path = args.manifest
+    tasks = ((index, job, defaults, output_dir) for index, job in enumerate(read_jobs(args.jobs)))
+
+    timing_log = qr_timing.TimingLog(args.timings) if args.timings else None
+    manifest_file = open(manifest_path, 'w', newline='', encoding='utf-8') if manifest_path else None
+    manifest = csv.writer(manifest_file) if manifest_file else None
+    if manifest:
+        manifest.writerow(MANIFEST_FIELDS)
+
+    done = failed = cache_hits = store_hits = verified = 0
+    stopped = None
+    try:
+        # Wyniki przychodzą w kolejności zadań, a w locie jest ich najwyżej kilka
+        # razy tyle co procesów - pamięć nie zależy od liczby kodów
+        with closing(run_tasks(tasks, args.workers)) as results:
+            for index, path, error, cache_hit, timing, output in results:
+                payload, digest, size, content = output
+                cache_hits += cache_hit
+                store_hits += timing["store_hit"]
+                verified += timing["verified"]
+                if timing_log:
+                    timing_log.write(timing)
+                if timing["unreadable"]:
+                    failed += 1
+                    stopped = index
+                    print(f"Zadanie {index}: kod nieczytelny - {error}", file=sys.stderr)
+                    break
+                if not error and archive:
+                    try:
+                        archive.add(path, content)
+                    except ValueError as e:
+                        error = str(e)
+                if error:
+                    failed += 1
+                    print(f"Zadanie {index}: błąd - {error}", file=sys.stderr)
+                    continue
+                done += 1
+                if manifest:
+                    manifest.writerow((index, path, payload, digest, size))
+    finally:
+        if archive:
+            archive.close()
+        if manifest_file:
+            manifest_file.close()
+    print(f"Wygenerowano: {done}, błędy: {failed}")
+    if args.verify:
+        print(f"Weryfikacja odczytu: sprawdzono {verified}")
+    if stopped is not None:
+        print(f"Przerwano po nieczytelnym kodzie w zadaniu {stopped}", file=sys.stderr)
+    if archive:
+        print(f"Archiwum: {args.archive}")
+    if manifest_path:
+        print(f"Manifest: {manifest_path}")
+    print(f"Pamięć macierzy: trafienia {cache_hits}, chybienia {done + failed - cache_hits}")
+    if os.environ.get(qr_engine.MATRIX_STORE_ENV):
+        print(f"Magazyn macierzy: trafienia {store_hits}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
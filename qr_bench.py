@@ -0,0 +1,953 @@
+"""Pomiary wydajności silnika QR.
+
+Przykłady:
+    python qr_bench.py svg --versions 10 25 40
+    python qr_bench.py raster --box-sizes 10 20 40
+    python qr_bench.py encode --versions 5 20 40
+    python qr_bench.py suite --save bench_baseline.json
+    python qr_bench.py suite --compare bench_baseline.json --threshold 0.25
+    python qr_bench.py startup --import-budget-ms 80 --window-budget-ms 500
+    python qr_bench.py store --count 10000
+    python qr_bench.py export --styles Kwadraty Kropki
+    python qr_bench.py verify --versions 1 10 25 40
+    python qr_bench.py strips --box-sizes 20 50 100 --ceiling-mb 64
+    python qr_bench.py png --version 10 --box-size 10
+    python qr_bench.py watch --count 100000 --budget-s 10
+    python qr_bench.py fill --version 10 --box-size 8
+    python qr_bench.py split --chars 20000 --levels M Q
+    python qr_bench.py same --versions 1 10 40
+
+Tryb "suite" mierzy czas i szczytową pamięć każdego etapu (kodowanie,
+rysowanie, logo, SVG) dla macierzy wersji, poziomów korekcji, stylów,
+rozmiarów modułu i wariantów z logo/bez logo. Pamięć liczy tracemalloc,
+czyli alokacje Pythona i NumPy (bufory obrazów PIL nie są w nim widoczne).
+
+Tryb "startup" sprawdza w świeżych procesach czas importu okna aplikacji
+i (gdy jest ekran) czas zbudowania okna oraz to, że qrcode, PIL i NumPy
+nie są ładowane przy starcie. Kończy się kodem 1 po przekroczeniu budżetu.
+
+Tryb "store" porównuje kodowanie z odczytem z magazynu na dysku (qr_store)
+w nowej "sesji" i sprawdza, że macierze są identyczne, uszkodzony rekord
+jest wykrywany, a limit rozmiaru jest przestrzegany.
+
+Tryb "verify" sprawdza wbudowany dekoder (qr_verify): poprawianie
+wstrzykniętych błędów Reeda-Solomona, odczyt narysowanych kodów we
+wszystkich stylach i poziomach korekcji oraz to, że dopasowane logo
+rośnie z poziomem korekcji.
+
+Tryb "strips" zapisuje duże PNG (wersja 40, moduł do 100 px) pasami
+i w całości, każdy w świeżym procesie, i porównuje szczyt pamięci
+procesu (ru_maxrss) z limitem --ceiling-mb. Kończy się kodem 1, gdy
+zapis pasami przekroczy limit.
+
+Tryb "png" porównuje rozmiar pliku i czas kodowania PNG w pełnym RGB
+z trybem auto (1 bit / paleta), z optymalizacją i różnymi poziomami
+kompresji, oraz sprawdza, że odczytane piksele są takie same.
+
+Tryb "watch" sprawdza katalog obserwowany (qr_watch): po edycji pliku
+zadań renderowane są tylko zmienione zadania, a usunięte są kasowane;
+potem mierzy ponowne przetworzenie niezmienionego pliku z --count
+zadaniami (rejestr i puste pliki wynikowe przygotowane wprost, bez
+renderowania) i kończy się kodem 1 po przekroczeniu --budget-s.
+
+Tryb "fill" porównuje gradienty i wypełnienie obrazem liczone w NumPy
+z maskami kolorów qrcode (StyledPilImage) - czas i największą różnicę
+kanału; kończy się kodem 1, gdy przekroczy --tolerance.
+
+Tryb "split" dzieli dużą treść (wizytówka ze zdjęciem w base64) na
+sekwencję kodów (qr_split), koduje je po kolei i w puli procesów, odczytuje
+każdy kod wbudowanym dekoderem i sprawdza nagłówki łączenia kodów oraz
+złożoną treść. Potem mierzy licznik pojemności przy pisaniu znak po znaku
+(przyrostowo vs od nowa) i sprawdza, że wynik jest ten sam.
+
+Tryb "same" koduje treść raz i z tej jednej macierzy rysuje PNG i SVG,
+po czym porównuje moduły: środki modułów odczytane z PNG, komórki
+ścieżki lub elementy <use> z SVG i samą macierz. Kończy się kodem 1,
+gdy którykolwiek format się różni.
+"""
+import argparse
+import gzip
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from PIL import Image, ImageDraw
+
+import qr_engine
+
+GUI_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Generator QR Pro 2.py")
+HEAVY_MODULES = ("qrcode", "PIL", "numpy")
+
+# Uruchamiane w osobnym procesie, żeby mierzyć zimny start
+STARTUP_PROBE = """
+import json, runpy, sys, time
+start = time.perf_counter()
+app_module = runpy.run_path(sys.argv[1], run_name="qr_startup")
+result = {"import_ms": (time.perf_counter() - start) * 1000,
+          "heavy": [name for name in sys.argv[2:] if name in sys.modules],
+          "window_ms": None}
+try:
+    import tkinter
+    start = time.perf_counter()
+    root = tkinter.Tk()
+    app_module["QRGeneratorPro"](root)
+    # Przed update() - potem wątek roboczy zaczyna wczytywać moduły w tle
+    result["heavy_window"] = [name for name in sys.argv[2:] if name in sys.modules]
+    root.update()
+    result["window_ms"] = (time.perf_counter() - start) * 1000
+    root.destroy()
+except tkinter.TclError:
+    pass  # Brak ekranu - mierzymy tylko import
+print(json.dumps(result))
+"""
+
+# Zapis jednego dużego PNG w osobnym procesie - szczyt pamięci ponad stan po imporcie i kodowaniu
+STRIPS_PROBE = """
+import json, os, resource, sys, time
+import qr_engine
+from qr_bench import matrix_for_version
+mode, version, box_size, style, path, logo_path = sys.argv[1:7]
+matrix = matrix_for_version(int(version))
+qr_engine.warm_up()
+unit = 1024 * 1024 if sys.platform == "darwin" else 1024
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+if mode == "strips":
+    qr_engine.save_png(matrix, path, style=style, box_size=int(box_size), logo_path=logo_path or None)
+else:
+    img = qr_engine.rasterize(matrix, style=style, box_size=int(box_size))
+    if logo_path:
+        qr_engine.paste_logo(img, logo_path)
+    img.convert("RGB").save(path)
+elapsed = time.perf_counter() - start
+peak = (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before) * unit
+print(json.dumps({"ms": elapsed * 1000, "peak_mb": peak / 1024 / 1024, "bytes": os.path.getsize(path)}))
+"""
+
+
+def timed(func, repeat):
+    """Najlepszy czas z kilku powtórzeń (w sekundach) i wynik ostatniego wywołania"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def peak_memory(func):
+    """Szczytowa pamięć (KiB) zajęta w trakcie func() wg tracemalloc"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def bench_payload(version):
+    return f"QR-BENCH-{version}"
+
+
+def matrix_for_version(version, error_correction="L"):
+    """Macierz dokładnie danej wersji (krótka treść, wersja startowa = version)"""
+    return qr_engine.encode(bench_payload(version), error_correction, version=version)
+
+
+def make_logo(path):
+    """Powtarzalne logo testowe 1024x1024 z przezroczystością"""
+    logo = Image.new("RGBA", (1024, 1024), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(logo)
+    draw.ellipse((0, 0, 1023, 1023), fill=(74, 111, 165, 255))
+    draw.rectangle((256, 448, 767, 575), fill=(255, 255, 255, 255))
+    logo.save(path)
+    return path
+
+
+def legacy_svg(matrix, fill_color, back_color, style, box_size=qr_engine.SVG_BOX_SIZE):
+    """Dotychczasowy zapis SVG (element na moduł, sklejanie +=) - punkt odniesienia"""
+    size = matrix.size * box_size
+    svg_content = f'''<svg xmlns="http://www.w3.org/2000/svg"
+                     width="{size}"
+                     height="{size}"
+                     viewBox="0 0 {size} {size}">
+                     <rect width="100%" height="100%" fill="{back_color}"/>'''
+    modules = matrix.modules
+    for y in range(len(modules)):
+        for x in range(len(modules)):
+            if modules[y][x]:
+                if style == "Kropki":
+                    svg_content += f'<circle cx="{(x + 0.5) * box_size}" cy="{(y + 0.5) * box_size}" r="{box_size / 2}" fill="{fill_color}"/>'
+                elif style == "Zaokrąglone":
+                    svg_content += f'<rect x="{x * box_size}" y="{y * box_size}" width="{box_size}" height="{box_size}" rx="{box_size / 4}" ry="{box_size / 4}" fill="{fill_color}"/>'
+                else:
+                    svg_content += f'<rect x="{x * box_size}" y="{y * box_size}" width="{box_size}" height="{box_size}" fill="{fill_color}"/>'
+    svg_content += '</svg>'
+    return svg_content
+
+
+def bench_svg(args):
+    print(f"{'wersja':>6} {'styl':<22} {'stary B':>10} {'nowy B':>10} {'svgz B':>9} {'stary ms':>9} {'nowy ms':>9}")
+    for version in args.versions:
+        matrix = matrix_for_version(version)
+        for style in args.styles:
+            old_time, old_svg = timed(lambda: legacy_svg(matrix, "#000000", "#FFFFFF", style), args.repeat)
+            new_time, new_svg = timed(lambda: qr_engine.render_svg(matrix, "#000000", "#FFFFFF", style), args.repeat)
+            old_size = len(old_svg.encode('utf-8'))
+            new_size = len(new_svg.encode('utf-8'))
+            svgz_size = len(gzip.compress(new_svg.encode('utf-8')))
+            print(f"{version:>6} {style:<22} {old_size:>10} {new_size:>10} {svgz_size:>9} "
+                  f"{old_time * 1000:>9.2f} {new_time * 1000:>9.2f}")
+
+
+def bench_raster(args):
+    qr_engine.warm_up()  # import NumPy i qrcode poza pomiarem
+    print(f"{'wersja':>6} {'styl':<22} {'moduł':>5} {'StyledPil ms':>12} {'NumPy ms':>9} {'x':>6} {'identyczne':>10}")
+    for version in args.versions:
+        matrix = matrix_for_version(version)
+        for style in args.styles:
+            for box_size in args.box_sizes:
+                render = lambda func: func(matrix, args.fill_color, args.back_color, style, box_size)
+                old_time, old_img = timed(lambda: render(qr_engine.rasterize_reference), args.repeat)
+                new_time, new_img = timed(lambda: render(qr_engine.rasterize), args.repeat)
+                same = old_img.tobytes() == new_img.tobytes()
+                print(f"{version:>6} {style:<22} {box_size:>5} {old_time * 1000:>12.1f} "
+                      f"{new_time * 1000:>9.1f} {old_time / new_time:>6.1f} {'tak' if same else 'NIE':>10}")
+
+
+def bench_encode(args):
+    """Kodowanie: qrcode (QRCode.make) vs kary w NumPy vs stała wersja i maska"""
+    import qrcode
+    import qr_encoder
+    qr_engine.warm_up()
+    print(f"{'wersja':>6} {'kor.':>4} {'maska':>5} {'qrcode ms':>10} {'NumPy ms':>9} {'x':>6} "
+          f"{'stała ms':>9} {'identyczne':>10}")
+    for version in args.versions:
+        for level in args.levels:
+            data = bench_payload(version) * args.payload_repeat
+            constant = qr_engine.error_correction_constant(level)
+
+            def reference():
+                qr = qrcode.QRCode(version=version, error_correction=constant)
+                qr.add_data(data)
+                qr.make(fit=True)
+                return qr
+
+            old_time, old_qr = timed(reference, args.repeat)
+            new_time, new_qr = timed(lambda: qr_encoder.make_qr(data, constant, version), args.repeat)
+            mask = new_qr.chosen_mask
+            fixed_time, fixed_qr = timed(
+                lambda: qr_encoder.make_qr(data, constant, old_qr.version, mask, fit=False), args.repeat)
+            reference_modules = qr_encoder.modules_tuple(old_qr)
+            same = (reference_modules == qr_encoder.modules_tuple(new_qr)
+                    == qr_encoder.modules_tuple(fixed_qr))
+            print(f"{old_qr.version:>6} {level:>4} {mask:>5} {old_time * 1000:>10.1f} {new_time * 1000:>9.1f} "
+                  f"{old_time / new_time:>6.1f} {fixed_time * 1000:>9.1f} {'tak' if same else 'NIE':>10}")
+
+
+def suite_cases(args, logo_path):
+    """Etapy do zmierzenia: klucz -> funkcja; każdy etap tylko raz"""
+    cases = {}
+    for version in args.versions:
+        for level in args.levels:
+            matrix = matrix_for_version(version, level)
+            cases[f"encode v{version} {level}"] = (
+                lambda v=version, l=level: qr_engine.encode(bench_payload(v), l, version=v, cache=False))
+            for style in args.styles:
+                cases[f"svg v{version} {level} {style}"] = (
+                    lambda m=matrix, s=style: qr_engine.render_svg(m, args.fill_color, args.back_color, s))
+                for box_size in args.box_sizes:
+                    base = f"v{version} {level} {style} box{box_size}"
+                    cases[f"rasterize {base}"] = (
+                        lambda m=matrix, s=style, b=box_size:
+                        qr_engine.rasterize(m, args.fill_color, args.back_color, s, b))
+                    if logo_path:
+                        img = qr_engine.rasterize(matrix, args.fill_color, args.back_color, style, box_size)
+                        cases[f"logo {base}"] = (
+                            lambda i=img: qr_engine.paste_logo(i.copy(), logo_path))
+    return cases
+
+
+def run_suite(args, logo_path):
+    results = {}
+    for key, func in suite_cases(args, logo_path).items():
+        func()  # rozgrzewka - wypełnia pamięci podręczne wzorców i logo
+        seconds, _ = timed(func, args.repeat)
+        results[key] = {"seconds": seconds, "peak_kib": peak_memory(func)}
+        print(f"{key:<55} {seconds * 1000:>9.2f} ms {results[key]['peak_kib']:>10.0f} KiB", flush=True)
+    return results
+
+
+def compare(results, baseline, threshold, min_ms):
+    """Zwraca listę regresji względem zapisanej bazy"""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        slower = result["seconds"] - base["seconds"]
+        if result["seconds"] > base["seconds"] * (1 + threshold) and slower * 1000 > min_ms:
+            regressions.append(f"{key}: czas {base['seconds'] * 1000:.2f} -> {result['seconds'] * 1000:.2f} ms")
+        if result["peak_kib"] > base["peak_kib"] * (1 + threshold) and result["peak_kib"] - base["peak_kib"] > 64:
+            regressions.append(f"{key}: pamięć {base['peak_kib']:.0f} -> {result['peak_kib']:.0f} KiB")
+    return regressions
+
+
+def bench_suite(args):
+    if args.full:
+        args.versions = list(range(1, 41))
+    with tempfile.TemporaryDirectory() as tmp:
+        logo_path = None
+        if not args.no_logo:
+            logo_path = args.logo or make_logo(os.path.join(tmp, "logo.png"))
+        results = run_suite(args, logo_path)
+
+    if args.save:
+        report = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "repeat": args.repeat,
+                "created": time.strftime("%Y-%m-%d %H:%M:%S")
+            },
+            "results": results
+        }
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=1, ensure_ascii=False)
+        print(f"Zapisano bazę: {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold, args.min_ms)
+        for line in regressions:
+            print(f"REGRESJA {line}")
+        print(f"Porównano z {args.compare}: regresji {len(regressions)}")
+        return 1 if regressions else 0
+    return 0
+
+
+def startup_probe():
+    # Katalog programu jako bieżący - runpy uruchamia okno, które importuje qr_engine
+    output = subprocess.run([sys.executable, "-c", STARTUP_PROBE, GUI_SCRIPT, *HEAVY_MODULES],
+                            capture_output=True, text=True, check=True, cwd=os.path.dirname(GUI_SCRIPT)).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def bench_startup(args):
+    runs = [startup_probe() for _ in range(args.repeat)]
+    import_ms = min(run["import_ms"] for run in runs)
+    windows = [run["window_ms"] for run in runs if run["window_ms"] is not None]
+    window_ms = min(windows) if windows else None
+    failures = []
+
+    print(f"Import okna: {import_ms:.1f} ms (budżet {args.import_budget_ms:.0f} ms)")
+    if import_ms > args.import_budget_ms:
+        failures.append("czas importu")
+    if window_ms is None:
+        print("Budowa okna: pominięto (brak ekranu)")
+    else:
+        print(f"Budowa okna: {window_ms:.1f} ms (budżet {args.window_budget_ms:.0f} ms)")
+        if window_ms > args.window_budget_ms:
+            failures.append("czas budowy okna")
+
+    # Ciężkie moduły mają się ładować dopiero w tle lub przy pierwszym renderowaniu
+    heavy = sorted({name for run in runs for name in run["heavy"] + run.get("heavy_window", [])})
+    if heavy:
+        print(f"Moduły załadowane przy starcie: {', '.join(heavy)}")
+        failures.append("ciężkie importy")
+
+    for failure in failures:
+        print(f"PRZEKROCZONO: {failure}")
+    return 1 if failures else 0
+
+
+def bench_export(args):
+    """Eksport wielu rozmiarów: osobne generowanie każdego vs jedna macierz dla wszystkich"""
+    import qr_export
+    qr_engine.warm_up()
+    data = bench_payload(args.version) * 3
+    with tempfile.TemporaryDirectory() as directory:
+        logo_path = make_logo(os.path.join(directory, "logo.png"))
+        print(f"{'styl':<22} {'osobno ms':>10} {'razem ms':>9} {'x':>6}")
+        for style in args.styles:
+            def separate():
+                # Jak dotąd: zmiana rozmiaru modułu i pełne generowanie dla każdego rozmiaru
+                matrix = qr_engine.encode(data, "H", cache=False)
+                for target in qr_export.plan_targets(matrix, args.scales):
+                    matrix = qr_engine.encode(data, "H", cache=False)
+                    img = qr_engine.rasterize(matrix, style=style, box_size=target.box_size)
+                    qr_engine.paste_logo(img, logo_path)
+                    qr_export.save_image(img, os.path.join(directory, f"a@{target.suffix}.png"), "PNG", target.dpi)
+
+            def together():
+                matrix = qr_engine.encode(data, "H", cache=False)
+                qr_export.export_sizes(matrix, os.path.join(directory, "b"), args.scales, style=style,
+                                       logo_path=logo_path)
+
+            separate_time, _ = timed(separate, args.repeat)
+            together_time, _ = timed(together, args.repeat)
+            print(f"{style:<22} {separate_time * 1000:>10.1f} {together_time * 1000:>9.1f} "
+                  f"{separate_time / together_time:>6.2f}")
+
+
+def bench_store(args):
+    """Magazyn macierzy: kodowanie vs odczyt w nowej sesji, integralność i limit rozmiaru"""
+    import qr_store
+    qr_engine.warm_up()
+    keys = [(f"https://example.com/produkt/{i}", args.level, qr_engine.DEFAULT_VERSION, None, True, True)
+            for i in range(args.count)]
+    failures = 0
+    with tempfile.TemporaryDirectory() as directory:
+        store = qr_store.MatrixStore(directory)
+        start = time.perf_counter()
+        matrices = [qr_engine._encode(*key) for key in keys]
+        encode_time = time.perf_counter() - start
+        start = time.perf_counter()
+        for key, matrix in zip(keys, matrices):
+            store.put(key, matrix.version, matrix.modules)
+        put_time = time.perf_counter() - start
+        store.close()
+
+        # Nowa sesja - indeks budowany od zera z pliku
+        start = time.perf_counter()
+        store = qr_store.MatrixStore(directory)
+        open_time = time.perf_counter() - start
+        start = time.perf_counter()
+        loaded = [store.get(key) for key in keys]
+        get_time = time.perf_counter() - start
+        same = all(entry == (matrix.version, matrix.modules) for entry, matrix in zip(loaded, matrices))
+        failures += not same
+        stats = store.stats()
+        per_code = 1000 / len(keys)
+        print(f"Kody: {len(keys)}, magazyn: {stats['bytes'] / 1024:.0f} KiB")
+        print(f"Kodowanie: {encode_time * per_code:.3f} ms/kod, zapis: {put_time * per_code:.3f} ms/kod")
+        print(f"Otwarcie magazynu: {open_time * 1000:.1f} ms, odczyt: {get_time * per_code:.3f} ms/kod "
+              f"({encode_time / get_time:.0f}x szybciej), identyczne: {'tak' if same else 'NIE'}")
+
+        # Uszkodzony bajt w bitach ostatniego rekordu musi dać chybienie, nie złą macierz
+        store.close()
+        path = os.path.join(directory, sorted(os.listdir(directory))[-1])
+        with open(path, 'r+b') as f:
+            f.seek(-1, os.SEEK_END)
+            last = f.read(1)
+            f.seek(-1, os.SEEK_END)
+            f.write(bytes((last[0] ^ 0xFF,)))
+        store = qr_store.MatrixStore(directory)
+        detected = store.verify()[1] == 1 and store.get(keys[-1]) is None
+        failures += not detected
+        print(f"Uszkodzony rekord wykryty: {'tak' if detected else 'NIE'}")
+        store.close()
+
+    with tempfile.TemporaryDirectory() as directory:
+        limit = 64 * 1024
+        store = qr_store.MatrixStore(directory, max_bytes=limit)
+        for key, matrix in zip(keys, matrices):
+            store.put(key, matrix.version, matrix.modules)
+        stats = store.stats()
+        within = stats["bytes"] <= limit
+        failures += not within
+        print(f"Limit {limit // 1024} KiB: zajęte {stats['bytes'] / 1024:.0f} KiB, rekordy {stats['records']}, "
+              f"pliki {stats['generations']} - {'OK' if within else 'PRZEKROCZONY'}")
+        store.close()
+    return 1 if failures else 0
+
+
+def bench_verify(args):
+    """Dekoder: korekcja wstrzykniętych błędów, odczyt obrazów i dopasowanie logo"""
+    import random
+    import qr_verify
+    from qrcode.base import rs_blocks
+    from qrcode.util import BitBuffer, create_bytes
+    qr_engine.warm_up()
+    rng = random.Random(args.seed)
+    failures = 0
+
+    # Do pojemności korekcji (połowa bajtów korekcji) każdy blok musi wrócić do oryginału
+    corrected = 0
+    for _ in range(args.trials):
+        version = rng.randint(1, 40)
+        level = rng.choice(qr_engine.ERROR_CORRECTION_LEVELS)
+        block = rng.choice(rs_blocks(version, qr_engine.error_correction_constant(level)))
+        ec_count = block.total_count - block.data_count
+        # Bajty korekcji liczy qrcode - jeden blok, więc bez przeplatania
+        buffer = BitBuffer()
+        for _ in range(block.data_count):
+            buffer.put(rng.randrange(256), 8)
+        original = create_bytes(buffer, [block])
+        damaged = list(original)
+        errors = rng.randint(0, ec_count // 2)
+        for position in rng.sample(range(len(damaged)), errors):
+            damaged[position] ^= rng.randrange(1, 256)
+        try:
+            found = qr_verify.rs_correct(damaged, ec_count)
+            corrected += damaged == original and found == errors
+        except qr_verify.ScanError:
+            pass
+    failures += corrected != args.trials
+    print(f"Reed-Solomon: poprawione {corrected}/{args.trials} bloków z błędami do granicy korekcji")
+
+    # Odczyt obrazów: wersje x poziomy korekcji x style
+    for version in args.versions:
+        matrices = [matrix_for_version(version, level) for level in qr_engine.ERROR_CORRECTION_LEVELS]
+        read = total = 0
+        elapsed = 0.0
+        for matrix in matrices:
+            data = bench_payload(version)
+            for style in qr_engine.MODULE_STYLES:
+                img = qr_engine.rasterize(matrix, style=style, box_size=args.box_size)
+                start = time.perf_counter()
+                try:
+                    qr_verify.verify_image(img, data, matrix.size)
+                    read += 1
+                except qr_verify.ScanError as e:
+                    print(f"  wersja {version}-{matrix.error_correction}, {style}: {e}")
+                elapsed += time.perf_counter() - start
+                total += 1
+        failures += read != total
+        print(f"Wersja {version}: odczytane {read}/{total}, {elapsed / total * 1000:.1f} ms/obraz")
+
+    # Dopasowane logo powinno rosnąć z poziomem korekcji
+    with tempfile.TemporaryDirectory() as directory:
+        logo_path = make_logo(os.path.join(directory, "logo.png"))
+        data = "https://example.com/produkt/12345"
+        scales = []
+        for level in ("L", "M", "Q", "H"):
+            matrix = qr_engine.encode(data, level)
+            img = qr_engine.rasterize(matrix, box_size=args.box_size)
+            start = time.perf_counter()
+            scale = qr_verify.find_logo_scale(img, data, matrix.size, logo_path)
+            elapsed = time.perf_counter() - start
+            scales.append(scale)
+            print(f"Logo {level}: {scale:.0%} boku kodu ({elapsed * 1000:.0f} ms)")
+        growing = scales == sorted(scales) and scales[-1] > scales[0]
+        failures += not growing
+        print(f"Logo rośnie z poziomem korekcji: {'tak' if growing else 'NIE'}")
+    return 1 if failures else 0
+
+
+PNG_VARIANTS = (
+    ("rgb", "rgb", {}),
+    ("auto", "auto", {}),
+    ("auto, poziom 1", "auto", {"compress_level": 1}),
+    ("auto, poziom 9", "auto", {"compress_level": 9}),
+    ("auto, optimize", "auto", {"optimize": True})
+)
+
+
+def bench_png(args):
+    """Rozmiar i czas kodowania PNG: pełne RGB vs najmniejszy wierny tryb pikseli"""
+    import io
+    import numpy as np
+    qr_engine.warm_up()
+    matrix = matrix_for_version(args.version, "Q")
+    failures = 0
+    with tempfile.TemporaryDirectory() as directory:
+        logo_path = make_logo(os.path.join(directory, "logo.png"))
+        cases = [(style, fill, back, None) for style in args.styles for fill, back in args.colors]
+        cases.append((args.styles[0], *args.colors[0], logo_path))
+        print(f"{'styl':<22} {'kolory':<16} {'logo':<5} {'wariant':<16} {'tryb':<5} {'bajty':>8} {'ms':>7}")
+        for style, fill, back, logo in cases:
+            img = qr_engine.rasterize(matrix, fill, back, style, args.box_size)
+            if logo:
+                qr_engine.paste_logo(img, logo)
+            expected = np.asarray(img.convert("RGB"))
+            for label, mode, params in PNG_VARIANTS:
+                def encode():
+                    buffer = io.BytesIO()
+                    qr_engine.save_image(img, buffer, "PNG", mode, **params)
+                    return buffer.getvalue()
+                elapsed, content = timed(encode, args.repeat)
+                saved = Image.open(io.BytesIO(content))
+                same = np.array_equal(np.asarray(saved.convert("RGB")), expected)
+                failures += not same
+                print(f"{style:<22} {fill + '/' + back:<16} {'tak' if logo else 'nie':<5} {label:<16} "
+                      f"{saved.mode:<5} {len(content):>8} {elapsed * 1000:>7.2f}{'' if same else '  RÓŻNE PIKSELE'}")
+
+        # Duży wydruk zapisywany pasami - 1 bit zamiast RGB
+        path = os.path.join(directory, "big.png")
+        for mode in qr_engine.PNG_MODES:
+            elapsed, _ = timed(lambda: qr_engine.save_png(matrix, path, box_size=args.big_box_size, png_mode=mode), 1)
+            print(f"Pasami, moduł {args.big_box_size} px, {mode}: {os.path.getsize(path)} B, {elapsed * 1000:.0f} ms")
+    return 1 if failures else 0
+
+
+def strips_probe(mode, version, box_size, style, path, logo_path):
+    output = subprocess.run([sys.executable, "-c", STRIPS_PROBE, mode, str(version), str(box_size), style, path,
+                             logo_path or ""], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def bench_strips(args):
+    """Duże PNG: zapis pasami vs cały obraz w pamięci - czas i szczyt pamięci procesu"""
+    failures = 0
+    with tempfile.TemporaryDirectory() as directory:
+        logo_path = make_logo(os.path.join(directory, "logo.png"))
+        path = os.path.join(directory, "big.png")
+        print(f"{'moduł':>6} {'bok px':>7} {'pasami ms':>10} {'pasami MB':>10} {'całość ms':>10} {'całość MB':>10}")
+        for box_size in args.box_sizes:
+            side = (4 * args.version + 17 + 2 * qr_engine.DEFAULT_BORDER) * box_size
+            strips = strips_probe("strips", args.version, box_size, args.style, path, logo_path)
+            if box_size <= args.full_max_box:
+                full = strips_probe("full", args.version, box_size, args.style, path, logo_path)
+                full_text = f"{full['ms']:>10.0f} {full['peak_mb']:>10.1f}"
+            else:
+                full_text = f"{'-':>10} {'-':>10}"
+            within = strips["peak_mb"] <= args.ceiling_mb
+            failures += not within
+            print(f"{box_size:>6} {side:>7} {strips['ms']:>10.0f} {strips['peak_mb']:>10.1f} {full_text}"
+                  f"{'' if within else '  PRZEKROCZONO'}")
+    print(f"Limit pamięci zapisu pasami: {args.ceiling_mb:.0f} MB")
+    return 1 if failures else 0
+
+
+def write_jobs(path, jobs):
+    with open(path, 'w', encoding='utf-8') as f:
+        for job in jobs:
+            f.write(json.dumps(job, ensure_ascii=False) + "\n")
+
+
+def bench_watch(args):
+    """Katalog obserwowany: renderowanie tylko zmian i czas przebiegu bez zmian"""
+    import qr_batch
+    import qr_watch
+    parser = argparse.ArgumentParser()
+    qr_batch.add_render_arguments(parser)
+    defaults = qr_batch.render_defaults(parser, parser.parse_args([]))
+    failures = 0
+    with tempfile.TemporaryDirectory() as directory:
+        output_root = os.path.join(directory, "out")
+        small = os.path.join(directory, "small.jsonl")
+        jobs = [{"data": f"https://example.com/p/{i}"} for i in range(args.small)]
+        write_jobs(small, jobs)
+        expected = [(args.small, 0, 0)]
+        reports = [qr_watch.process_file(small, output_root, defaults)]
+        reports.append(qr_watch.process_file(small, output_root, defaults))
+        expected.append((0, args.small, 0))
+        # Dwa zmienione zadania, jedno nowe, trzy usunięte
+        jobs[0]["fill_color"] = "#1F4E79"
+        jobs[1]["data"] += "?v=2"
+        jobs = jobs[:-3] + [{"data": "nowe", "output": "nowe.png"}]
+        write_jobs(small, jobs)
+        reports.append(qr_watch.process_file(small, output_root, defaults))
+        expected.append((3, args.small - 5, 3))
+        for report, (rendered, unchanged, removed) in zip(reports, expected):
+            ok = (report.rendered, report.unchanged, report.removed, report.failed) == (rendered, unchanged, removed, 0)
+            failures += not ok
+            print(report.describe() + ("" if ok else f"  OCZEKIWANO {rendered}/{unchanged}/{removed}"))
+
+        big = os.path.join(directory, "big.jsonl")
+        jobs = [{"data": f"https://example.com/p/{i}", "output": f"{i // 1000:03d}/{i:06d}.png"}
+                for i in range(args.count)]
+        write_jobs(big, jobs)
+        output_dir = os.path.join(output_root, "big")
+        entries = {}
+        for index, job in enumerate(jobs):
+            name = os.path.normpath(qr_batch.output_name(index, job, defaults))
+            entries[name] = qr_watch.entry_hash(qr_batch.job_payload(job), job, defaults,
+                                                [None] * len(qr_watch.FILE_OPTIONS))
+            path = os.path.join(output_dir, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, 'wb').close()
+        qr_watch.write_ledger(os.path.join(output_dir, qr_watch.LEDGER_NAME), entries)
+        start = time.perf_counter()
+        report = qr_watch.process_file(big, output_root, defaults)
+        elapsed = time.perf_counter() - start
+        ok = report.unchanged == args.count and not report.rendered and elapsed <= args.budget_s
+        failures += not ok
+        print(report.describe() + ("" if ok else "  PRZEKROCZONO"))
+        print(f"Bez zmian: {args.count} zadań w {elapsed:.2f} s "
+              f"({elapsed / args.count * 1e6:.1f} µs/zadanie, limit {args.budget_s:g} s)")
+    return 1 if failures else 0
+
+
+def make_fill_image(path):
+    """Obraz wypełnienia z gładkimi przejściami kolorów"""
+    import numpy as np
+    pixels = np.zeros((96, 128, 3), dtype=np.uint8)
+    pixels[:, :, 0] = np.arange(128) * 2
+    pixels[:, :, 1] = np.arange(96)[:, None] * 2
+    pixels[:, :, 2] = 160
+    Image.fromarray(pixels).save(path)
+    return path
+
+
+def bench_fill(args):
+    """Gradienty i wypełnienie obrazem: NumPy vs maski kolorów qrcode"""
+    import numpy as np
+    qr_engine.warm_up()
+    matrix = matrix_for_version(args.version, "Q")
+    failures = 0
+    with tempfile.TemporaryDirectory() as directory:
+        fill_image = make_fill_image(os.path.join(directory, "fill.png"))
+        print(f"{'wypełnienie':<20} {'styl':<22} {'tło':<8} {'NumPy ms':>9} {'qrcode ms':>10} {'różnica':>8}")
+        for fill_style in args.fills:
+            for style in args.styles:
+                for back in args.backs:
+                    options = dict(fill_style=fill_style, end_color=args.end_color, fill_image=fill_image)
+                    fast, img = timed(lambda: qr_engine.rasterize(matrix, args.fill_color, back, style, args.box_size,
+                                                                  **options), args.repeat)
+                    slow, reference = timed(lambda: qr_engine.rasterize_reference(
+                        matrix, args.fill_color, back, style, args.box_size, **options), 1)
+                    difference = np.abs(np.asarray(img, dtype=np.int16)
+                                        - np.asarray(reference.convert("RGB"), dtype=np.int16)).max()
+                    within = difference <= args.tolerance
+                    failures += not within
+                    print(f"{fill_style:<20} {style:<22} {back:<8} {fast * 1000:>9.2f} {slow * 1000:>10.1f} "
+                          f"{difference:>8}{'' if within else '  PRZEKROCZONO'}")
+    print(f"Dopuszczalna różnica kanału: {args.tolerance} (zaokrąglenia na wygładzonych krawędziach)")
+    return 1 if failures else 0
+
+
+SVG_RUN = re.compile(r"M(\d+) (\d+)h(\d+)v1h-\d+z")
+SVG_USE = re.compile(r'<use xlink:href="#m" x="(\d+)" y="(\d+)"/>')
+
+
+def svg_modules(svg, size):
+    """Ciemne moduły z SVG (odcinki ścieżki albo elementy <use>) jako macierz wartości logicznych"""
+    modules = [[False] * size for _ in range(size)]
+    for x, y, length in SVG_RUN.findall(svg):
+        for column in range(int(x), int(x) + int(length)):
+            modules[int(y)][column] = True
+    for x, y in SVG_USE.findall(svg):
+        modules[int(y)][int(x)] = True
+    return modules
+
+
+def png_modules(img, size, box_size, border=qr_engine.DEFAULT_BORDER):
+    """Ciemne moduły odczytane ze środków modułów obrazu"""
+    gray = img.convert("L")
+    center = box_size // 2
+    return [[gray.getpixel(((border + x) * box_size + center, (border + y) * box_size + center)) < 128
+             for x in range(size)] for y in range(size)]
+
+
+def bench_same(args):
+    """PNG i SVG z jednej macierzy: te same moduły w obu formatach"""
+    failures = 0
+    print(f"{'wersja':>6} {'styl':<22} {'PNG':>5} {'SVG':>5}")
+    for version in args.versions:
+        matrix = matrix_for_version(version, "Q")  # Jedno kodowanie na wersję - oba formaty z tego obiektu
+        expected = [[bool(dark) for dark in row] for row in matrix.modules]
+        for style in args.styles:
+            img = qr_engine.rasterize(matrix, style=style, box_size=args.box_size)
+            svg = qr_engine.render_svg(matrix, style=style)
+            png_ok = png_modules(img, matrix.size, args.box_size) == expected
+            svg_ok = svg_modules(svg, matrix.size) == expected
+            failures += not (png_ok and svg_ok)
+            print(f"{version:>6} {style:<22} {'OK' if png_ok else 'RÓŻNE':>5} {'OK' if svg_ok else 'RÓŻNE':>5}")
+    return 1 if failures else 0
+
+
+def large_vcard(chars):
+    """Wizytówka ze zdjęciem w base64 o długości około chars znaków"""
+    import base64
+    import random
+    header = qr_engine.vcard_payload("Zażółć", "Gęślą-Jaźń", "ACME Sp. z o.o.", "+48601234567",
+                                     "biuro@acme.pl", "https://acme.pl")
+    photo = base64.b64encode(random.Random(0).randbytes(chars * 3 // 4)).decode('ascii')
+    lines = [photo[i:i + 74] for i in range(0, len(photo), 74)]
+    return header.replace("END:VCARD", "PHOTO;ENCODING=b;TYPE=JPEG:" + "\n ".join(lines) + "\nEND:VCARD")
+
+
+def bench_split(args):
+    """Podział dużej treści na kody: kodowanie po kolei vs równolegle, odczyt i licznik pojemności"""
+    import qr_segments
+    import qr_split
+    qr_engine.warm_up()
+    text = large_vcard(args.chars)
+    failures = 0
+    print(f"Treść: {len(text)} znaków, procesy: {args.workers or os.cpu_count()}")
+    print(f"{'korekcja':<9} {'tryb':<16} {'kody':>5} {'wersja':>7} {'podział ms':>11} {'po kolei ms':>12} "
+          f"{'równolegle ms':>14}  odczyt")
+    for level in args.levels:
+        for indexed in (None, True):
+            split_time, parts = timed(lambda: qr_split.split(text, level, indexed=indexed), 1)
+            qr_engine.MATRIX_CACHE.clear()
+            serial, matrices = timed(lambda: qr_split.encode_parts(parts, level, workers=1), 1)
+            qr_engine.MATRIX_CACHE.clear()
+            parallel, parallel_matrices = timed(lambda: qr_split.encode_parts(parts, level, args.workers), 1)
+            problems = []
+            if [matrix.modules for matrix in matrices] != [matrix.modules for matrix in parallel_matrices]:
+                problems.append("różne macierze")
+            try:
+                qr_split.verify_parts(parts, matrices, text)
+            except ValueError as e:
+                problems.append(str(e))
+            failures += bool(problems)
+            mode = "łączenie kodów" if parts[0].append else "numerowane"
+            print(f"{level:<9} {mode:<16} {len(parts):>5} {parts[0].version:>7} {split_time * 1000:>11.0f} "
+                  f"{serial * 1000:>12.0f} {parallel * 1000:>14.0f}  {', '.join(problems) or 'OK'}")
+
+    # Pisanie na końcu długiej treści: licznik przyrostowy vs liczenie od nowa
+    meter = qr_split.CapacityMeter()
+    start = len(text) - args.keystrokes
+    meter.update(text[:start])
+    incremental, _ = timed(lambda: [meter.update(text[:end]) for end in range(start + 1, len(text) + 1)], 1)
+    fresh = qr_split.CapacityMeter()
+    full, _ = timed(lambda: fresh.update(text), 1)
+    same = meter.costs == fresh.costs
+    failures += not same
+    print(f"Licznik pojemności: {incremental / args.keystrokes * 1000:.2f} ms na znak przyrostowo, "
+          f"{full * 1000:.0f} ms od nowa ({'ten sam wynik' if same else 'RÓŻNY WYNIK'})")
+    print(f"  {meter.measure(args.levels[0]).describe()}")
+    # Pisanie na początku i w środku - przeliczenie kończy się, gdy stan zrówna się z zapamiętanym
+    for position in (1, len(text) // 2):
+        edited = text[:position] + "Ż" + text[position:]
+        edit_time, steps = timed(lambda: meter.update(edited, position), 1)
+        fresh = qr_split.CapacityMeter()
+        fresh.update(edited)
+        same = meter.costs == fresh.costs
+        failures += not same
+        print(f"  znak na pozycji {position}: {steps} kroków, {edit_time * 1000:.2f} ms "
+              f"({'ten sam wynik' if same else 'RÓŻNY WYNIK'})")
+        meter.update(text)
+    # Dla treści mieszczącej się w kodzie wersja z licznika = wersja z podziału na segmenty
+    for length in (10, 100, 1000):
+        part = text[:length]
+        meter.update(part)
+        for level in args.levels:
+            expected = qr_segments.plan(part, qr_engine.error_correction_constant(level)).version
+            measured = meter.measure(level).version
+            if measured != expected:
+                failures += 1
+                print(f"  {length} znaków, korekcja {level}: licznik - wersja {measured}, podział - {expected}")
+    return 1 if failures else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pomiary wydajności generatora QR")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    svg = commands.add_parser("svg", help="rozmiar i czas zapisu SVG: stary vs strumieniowy")
+    svg.add_argument("--versions", type=int, nargs="+", default=[5, 10, 25, 40])
+    svg.add_argument("--styles", nargs="+", default=["Kwadraty", "Kropki", "Zaokrąglone"])
+    svg.add_argument("--repeat", type=int, default=3)
+    svg.set_defaults(func=bench_svg)
+
+    raster = commands.add_parser("raster", help="czas rysowania PNG: StyledPilImage vs NumPy")
+    raster.add_argument("--versions", type=int, nargs="+", default=[10, 40])
+    raster.add_argument("--styles", nargs="+", default=list(qr_engine.MODULE_STYLES))
+    raster.add_argument("--box-sizes", type=int, nargs="+", default=[10, 20])
+    raster.add_argument("--fill-color", default="#000000")
+    raster.add_argument("--back-color", default="#FFFFFF")
+    raster.add_argument("--repeat", type=int, default=1)
+    raster.set_defaults(func=bench_raster)
+
+    encode = commands.add_parser("encode", help="czas kodowania: qrcode vs kary w NumPy vs stała maska")
+    encode.add_argument("--versions", type=int, nargs="+", default=[1, 5, 10, 20, 30, 40])
+    encode.add_argument("--levels", nargs="+", choices=qr_engine.ERROR_CORRECTION_LEVELS, default=["L", "H"])
+    encode.add_argument("--payload-repeat", type=int, default=1, help="powtórz treść (dłuższe dane)")
+    encode.add_argument("--repeat", type=int, default=3)
+    encode.set_defaults(func=bench_encode)
+
+    suite = commands.add_parser("suite", help="pełny zestaw etapów z bazą JSON i wykrywaniem regresji")
+    suite.add_argument("--versions", type=int, nargs="+", default=[1, 10, 20, 30, 40])
+    suite.add_argument("--full", action="store_true", help="wszystkie wersje 1-40")
+    suite.add_argument("--levels", nargs="+", choices=qr_engine.ERROR_CORRECTION_LEVELS,
+                       default=list(qr_engine.ERROR_CORRECTION_LEVELS))
+    suite.add_argument("--styles", nargs="+", default=list(qr_engine.MODULE_STYLES))
+    suite.add_argument("--box-sizes", type=int, nargs="+", default=[5, 10, 20])
+    suite.add_argument("--fill-color", default="#1A5F9E")
+    suite.add_argument("--back-color", default="#FFFFFF")
+    suite.add_argument("--logo", default=None, help="logo do etapu 'logo' (domyślnie wygenerowane)")
+    suite.add_argument("--no-logo", action="store_true", help="pomiń etap logo")
+    suite.add_argument("--repeat", type=int, default=3)
+    suite.add_argument("--save", default=None, help="zapisz wyniki jako bazę JSON")
+    suite.add_argument("--compare", default=None, help="porównaj z bazą JSON")
+    suite.add_argument("--threshold", type=float, default=0.25, help="dopuszczalny wzrost (0.25 = 25%%)")
+    suite.add_argument("--min-ms", type=float, default=1.0, help="pomijaj różnice czasu poniżej tylu ms")
+    suite.set_defaults(func=bench_suite)
+
+    startup = commands.add_parser("startup", help="budżet czasu importu i startu okna")
+    startup.add_argument("--import-budget-ms", type=float, default=80)
+    startup.add_argument("--window-budget-ms", type=float, default=500)
+    startup.add_argument("--repeat", type=int, default=5)
+    startup.set_defaults(func=bench_startup)
+
+    export = commands.add_parser("export", help="eksport wielu rozmiarów: osobno vs z jednej macierzy")
+    export.add_argument("--version", type=int, default=10)
+    export.add_argument("--styles", nargs="+", default=list(qr_engine.MODULE_STYLES))
+    export.add_argument("--scales", nargs="+", default=["1x", "2x", "3x", "300dpi", "600dpi"])
+    export.add_argument("--repeat", type=int, default=3)
+    export.set_defaults(func=bench_export)
+
+    store = commands.add_parser("store", help="magazyn macierzy na dysku: odczyt vs kodowanie")
+    store.add_argument("--count", type=int, default=2000)
+    store.add_argument("--level", choices=qr_engine.ERROR_CORRECTION_LEVELS, default="Q")
+    store.set_defaults(func=bench_store)
+
+    verify = commands.add_parser("verify", help="wbudowany dekoder: korekcja błędów, odczyt, dopasowanie logo")
+    verify.add_argument("--versions", type=int, nargs="+", default=[1, 5, 10, 25, 40])
+    verify.add_argument("--box-size", type=int, default=6)
+    verify.add_argument("--trials", type=int, default=500)
+    verify.add_argument("--seed", type=int, default=1)
+    verify.set_defaults(func=bench_verify)
+
+    strips = commands.add_parser("strips", help="duże PNG: zapis pasami vs w całości, szczyt pamięci")
+    strips.add_argument("--version", type=int, default=40)
+    strips.add_argument("--box-sizes", type=int, nargs="+", default=[20, 50, 100])
+    strips.add_argument("--style", default="Kwadraty")
+    strips.add_argument("--ceiling-mb", type=float, default=64, help="limit szczytu pamięci zapisu pasami")
+    strips.add_argument("--full-max-box", type=int, default=50,
+                        help="największy moduł rysowany w całości (dla porównania)")
+    strips.set_defaults(func=bench_strips)
+
+    png = commands.add_parser("png", help="PNG: rozmiar i czas kodowania RGB vs 1 bit / paleta")
+    png.add_argument("--version", type=int, default=10)
+    png.add_argument("--box-size", type=int, default=10)
+    png.add_argument("--big-box-size", type=int, default=60)
+    png.add_argument("--styles", nargs="+", default=["Kwadraty", "Kropki", "Zaokrąglone"])
+    png.add_argument("--colors", nargs=2, action="append", metavar=("FILL", "BACK"),
+                     help="kolory kodu i tła (można powtarzać)")
+    png.add_argument("--repeat", type=int, default=5)
+    png.set_defaults(func=bench_png)
+
+    watch = commands.add_parser("watch", help="katalog obserwowany: tylko zmiany, przebieg bez zmian")
+    watch.add_argument("--count", type=int, default=100000, help="zadań w pliku bez zmian")
+    watch.add_argument("--small", type=int, default=40, help="zadań w pliku renderowanym naprawdę")
+    watch.add_argument("--budget-s", type=float, default=10.0)
+    watch.set_defaults(func=bench_watch)
+
+    fill = commands.add_parser("fill", help="gradienty i wypełnienie obrazem: NumPy vs maski qrcode")
+    fill.add_argument("--version", type=int, default=10)
+    fill.add_argument("--box-size", type=int, default=8)
+    fill.add_argument("--fills", nargs="+", default=[name for name in qr_engine.FILL_STYLES
+                                                       if name != qr_engine.DEFAULT_FILL])
+    fill.add_argument("--styles", nargs="+", default=["Kwadraty", "Kropki", "Zaokrąglone", "Pionowe paski"])
+    fill.add_argument("--backs", nargs="+", default=["#FFFFFF", "#FFF8E7"])
+    fill.add_argument("--fill-color", default="#1F1F5F")
+    fill.add_argument("--end-color", default=qr_engine.DEFAULT_END_COLOR)
+    fill.add_argument("--tolerance", type=int, default=2)
+    fill.add_argument("--repeat", type=int, default=5)
+    fill.set_defaults(func=bench_fill)
+
+    split = commands.add_parser("split", help="podział dużej treści na kody, kodowanie równoległe, licznik")
+    split.add_argument("--chars", type=int, default=20000, help="przybliżona długość treści")
+    split.add_argument("--levels", nargs="+", choices=qr_engine.ERROR_CORRECTION_LEVELS, default=["M", "Q"])
+    split.add_argument("-j", "--workers", type=int, default=None, help="liczba procesów kodujących")
+    split.add_argument("--keystrokes", type=int, default=200, help="tyle znaków dopisywanych po jednym")
+    split.set_defaults(func=bench_split)
+
+    same = commands.add_parser("same", help="PNG i SVG z jednej macierzy: porównanie modułów")
+    same.add_argument("--versions", type=int, nargs="+", default=[1, 10, 25, 40])
+    same.add_argument("--styles", nargs="+", default=list(qr_engine.MODULE_STYLES))
+    same.add_argument("--box-size", type=int, default=6)
+    same.set_defaults(func=bench_same)
+
+    args = parser.parse_args(argv)
+    if args.func is bench_png and not args.colors:
+        args.colors = [["#000000", "#FFFFFF"], ["#1F4E79", "#FFF8E7"]]
+    return args.func(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
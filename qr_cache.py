@@ -0,0 +1,69 @@
+"""Pamięć podręczna LRU używana przez silnik QR."""
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """Ograniczona pamięć podręczna LRU z licznikami trafień i chybień.
+
+    Opcjonalnie ogranicza też łączną wagę wpisów (np. bajty), liczoną
+    funkcją weigh(value).
+    """
+
+    def __init__(self, maxsize=256, max_weight=None, weigh=None):
+        self.maxsize = maxsize
+        self.max_weight = max_weight
+        self.weigh = weigh or (lambda value: 1)
+        self.weight = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            if key in self._data:
+                self.weight -= self.weigh(self._data[key])
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self.weight += self.weigh(value)
+            while len(self._data) > 1 and (len(self._data) > self.maxsize or self._overweight()):
+                _, evicted = self._data.popitem(last=False)
+                self.weight -= self.weigh(evicted)
+
+    def _overweight(self):
+        return self.max_weight is not None and self.weight > self.max_weight
+
+    def get_or_create(self, key, factory):
+        """Zwraca wartość z pamięci lub tworzy ją przez factory() i zapamiętuje"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.weight = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize,
+                "weight": self.weight, "max_weight": self.max_weight}
+
+
+_MISSING = object()
@@ -0,0 +1,210 @@
+"""Szybkie kodowanie QR - wybór maski z karami liczonymi w NumPy.
+
+qrcode wybiera maskę, budując macierz osiem razy i licząc kary
+(util.lost_point) w pętlach Pythona. Tu macierz budujemy raz (z maską 0),
+zapamiętujemy, które moduły należą do danych, a osiem wariantów maski
+i ich kary liczymy na tablicach. Wynik jest identyczny co do bitu
+z QRCode.make: te same reguły kar, ta sama kolejność przy remisie
+i ta sama macierz testowa (bez informacji o formacie i wersji).
+
+Można też podać stałą wersję i/lub maskę - wtedy nie ma żadnego
+wyszukiwania. Bez NumPy maskę wybiera qrcode.
+
+Kod może zaczynać się nagłówkiem łączenia kodów (structured append) -
+numer kodu w sekwencji, ich liczba i parzystość całej treści (qr_split).
+"""
+import qrcode
+from qrcode import base, exceptions, util
+from qr_cache import LRUCache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Wzorce 1:1:3:1:1 z jasnym obszarem (jak util._lost_point_level3), jako 11 bitów
+FINDER_LIKE = (0b10111010000, 0b00001011101)
+MODE_STRUCTURED_APPEND = 0b0011
+STRUCTURED_APPEND_BITS = 20  # Tryb, numer kodu, liczba kodów - 1, parzystość
+MAX_APPEND_SYMBOLS = 16
+
+
+class RegionQRCode(qrcode.QRCode):
+    """QRCode zapamiętujący moduły danych (te, na które działa maska)"""
+
+    data_region = None
+    chosen_mask = None
+
+    def map_data(self, data, mask_pattern):
+        self.data_region = [[module is None for module in row] for row in self.modules]
+        super().map_data(data, mask_pattern)
+
+
+def _mask_patterns(n):
+    # Te same wzory co util.mask_func (i - wiersz, j - kolumna)
+    i, j = np.indices((n, n))
+    return np.stack([
+        (i + j) % 2 == 0,
+        i % 2 == 0,
+        j % 3 == 0,
+        (i + j) % 3 == 0,
+        (i // 2 + j // 3) % 2 == 0,
+        (i * j) % 2 + (i * j) % 3 == 0,
+        ((i * j) % 2 + (i * j) % 3) % 2 == 0,
+        ((i * j) % 3 + (i + j) % 2) % 2 == 0
+    ])
+
+
+MASK_PATTERNS = LRUCache(maxsize=40)
+
+
+def mask_patterns(n):
+    """Wszystkie osiem masek dla macierzy n x n (liczone raz na rozmiar)"""
+    return MASK_PATTERNS.get_or_create(n, lambda: _mask_patterns(n))
+
+
+def run_penalty(stack):
+    """Kara za ciągi >= 5 modułów tego samego koloru w wierszach (N1)"""
+    count, n, _ = stack.shape
+    # Kolumna z wartością 2 na końcu każdego wiersza rozdziela ciągi
+    flat = np.full((count, n, n + 1), 2, dtype=np.int8)
+    flat[:, :, :n] = stack
+    flat = flat.reshape(-1)
+    starts = np.concatenate(([0], np.flatnonzero(flat[1:] != flat[:-1]) + 1))
+    lengths = np.diff(np.append(starts, len(flat)))
+    scored = (flat[starts] != 2) & (lengths >= 5)
+    return np.bincount(starts[scored] // (n * (n + 1)), weights=lengths[scored] - 2, minlength=count)
+
+
+def block_penalty(stack):
+    """Kara za bloki 2x2 jednego koloru (N2)"""
+    corner = stack[:, :-1, :-1]
+    same = (corner == stack[:, 1:, :-1]) & (corner == stack[:, :-1, 1:]) & (corner == stack[:, 1:, 1:])
+    return 3 * same.sum(axis=(1, 2))
+
+
+def finder_penalty(stack):
+    """Kara za wzorce podobne do wzorców pozycyjnych w wierszach (N3)"""
+    width = stack.shape[2] - 10
+    if width <= 0:
+        return np.zeros(len(stack), dtype=np.int64)
+    # Każde okno 11 modułów jako liczba - bit 10 to pierwszy moduł okna
+    windows = np.zeros((stack.shape[0], stack.shape[1], width), dtype=np.int16)
+    for offset in range(11):
+        windows <<= 1
+        windows |= stack[:, :, offset:offset + width]
+    matches = (windows == FINDER_LIKE[0]) | (windows == FINDER_LIKE[1])
+    return 40 * matches.sum(axis=(1, 2))
+
+
+def balance_penalty(dark_count, n):
+    """Kara za odchylenie udziału ciemnych modułów od 50% (N4) - jak w qrcode, na float"""
+    percent = float(dark_count) / (n ** 2)
+    return int(abs(percent * 100 - 50) / 5) * 10
+
+
+def penalty_scores(stack):
+    """Suma kar (jak util.lost_point) dla każdej macierzy w stosie (k, n, n)"""
+    n = stack.shape[1]
+    columns = stack.transpose(0, 2, 1)
+    scores = (run_penalty(stack) + run_penalty(columns) + block_penalty(stack)
+              + finder_penalty(stack) + finder_penalty(columns))
+    balance = [balance_penalty(dark, n) for dark in stack.sum(axis=(1, 2))]
+    return [int(score) + extra for score, extra in zip(scores, balance)]
+
+
+def structured_data(version, error_correction, data_list, append):
+    """Słowa kodowe jak util.create_data, ale z nagłówkiem łączenia kodów przed segmentami.
+
+    append - (numer kodu od 0, liczba kodów, parzystość: XOR bajtów całej treści).
+    """
+    index, total, parity = append
+    if not 0 <= index < total <= MAX_APPEND_SYMBOLS:
+        raise ValueError(f"Łączenie kodów obsługuje od 1 do {MAX_APPEND_SYMBOLS} kodów")
+    buffer = util.BitBuffer()
+    buffer.put(MODE_STRUCTURED_APPEND, 4)
+    buffer.put(index, 4)
+    buffer.put(total - 1, 4)
+    buffer.put(parity, 8)
+    for data in data_list:
+        buffer.put(data.mode, 4)
+        buffer.put(len(data), util.length_in_bits(data.mode, version))
+        data.write(buffer)
+
+    # Dalej jak w util.create_data: terminator, dopełnienie do bajtu i bajty wypełnienia
+    rs_blocks = base.rs_blocks(version, error_correction)
+    bit_limit = sum(block.data_count * 8 for block in rs_blocks)
+    if len(buffer) > bit_limit:
+        raise exceptions.DataOverflowError(f"Za dużo danych: {len(buffer)} > {bit_limit} bitów")
+    for _ in range(min(bit_limit - len(buffer), 4)):
+        buffer.put_bit(False)
+    if len(buffer) % 8:
+        for _ in range(8 - len(buffer) % 8):
+            buffer.put_bit(False)
+    for i in range((bit_limit - len(buffer)) // 8):
+        buffer.put(util.PAD0 if i % 2 == 0 else util.PAD1, 8)
+    return util.create_bytes(buffer, rs_blocks)
+
+
+def make_qr(data, error_correction, version=None, mask=None, fit=True, fast=True, optimize=False, append=None):
+    """Buduje QRCode jak QRCode(version, mask_pattern).make(fit).
+
+    fit=False z podaną wersją pomija szukanie wersji (za dużo danych daje
+    DataOverflowError), podana maska pomija wybór maski. fast=False albo
+    brak NumPy - maskę wybiera qrcode. optimize=True dzieli treść na
+    segmenty optymalnie (qr_segments) zamiast heurystyką qrcode.
+    append - nagłówek łączenia kodów (jak w structured_data), tylko z optimize.
+    """
+    qr = RegionQRCode(version=version, error_correction=error_correction, mask_pattern=mask)
+    if append is not None and not optimize:
+        raise ValueError("Łączenie kodów wymaga optymalnego podziału na segmenty")
+    if optimize:
+        import qr_segments
+        max_version = version if version is not None and not fit else 40
+        segment_plan = qr_segments.plan(data, error_correction, version or 1, max_version,
+                                        reserved_bits=STRUCTURED_APPEND_BITS if append else 0)
+        qr.data_list = qr_segments.qr_data(segment_plan.segments)
+        qr.version = segment_plan.version
+        if append is not None:
+            # makeImpl użyje gotowych słów kodowych zamiast util.create_data
+            qr.data_cache = structured_data(qr.version, error_correction, qr.data_list, append)
+    else:
+        qr.add_data(data)
+        if fit or version is None:
+            qr.best_fit(start=version)
+    if mask is not None:
+        qr.chosen_mask = mask
+        qr.makeImpl(False, mask)
+    elif not fast or np is None:
+        qr.chosen_mask = qr.best_mask_pattern()
+        qr.makeImpl(False, qr.chosen_mask)
+    else:
+        qr.chosen_mask = apply_best_mask(qr)
+    return qr
+
+
+def apply_best_mask(qr):
+    """Wybiera maskę jak QRCode.best_mask_pattern i składa z niej gotową
+    macierz - dane są rozmieszczane tylko raz"""
+    # Macierz testowa jak w best_mask_pattern - format i wersja jasne
+    qr.makeImpl(True, 0)
+    n = qr.modules_count
+    grid = np.array(qr.modules, dtype=bool)
+    region = np.array(qr.data_region, dtype=bool)
+    patterns = mask_patterns(n) & region
+    unmasked = grid ^ patterns[0]
+    candidates = unmasked[None] ^ patterns
+    scores = penalty_scores(candidates)
+    best = scores.index(min(scores))  # Przy remisie pierwsza, jak w qrcode
+
+    # Moduły poza danymi są takie same dla każdej maski - brakuje tylko
+    # informacji o formacie (zależnej od maski) i o wersji
+    qr.modules = candidates[best].tolist()
+    qr.setup_type_info(False, best)
+    if qr.version >= 7:
+        qr.setup_type_number(False)
+    return best
+
+
+def modules_tuple(qr):
+    return tuple(tuple(bool(module) for module in row) for row in qr.modules)
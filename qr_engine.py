@@ -0,0 +1,550 @@
+"""Silnik generowania kodów QR niezależny od interfejsu Tk.
+
+Zawiera budowanie treści (tekst, URL, Wi-Fi, e-mail, SMS, wizytówka)
+oraz renderowanie do PNG i SVG. Używany przez okno aplikacji
+i przez tryb wsadowy (qr_batch.py).
+
+qrcode, PIL i NumPy są importowane dopiero przy pierwszym kodowaniu lub
+rysowaniu, więc sam import modułu (i start okna) jest szybki.
+"""
+import os
+import urllib.parse
+import qr_svg
+from qr_cache import LRUCache
+
+MAX_TEXT_CHARS = 100000  # Granica rozsądku - treść większa niż jeden kod dzieli qr_split
+DEFAULT_VERSION = 5
+DEFAULT_BORDER = 4
+SVG_BOX_SIZE = 10
+PREVIEW_SIZE = 300
+PREVIEW_MIN_BOX_SIZE = 2  # Mniejszy rozmiar psuje rysowanie kwadratów z przerwami
+ERROR_CORRECTION_LEVELS = ("L", "M", "Q", "H")
+MATRIX_CACHE_SIZE = 256
+# Katalog trwałego magazynu macierzy (qr_store) i jego limit w MB - dziedziczone przez procesy robocze
+MATRIX_STORE_ENV = "QR_MATRIX_STORE"
+MATRIX_STORE_MB_ENV = "QR_MATRIX_STORE_MB"
+LOGO_CACHE_BYTES = 64 * 1024 * 1024
+LOGO_SCALE = 0.25  # Bok logo jako ułamek boku obrazu
+STRIP_BAND_BYTES = 8 * 1024 * 1024  # Pas obrazu przy zapisie PNG pasami
+# auto - najmniejszy wierny tryb pikseli (1 bit, paleta), rgb - zawsze pełne RGB
+PNG_MODES = ("auto", "rgb")
+BLACK_WHITE = {(0, 0, 0), (255, 255, 255)}
+
+# Style punktów - nazwy jak w interfejsie -> klasa rysownika
+# z qrcode.image.styles.moduledrawers (importowana przy pierwszym użyciu)
+MODULE_STYLES = {
+    "Kwadraty": "SquareModuleDrawer",
+    "Kwadraty z przerwami": "GappedSquareModuleDrawer",
+    "Kropki": "CircleModuleDrawer",
+    "Zaokrąglone": "RoundedModuleDrawer",
+    "Pionowe paski": "VerticalBarsDrawer",
+    "Poziome paski": "HorizontalBarsDrawer"
+}
+
+# Wypełnienie modułów - nazwy jak w interfejsie -> klasa maski kolorów
+# z qrcode.image.styles.colormasks; gradient biegnie od fill_color do end_color
+FILL_STYLES = {
+    "Jednolity": "SolidFillColorMask",
+    "Gradient kołowy": "RadialGradiantColorMask",
+    "Gradient kwadratowy": "SquareGradiantColorMask",
+    "Gradient poziomy": "HorizontalGradiantColorMask",
+    "Gradient pionowy": "VerticalGradiantColorMask",
+    "Obraz": "ImageColorMask"
+}
+DEFAULT_FILL = "Jednolity"
+DEFAULT_END_COLOR = "#2E75B6"
+
+FILL_ALIASES = {
+    "solid": "Jednolity",
+    "radial": "Gradient kołowy",
+    "square": "Gradient kwadratowy",
+    "horizontal": "Gradient poziomy",
+    "vertical": "Gradient pionowy",
+    "image": "Obraz"
+}
+
+# Alternatywne nazwy stylów dla plików zadań
+STYLE_ALIASES = {
+    "square": "Kwadraty",
+    "gapped": "Kwadraty z przerwami",
+    "circle": "Kropki",
+    "rounded": "Zaokrąglone",
+    "vertical": "Pionowe paski",
+    "horizontal": "Poziome paski"
+}
+
+# Poprawne wartości dla typu szyfrowania
+WIFI_SECURITY_MAP = {
+    "WPA": "WPA",
+    "WPA2": "WPA",
+    "WEP": "WEP",
+    "nopass": "nopass"
+}
+
+
+def text_payload(text="", max_chars=MAX_TEXT_CHARS):
+    return text.strip()[:max_chars]
+
+
+def url_payload(url=""):
+    url = url.strip()
+    if not url:
+        return ""
+    if not url.startswith(("http://", "https://")):
+        url = "http://" + url
+    return url
+
+
+def wifi_payload(ssid="", password="", security="WPA2", hidden=False):
+    ssid = ssid.strip()
+    password = password.strip()
+    if not ssid:
+        return ""
+
+    # Poprawne kodowanie specjalnych znaków
+    ssid_encoded = urllib.parse.quote(ssid)
+    password_encoded = urllib.parse.quote(password)
+    security = WIFI_SECURITY_MAP.get(security, "WPA")
+
+    parts = []
+    parts.append(f"WIFI:T:{security};")
+    parts.append(f"S:{ssid_encoded};")
+    if security != "nopass":
+        parts.append(f"P:{password_encoded};")
+    if hidden:
+        parts.append("H:true;")
+
+    return ''.join(parts) + ';'  # Kończymy dodatkowym średnikiem
+
+
+def email_payload(to="", subject="", body=""):
+    to = to.strip()
+    subject = subject.strip()
+    body = body.strip()
+    if not to:
+        return ""
+
+    params = []
+    if subject:
+        params.append(f"subject={urllib.parse.quote(subject)}")
+    if body:
+        params.append(f"body={urllib.parse.quote(body)}")
+
+    return f"mailto:{to}?{'&'.join(params)}" if params else f"mailto:{to}"
+
+
+def sms_payload(number="", message=""):
+    number = number.strip()
+    message = message.strip()
+    if not number:
+        return ""
+
+    return f"smsto:{number}:{urllib.parse.quote(message)}" if message else f"smsto:{number}"
+
+
+def vcard_payload(fname="", lname="", company="", phone="", email="", url=""):
+    vcard = [
+        "BEGIN:VCARD",
+        "VERSION:3.0",
+        f"FN:{fname.strip()} {lname.strip()}",
+        f"ORG:{company.strip()}",
+        f"TEL:{phone.strip()}",
+        f"EMAIL:{email.strip()}",
+        f"URL:{url.strip()}",
+        "END:VCARD"
+    ]
+    return '\n'.join([line for line in vcard if not line.endswith(':')])
+
+
+# Typ treści -> (funkcja budująca, nazwy pól)
+PAYLOAD_BUILDERS = {
+    "text": (text_payload, ("text",)),
+    "url": (url_payload, ("url",)),
+    "wifi": (wifi_payload, ("ssid", "password", "security", "hidden")),
+    "email": (email_payload, ("to", "subject", "body")),
+    "sms": (sms_payload, ("number", "message")),
+    "vcard": (vcard_payload, ("fname", "lname", "company", "phone", "email", "url"))
+}
+
+
+def build_payload(kind, fields):
+    """Buduje treść kodu danego typu ze słownika pól"""
+    if kind not in PAYLOAD_BUILDERS:
+        raise ValueError(f"Nieznany typ treści: {kind}")
+    builder, names = PAYLOAD_BUILDERS[kind]
+    return builder(**{name: fields[name] for name in names if fields.get(name) is not None})
+
+
+def resolve_style(style):
+    """Zwraca nazwę stylu z interfejsu dla nazwy lub aliasu"""
+    style = STYLE_ALIASES.get(style, style)
+    if style not in MODULE_STYLES:
+        raise ValueError(f"Nieznany styl punktów: {style}")
+    return style
+
+
+def resolve_fill(fill_style):
+    """Nazwa wypełnienia z interfejsu dla nazwy lub aliasu (None - jednolite)"""
+    fill_style = FILL_ALIASES.get(fill_style, fill_style or DEFAULT_FILL)
+    if fill_style not in FILL_STYLES:
+        raise ValueError(f"Nieznane wypełnienie: {fill_style}")
+    return fill_style
+
+
+def drawer_class(style):
+    """Klasa rysownika qrcode dla nazwy lub aliasu stylu"""
+    from qrcode.image.styles import moduledrawers
+    return getattr(moduledrawers, MODULE_STYLES[resolve_style(style)])
+
+
+def error_correction_constant(level):
+    if level not in ERROR_CORRECTION_LEVELS:
+        raise ValueError(f"Nieznany poziom korekcji: {level}")
+    import qrcode.constants
+    return getattr(qrcode.constants, f"ERROR_CORRECT_{level}")
+
+
+def warm_up():
+    """Importuje ciężkie moduły z wyprzedzeniem (np. w tle po starcie okna)"""
+    import qrcode.main
+    import qrcode.image.styledpil
+    import qr_encoder
+    import qr_raster
+    from qrcode.image.styles import moduledrawers, colormasks
+
+
+class QRMatrix:
+    """Zakodowana macierz modułów (bez marginesu) - wspólna dla PNG i SVG"""
+
+    def __init__(self, modules, version, error_correction):
+        self.modules = modules
+        self.version = version
+        self.error_correction = error_correction
+
+    @property
+    def size(self):
+        return len(self.modules)
+
+    def is_constrained(self, row, col):
+        return 0 <= row < self.size and 0 <= col < self.size
+
+    def active_with_neighbors(self, row, col):
+        # To samo co QRCode.active_with_neighbors - potrzebne rysownikom z sąsiedztwem
+        from qrcode.main import ActiveWithNeighbors
+        context = []
+        for r in range(row - 1, row + 2):
+            for c in range(col - 1, col + 2):
+                context.append(self.is_constrained(r, c) and bool(self.modules[r][c]))
+        return ActiveWithNeighbors(*context)
+
+
+# Zakodowane macierze wg (treść, korekcja, wersja) - zmiana koloru, stylu,
+# rozmiaru czy logo nie wymaga ponownego kodowania
+MATRIX_CACHE = LRUCache(MATRIX_CACHE_SIZE)
+_matrix_store = None
+
+
+def matrix_store():
+    """Magazyn macierzy na dysku wskazany przez QR_MATRIX_STORE albo None"""
+    global _matrix_store
+    directory = os.environ.get(MATRIX_STORE_ENV)
+    if not directory:
+        return None
+    if _matrix_store is None or _matrix_store.directory != os.path.expanduser(directory):
+        import qr_store
+        megabytes = os.environ.get(MATRIX_STORE_MB_ENV)
+        max_bytes = int(float(megabytes) * 1024 * 1024) if megabytes else qr_store.DEFAULT_MAX_BYTES
+        _matrix_store = qr_store.MatrixStore(directory, max_bytes)
+    return _matrix_store
+
+
+def encode(data, error_correction="Q", version=DEFAULT_VERSION, cache=True, mask=None, fit=True,
+           optimize=True, append=None):
+    """Koduje treść raz - wynik można renderować do dowolnego formatu.
+
+    Domyślnie version to wersja minimalna; fit=False wymusza dokładnie tę
+    wersję, a mask (0-7) stałą maskę - wtedy kodowanie niczego nie szuka.
+    optimize=False dzieli treść na segmenty jak qrcode (zamiast optymalnie).
+    append - (numer, liczba kodów, parzystość) kodu z sekwencji łączonej (qr_split).
+    """
+    if not cache:
+        return _encode(data, error_correction, version, mask, fit, optimize, append)
+    # Klucz bez append dla zwykłych kodów - istniejące magazyny macierzy (qr_store) pozostają ważne
+    key = (data, error_correction, version, mask, fit, optimize) + ((append,) if append else ())
+    return MATRIX_CACHE.get_or_create(key, lambda: _load_or_encode(key))
+
+
+def _load_or_encode(key):
+    # Przed kodowaniem zaglądamy do magazynu na dysku (jeśli jest włączony)
+    store = matrix_store()
+    if store is not None:
+        stored = store.get(key)
+        if stored is not None:
+            version, modules = stored
+            return QRMatrix(modules, version, key[1])
+    matrix = _encode(*key)
+    if store is not None:
+        store.put(key, matrix.version, matrix.modules)
+    return matrix
+
+
+def _encode(data, error_correction, version, mask=None, fit=True, optimize=True, append=None):
+    import qr_encoder
+    qr = qr_encoder.make_qr(data, error_correction_constant(error_correction), version, mask, fit,
+                            optimize=optimize, append=append)
+    # Krotki - macierz z pamięci podręcznej jest współdzielona i niezmienna
+    return QRMatrix(qr_encoder.modules_tuple(qr), qr.version, error_correction)
+
+
+def _image_bytes(img):
+    return img.size[0] * img.size[1] * len(img.getbands())
+
+
+# Zdekodowane logo (RGBA) i jego pomniejszenia - klucz zawiera mtime i rozmiar
+# pliku, więc podmieniony plik jest dekodowany od nowa
+LOGO_CACHE = LRUCache(maxsize=128, max_weight=LOGO_CACHE_BYTES, weigh=_image_bytes)
+
+
+def load_logo(logo_path, max_size):
+    """Zwraca logo RGBA zmniejszone do max_size (dekodowane raz na plik)"""
+    from PIL import Image
+    stat = os.stat(logo_path)
+    source_key = (os.path.abspath(logo_path), stat.st_mtime_ns, stat.st_size)
+
+    def resized():
+        source = LOGO_CACHE.get_or_create(source_key, lambda: Image.open(logo_path).convert("RGBA"))
+        logo = source.copy()
+        logo.thumbnail(max_size)
+        return logo
+
+    return LOGO_CACHE.get_or_create(source_key + (max_size,), resized)
+
+
+def paste_logo(img, logo_path, scale=LOGO_SCALE):
+    """Wkleja logo na środek obrazu (domyślnie 1/4 rozmiaru kodu)"""
+    logo = load_logo(logo_path, (max(1, int(img.size[0]*scale)), max(1, int(img.size[1]*scale))))
+    pos = ((img.size[0]-logo.size[0])//2, (img.size[1]-logo.size[1])//2)
+    img.paste(logo, pos, logo)
+    return img
+
+
+def rasterize(matrix, fill_color="#000000", back_color="#FFFFFF", style="Kwadraty",
+              box_size=10, border=DEFAULT_BORDER, fill_style=None, end_color=None, fill_image=None):
+    """Rysuje gotową macierz do obrazu PIL (NumPy, jeśli obsługuje styl).
+
+    fill_style wybiera gradient od fill_color do end_color albo wypełnienie
+    obrazem fill_image (FILL_STYLES); domyślnie kolor jednolity.
+    """
+    import qr_raster
+    drawer_cls = drawer_class(style)
+    color_mask = _color_mask(fill_color, back_color, fill_style, end_color, fill_image)
+    if qr_raster.supports(drawer_cls, color_mask):
+        img = qr_raster.rasterize(matrix, drawer_cls, color_mask, box_size, border)
+        if img is not None:
+            return img
+    return rasterize_reference(matrix, fill_color, back_color, style, box_size, border,
+                               fill_style, end_color, fill_image)
+
+
+def rasterize_sizes(matrix, box_sizes, fill_color="#000000", back_color="#FFFFFF", style="Kwadraty",
+                    border=DEFAULT_BORDER, fill_style=None, end_color=None, fill_image=None):
+    """Rysuje tę samą macierz w kilku rozmiarach modułu - zwraca obrazy po kolei.
+
+    Macierz, sąsiedztwo modułów i kolory są liczone raz dla wszystkich rozmiarów.
+    """
+    import qr_raster
+    drawer_cls = drawer_class(style)
+    color_mask = _color_mask(fill_color, back_color, fill_style, end_color, fill_image)
+    prepared = qr_raster.prepare(matrix, drawer_cls, border) if qr_raster.supports(drawer_cls, color_mask) else None
+    for box_size in box_sizes:
+        img = None
+        if prepared is not None:
+            img = qr_raster.rasterize(matrix, drawer_cls, color_mask, box_size, border, prepared)
+        if img is None:
+            img = rasterize_reference(matrix, fill_color, back_color, style, box_size, border,
+                                      fill_style, end_color, fill_image)
+        yield img
+
+
+def load_fill_image(path):
+    """Obraz wypełnienia w RGB (dekodowany raz na plik, jak logo)"""
+    from PIL import Image
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size, "RGB")
+    return LOGO_CACHE.get_or_create(key, lambda: Image.open(path).convert("RGB"))
+
+
+def _color_mask(fill_color, back_color, fill_style=None, end_color=None, fill_image=None):
+    from PIL import ImageColor
+    from qrcode.image.styles import colormasks
+    back = ImageColor.getrgb(back_color)
+    front = ImageColor.getrgb(fill_color)
+    mask_cls = getattr(colormasks, FILL_STYLES[resolve_fill(fill_style)])
+    if mask_cls is colormasks.SolidFillColorMask:
+        return mask_cls(back_color=back, front_color=front)
+    if mask_cls is colormasks.ImageColorMask:
+        if not fill_image:
+            raise ValueError("Wypełnienie obrazem wymaga pliku obrazu")
+        # Maska zmienia swój obraz przy rysowaniu (resize) - dostaje kopię z pamięci podręcznej
+        image = load_fill_image(fill_image)
+        return mask_cls(back_color=back, color_mask_image=image.convert("RGBA") if len(back) == 4 else image.copy())
+    # Maski gradientów mieszają kanały tła - przy przezroczystym tle kolory dostają nieprzezroczystą alfę
+    alpha = (255,) * (len(back) - 3)
+    # Gradienty przyjmują kolory pozycyjnie: tło, początek (środek/lewo/góra), koniec
+    return mask_cls(back, front[:3] + alpha, ImageColor.getrgb(end_color or DEFAULT_END_COLOR)[:3] + alpha)
+
+
+def rasterize_reference(matrix, fill_color="#000000", back_color="#FFFFFF", style="Kwadraty",
+                        box_size=10, border=DEFAULT_BORDER, fill_style=None, end_color=None, fill_image=None):
+    """Rysuje macierz moduł po module przez StyledPilImage (wzorzec dla NumPy)"""
+    from qrcode.image.styledpil import StyledPilImage
+    img = StyledPilImage(
+        border, matrix.size, box_size,
+        qrcode_modules=matrix.modules,
+        module_drawer=drawer_class(style)(),
+        color_mask=_color_mask(fill_color, back_color, fill_style, end_color, fill_image)
+    )
+    # Ta sama pętla co w QRCode.make_image
+    for r in range(matrix.size):
+        for c in range(matrix.size):
+            img.drawrect_context(r, c, qr=matrix)
+    img.process()
+    return img.get_image()
+
+
+def preview_box_size(matrix, box_size, max_pixels=PREVIEW_SIZE, border=DEFAULT_BORDER):
+    """Rozmiar modułu, przy którym podgląd mieści się w max_pixels (nie większy niż box_size)"""
+    return max(PREVIEW_MIN_BOX_SIZE, min(box_size, max_pixels // (matrix.size + 2 * border)))
+
+
+def render(data, fill_color="#000000", back_color="#FFFFFF", style="Kwadraty",
+           box_size=10, error_correction="Q", logo_path=None, fill_style=None, end_color=None, fill_image=None):
+    """Koduje i renderuje kod QR do obrazu PIL"""
+    matrix = encode(data, error_correction)
+    img = rasterize(matrix, fill_color, back_color, style, box_size, fill_style=fill_style, end_color=end_color,
+                    fill_image=fill_image)
+    if logo_path:
+        paste_logo(img, logo_path)
+    return img
+
+
+def image_format(path, default="PNG"):
+    """Format PIL wg rozszerzenia pliku (jak przy img.save(ścieżka))"""
+    from PIL import Image
+    return Image.registered_extensions().get(os.path.splitext(path)[1].lower(), default)
+
+
+def compact_image(img):
+    """Obraz w najmniejszym wiernym trybie pikseli.
+
+    Czerń i biel - tryb "1", do 256 kolorów - paleta "P" (przezroczystość
+    w tRNS, gdy obraz ją ma), więcej kolorów (np. zdjęcie w logo) - bez
+    zmian. Bez NumPy paletę dostają tylko obrazy czarno-białe.
+    """
+    from PIL import Image
+    if img.mode == "RGBA" and img.getextrema()[3][0] == 255:
+        img = img.convert("RGB")  # Kanał alfa nieużywany
+    colors = img.getcolors(256) if img.mode in ("RGB", "RGBA") else None
+    if colors is None:
+        return img
+    colors = sorted(color for _, color in colors)
+    if img.mode == "RGB" and set(colors) <= BLACK_WHITE:
+        return img.convert("1", dither=Image.Dither.NONE)
+    try:
+        import numpy as np
+    except ImportError:
+        return img
+    # Kolor jako liczba (bajty kanałów po kolei) - indeks w posortowanej palecie
+    pixels = np.asarray(img)
+    keys = np.zeros(pixels.shape[:2], dtype=np.uint32)
+    palette_keys = np.zeros(len(colors), dtype=np.uint32)
+    table = np.array(colors, dtype=np.uint32)
+    for channel in range(pixels.shape[2]):
+        keys = keys << 8 | pixels[:, :, channel]
+        palette_keys = palette_keys << 8 | table[:, channel]
+    index = np.searchsorted(palette_keys, keys).astype(np.uint8)
+    compact = Image.frombuffer("P", img.size, np.ascontiguousarray(index), "raw", "P", 0, 1)
+    compact.putpalette(bytes(value for color in colors for value in color[:3]))
+    if img.mode == "RGBA":
+        compact.info["transparency"] = bytes(color[3] for color in colors)
+    return compact
+
+
+def save_image(img, fp, file_format="PNG", png_mode="auto", optimize=False, compress_level=None, dpi=None):
+    """Zapisuje obraz PIL; PNG w trybie auto w najmniejszym wiernym trybie pikseli"""
+    if png_mode not in PNG_MODES:
+        raise ValueError(f"Nieprawidłowy tryb PNG: {png_mode} ({', '.join(PNG_MODES)})")
+    params = {"dpi": (dpi, dpi)} if dpi else {}
+    if file_format == "PNG" and png_mode == "auto":
+        img = compact_image(img)
+    elif img.mode == 'RGBA':
+        img = img.convert('RGB')
+    if file_format == "PNG":
+        params["optimize"] = optimize
+        if compress_level is not None:
+            params["compress_level"] = compress_level
+    img.save(fp, format=file_format, **params)
+
+
+def save_png(matrix, path, fill_color="#000000", back_color="#FFFFFF", style="Kwadraty", box_size=10,
+             border=DEFAULT_BORDER, logo_path=None, logo_scale=LOGO_SCALE, dpi=None, band_bytes=STRIP_BAND_BYTES,
+             png_mode="auto", compress_level=6, fill_style=None, end_color=None, fill_image=None):
+    """Zapisuje PNG pasami wierszy - cały obraz nigdy nie jest w pamięci.
+
+    Wynik jest taki sam jak rasterize + paste_logo + zapis, ale pamięć
+    zależy od band_bytes, a nie od rozmiaru obrazu (np. wydruk wersji 40
+    przy module 100 px ma ponad 18 000 px boku). W trybie auto kod bez
+    logo jest zapisywany jako 1 bit (czerń i biel) albo paleta. Bez NumPy
+    albo przy tle z przezroczystością obraz jest rysowany w całości.
+    """
+    import qr_raster
+    drawer_cls = drawer_class(style)
+    color_mask = _color_mask(fill_color, back_color, fill_style, end_color, fill_image)
+    if not qr_raster.supports(drawer_cls, color_mask) or color_mask.has_transparency:
+        img = rasterize(matrix, fill_color, back_color, style, box_size, border, fill_style, end_color, fill_image)
+        if logo_path and logo_scale:
+            paste_logo(img, logo_path, logo_scale)
+        save_image(img, path, "PNG", png_mode, compress_level=compress_level, dpi=dpi)
+        return
+
+    import numpy as np
+    from PIL import Image
+    import qr_png
+    side = (matrix.size + 2 * border) * box_size
+    logo = None
+    if logo_path and logo_scale:
+        # Jak paste_logo - to samo logo w tym samym miejscu, wklejane w pasy, które przecina
+        logo = load_logo(logo_path, (max(1, int(side*logo_scale)), max(1, int(side*logo_scale))))
+        left, top = (side-logo.size[0])//2, (side-logo.size[1])//2
+    mode, palette, lookup = "RGB", None, None
+    # Gradient ma za dużo odcieni na paletę - zostaje RGB
+    solid = resolve_fill(fill_style) == DEFAULT_FILL
+    colors = (qr_raster.band_palette(drawer_cls, color_mask, box_size)
+              if png_mode == "auto" and logo is None and solid else None)
+    if colors is not None:
+        if set(map(tuple, colors.tolist())) <= BLACK_WHITE:
+            # Tryb "1": 0 to czerń, 1 biel - indeksy palety zamieniamy na jasność
+            mode, lookup = "1", (colors[:, 0] == 255).astype(np.uint8)
+        else:
+            mode, palette = "P", colors.tolist()
+    band_lines = max(1, band_bytes // (side * 3))
+    with open(path, 'wb') as f, qr_png.PNGWriter(f, side, side, mode, dpi, compress_level, palette) as writer:
+        for y, band in qr_raster.raster_bands(matrix, drawer_cls, color_mask, box_size, border, band_lines,
+                                              indexed=mode != "RGB"):
+            if lookup is not None:
+                band = lookup[band]
+            if logo is not None and y < top + logo.size[1] and top < y + len(band):
+                img = Image.fromarray(band)
+                img.paste(logo, (left, top - y), logo)
+                band = np.asarray(img)
+            writer.write(band)
+
+
+def render_svg(matrix, fill_color="#000000", back_color="#FFFFFF", style="Kwadraty"):
+    """Renderuje gotową macierz do tekstu SVG"""
+    return qr_svg.svg_string(matrix, fill_color, back_color, resolve_style(style), SVG_BOX_SIZE)
+
+
+def save_svg(matrix, path, fill_color="#000000", back_color="#FFFFFF", style="Kwadraty", compress=None):
+    """Zapisuje SVG strumieniowo do pliku (.svgz - skompresowany)"""
+    qr_svg.save_svg(matrix, path, fill_color, back_color, resolve_style(style), SVG_BOX_SIZE, compress)
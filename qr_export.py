@@ -0,0 +1,173 @@
+"""Eksport jednego kodu w wielu rozdzielczościach naraz.
+
+Treść jest kodowana raz, a każdy rozmiar rysowany z tej samej macierzy
+(qr_engine.rasterize_sizes - sąsiedztwo modułów i kolory liczone raz,
+logo dekodowane raz). Rozmiary podaje się jako:
+
+    1x, 2x, 3x   - wielokrotność bazowego rozmiaru modułu (dla stron WWW,
+                   DPI 72, 144, 216 - ten sam rozmiar fizyczny)
+    300dpi, 600dpi - wydruk o zadanym boku w mm (--print-size)
+
+Rozmiar modułu musi być całkowity, więc bok wydruku jest zaokrąglany -
+DPI w pliku jest dokładnie takie, o jakie proszono, a faktyczny bok
+w mm jest wypisywany. PNG dostaje DPI w bloku pHYs, WebP (bezstratny)
+w EXIF. PNG jest zapisywany w najmniejszym wiernym trybie pikseli
+(qr_engine.compact_image), chyba że --png-mode rgb.
+
+Przykład:
+    python qr_export.py "https://example.com" -o kod --scales 1x 2x 3x 300dpi 600dpi --formats png webp
+"""
+import argparse
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import qr_engine
+import qr_timing
+
+DEFAULT_SCALES = ("1x", "2x", "3x", "300dpi", "600dpi")
+FORMATS = {
+    "png": "PNG",
+    "webp": "WEBP"
+}
+WEB_DPI = 72
+PRINT_SIZE_MM = 30
+SCALE_PATTERN = re.compile(r"^(\d+(?:\.\d+)?)(x|dpi)$")
+# Znaczniki EXIF rozdzielczości
+EXIF_X_RESOLUTION = 0x011A
+EXIF_Y_RESOLUTION = 0x011B
+EXIF_RESOLUTION_UNIT = 0x0128
+
+
+class ExportTarget:
+    """Jeden rozmiar eksportu: przyrostek nazwy, rozmiar modułu i DPI"""
+
+    def __init__(self, suffix, box_size, dpi):
+        self.suffix = suffix
+        self.box_size = box_size
+        self.dpi = dpi
+
+    def pixels(self, matrix, border=qr_engine.DEFAULT_BORDER):
+        return (matrix.size + 2 * border) * self.box_size
+
+    def size_mm(self, matrix, border=qr_engine.DEFAULT_BORDER):
+        return self.pixels(matrix, border) / self.dpi * 25.4
+
+
+def parse_scale(spec):
+    """"2x" -> (2.0, "x"), "300dpi" -> (300.0, "dpi")"""
+    match = SCALE_PATTERN.match(spec.strip().lower())
+    if not match or float(match.group(1)) <= 0:
+        raise ValueError(f"Nieprawidłowy rozmiar: {spec} (np. 2x albo 300dpi)")
+    return float(match.group(1)), match.group(2)
+
+
+def plan_targets(matrix, scales, box_size=10, print_size_mm=PRINT_SIZE_MM, border=qr_engine.DEFAULT_BORDER):
+    """Rozmiar modułu i DPI dla każdego żądanego rozmiaru"""
+    count = matrix.size + 2 * border
+    targets = []
+    for spec in scales:
+        value, unit = parse_scale(spec)
+        if unit == "x":
+            targets.append(ExportTarget(f"{value:g}x", max(1, round(box_size * value)), round(WEB_DPI * value)))
+        else:
+            pixels = print_size_mm / 25.4 * value
+            targets.append(ExportTarget(f"{value:g}dpi", max(1, round(pixels / count)), round(value)))
+    return targets
+
+
+def save_image(img, path, image_format, dpi, png_mode="auto"):
+    """Zapisuje obraz z metadanymi DPI (PNG - pHYs, WebP - EXIF)"""
+    if image_format == "PNG":
+        qr_engine.save_image(img, path, image_format, png_mode, dpi=dpi)
+        return
+    from PIL import Image
+    if img.mode == 'RGBA':
+        img = img.convert('RGB')
+    exif = Image.Exif()
+    exif[EXIF_X_RESOLUTION] = dpi
+    exif[EXIF_Y_RESOLUTION] = dpi
+    exif[EXIF_RESOLUTION_UNIT] = 2  # Cale
+    img.save(path, format=image_format, lossless=True, exif=exif.tobytes())
+
+
+def export_sizes(matrix, base_path, scales=DEFAULT_SCALES, formats=("png",), fill_color="#000000",
+                 back_color="#FFFFFF", style="Kwadraty", box_size=10, logo_path=None,
+                 print_size_mm=PRINT_SIZE_MM, timer=None, logo_scale=qr_engine.LOGO_SCALE, png_mode="auto",
+                 fill_style=None, end_color=None, fill_image=None):
+    """Zapisuje kod w każdym rozmiarze i formacie; zwraca [(ścieżka, cel)].
+
+    Nazwy plików: base_path@2x.png, base_path@300dpi.webp itd.
+    """
+    for file_format in formats:
+        if file_format not in FORMATS:
+            raise ValueError(f"Nieobsługiwany format: {file_format} ({', '.join(FORMATS)})")
+    timer = timer or qr_timing.StageTimer("export")
+    targets = plan_targets(matrix, scales, box_size, print_size_mm)
+    images = qr_engine.rasterize_sizes(matrix, [target.box_size for target in targets],
+                                       fill_color, back_color, style, fill_style=fill_style, end_color=end_color,
+                                       fill_image=fill_image)
+    written = []
+    # Kompresja PNG/WebP zwalnia GIL - pliki zapisują się w tle, gdy rysujemy kolejny rozmiar
+    with ThreadPoolExecutor(max_workers=min(len(targets) * len(formats), os.cpu_count() or 1) or 1) as executor:
+        saves = []
+        for target in targets:
+            with timer.stage("rasterize"):
+                img = next(images)
+            if logo_path and logo_scale:
+                with timer.stage("logo"):
+                    qr_engine.paste_logo(img, logo_path, logo_scale)
+            for file_format in formats:
+                path = f"{base_path}@{target.suffix}.{file_format}"
+                saves.append(executor.submit(save_image, img, path, FORMATS[file_format], target.dpi, png_mode))
+                written.append((path, target))
+        with timer.stage("save"):
+            for save in saves:
+                save.result()
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Eksport kodu QR w wielu rozdzielczościach")
+    parser.add_argument("data", help="treść kodu")
+    parser.add_argument("-o", "--output", default="kod", help="początek nazwy plików (bez rozszerzenia)")
+    parser.add_argument("--scales", nargs="+", default=list(DEFAULT_SCALES), help="np. 1x 2x 3x 300dpi 600dpi")
+    parser.add_argument("--formats", nargs="+", choices=list(FORMATS), default=["png"])
+    parser.add_argument("--box-size", type=int, default=10, help="rozmiar modułu dla 1x (piksele)")
+    parser.add_argument("--print-size", type=float, default=PRINT_SIZE_MM, help="bok wydruku w mm (z marginesem)")
+    parser.add_argument("--fill-color", default="#000000")
+    parser.add_argument("--back-color", default="#FFFFFF")
+    parser.add_argument("--style", default="Kwadraty")
+    parser.add_argument("--fill-style", default=qr_engine.DEFAULT_FILL,
+                        help="wypełnienie: solid, radial, square, horizontal, vertical, image")
+    parser.add_argument("--end-color", default=qr_engine.DEFAULT_END_COLOR, help="kolor końcowy gradientu")
+    parser.add_argument("--fill-image", default=None, help="obraz wypełnienia (dla --fill-style image)")
+    parser.add_argument("--error-correction", choices=qr_engine.ERROR_CORRECTION_LEVELS, default="Q")
+    parser.add_argument("--logo", default=None)
+    parser.add_argument("--png-mode", choices=qr_engine.PNG_MODES, default="auto",
+                        help="auto - 1 bit lub paleta, gdy wystarczą; rgb - pełne RGB")
+    args = parser.parse_args(argv)
+
+    try:
+        for spec in args.scales:
+            parse_scale(spec)
+        qr_engine.resolve_fill(args.fill_style)
+    except ValueError as e:
+        parser.error(str(e))
+    matrix = qr_engine.encode(args.data, args.error_correction)
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    written = export_sizes(matrix, args.output, args.scales, args.formats, args.fill_color, args.back_color,
+                           qr_engine.resolve_style(args.style), args.box_size, args.logo, args.print_size,
+                           png_mode=args.png_mode, fill_style=args.fill_style, end_color=args.end_color,
+                           fill_image=args.fill_image)
+    for path, target in written:
+        pixels = target.pixels(matrix)
+        print(f"{path}: {pixels}x{pixels} px, {target.dpi} DPI, {target.size_mm(matrix):.1f} mm")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,461 @@
+"""Arkusze etykiet: kody QR rozmieszczone w siatce na stronach PDF.
+
+Strona (A4, Letter lub własny rozmiar w mm) jest dzielona na kolumny
+i wiersze z marginesami i odstępami. Każda etykieta to kod QR z podpisem
+pod spodem. PDF jest zapisywany strona po stronie - w pamięci jest
+najwyżej jedna strona, więc 10 000 etykiet nie zajmuje więcej niż 10.
+
+Moduły kwadratowe, kwadratowe z przerwami, kropki i zaokrąglone są
+rysowane wektorowo (jak w SVG); paski, gradienty i logo trafiają do PDF
+jako obrazy.
+Podpisy używają wbudowanej czcionki Helvetica z polskimi znakami.
+
+Zadania czyta się jak w trybie wsadowym (CSV/JSONL z tymi samymi
+kolumnami i opcjami domyślnymi, m.in. --logo-scale, --qr-version,
+--fill-style). Podpis to kolumna "caption" albo szablon --caption
+z polami zadania, np. "{ssid}" lub "{data}" (domyślnie treść kodu).
+
+Przykład:
+    python qr_labels.py etykiety.csv -o etykiety.pdf --columns 3 --rows 8
+    python qr_labels.py adresy.jsonl -o arkusz.pdf --sheet Letter --caption "{url}"
+"""
+import argparse
+import string
+import sys
+import unicodedata
+import zlib
+
+import qr_batch
+import qr_engine
+import qr_svg
+import qr_verify
+
+MM = 72 / 25.4
+# Rozmiary stron w punktach PDF
+PAGE_SIZES = {
+    "A4": (595.28, 841.89),
+    "A5": (419.53, 595.28),
+    "Letter": (612.0, 792.0),
+    "Legal": (612.0, 1008.0)
+}
+# Style rysowane wektorowo - reszta jako obraz
+VECTOR_STYLES = ("Kwadraty", "Kwadraty z przerwami", "Kropki", "Zaokrąglone")
+RASTER_DPI = 300
+CAPTION_SIZE = 7
+CAPTION_COLOR = "#000000"
+
+# Znaki spoza WinAnsiEncoding wstawione w nieużywane kody 128-151
+EXTRA_GLYPHS = {
+    "Ą": "Aogonek", "ą": "aogonek", "Ć": "Cacute", "ć": "cacute", "Ę": "Eogonek", "ę": "eogonek",
+    "Ł": "Lslash", "ł": "lslash", "Ń": "Nacute", "ń": "nacute", "Ś": "Sacute", "ś": "sacute",
+    "Ź": "Zacute", "ź": "zacute", "Ż": "Zdotaccent", "ż": "zdotaccent", "…": "ellipsis",
+    "–": "endash", "—": "emdash", "„": "quotedblbase", "”": "quotedblright", "’": "quoteright",
+    "•": "bullet", "€": "Euro"
+}
+EXTRA_CODES = {char: 128 + i for i, char in enumerate(EXTRA_GLYPHS)}
+# Szerokości znaków ASCII 32-126 w Helvetica (1/1000 em)
+HELVETICA_WIDTHS = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584
+)
+EXTRA_WIDTHS = {"…": 1000, "–": 556, "—": 1000, "„": 333, "”": 333, "’": 222, "•": 350, "€": 556}
+
+
+def number(value):
+    """Liczba w zapisie PDF - bez zbędnych zer"""
+    text = f"{value:.4f}".rstrip("0").rstrip(".")
+    return text if text not in ("", "-0") else "0"
+
+
+def pdf_color(color):
+    from PIL import ImageColor
+    return " ".join(number(channel / 255) for channel in ImageColor.getrgb(color)[:3])
+
+
+def char_code(char):
+    if char in EXTRA_CODES:
+        return EXTRA_CODES[char]
+    code = ord(char)
+    return code if 32 <= code < 127 or 160 <= code < 256 else ord("?")
+
+
+def char_width(char):
+    """Szerokość znaku w Helvetica - litery z akcentami jak litera bazowa"""
+    if char in EXTRA_WIDTHS:
+        return EXTRA_WIDTHS[char]
+    base = unicodedata.normalize("NFD", char)[0]
+    if char in "Łł":
+        base = "L" if char == "Ł" else "l"
+    code = ord(base)
+    return HELVETICA_WIDTHS[code - 32] if 32 <= code < 127 else 556
+
+
+def text_width(text, size):
+    return sum(char_width(char) for char in text) * size / 1000
+
+
+def fit_text(text, size, width):
+    """Tekst w jednej linii, skrócony wielokropkiem do szerokości"""
+    text = " ".join(text.split())
+    if text_width(text, size) <= width:
+        return text
+    while text and text_width(text + "…", size) > width:
+        text = text[:-1]
+    return text.rstrip() + "…" if text else ""
+
+
+def pdf_string(text):
+    encoded = bytes(char_code(char) for char in text)
+    return b"(" + encoded.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def font_object():
+    differences = " ".join(f"/{name}" for name in EXTRA_GLYPHS.values())
+    return (f"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding << /Type /Encoding "
+            f"/BaseEncoding /WinAnsiEncoding /Differences [128 {differences}] >> >>").encode("ascii")
+
+
+class PDFWriter:
+    """Zapis PDF obiekt po obiekcie - w pamięci zostają tylko pozycje obiektów"""
+
+    def __init__(self, f):
+        self.f = f
+        self.offsets = {}
+        self.next_id = 1
+        self.position = 0
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _write(self, data):
+        self.f.write(data)
+        self.position += len(data)
+
+    def reserve(self):
+        object_id = self.next_id
+        self.next_id += 1
+        return object_id
+
+    def add(self, body, stream=None, object_id=None):
+        """Zapisuje obiekt (słownik jako bajty); stream jest kompresowany"""
+        object_id = object_id or self.reserve()
+        self.offsets[object_id] = self.position
+        if stream is not None:
+            stream = zlib.compress(stream)
+            body = body[:-2] + f" /Filter /FlateDecode /Length {len(stream)} >>".encode("ascii")
+            self._write(f"{object_id} 0 obj\n".encode("ascii") + body + b"\nstream\n")
+            self._write(stream)
+            self._write(b"\nendstream\nendobj\n")
+        else:
+            self._write(f"{object_id} 0 obj\n".encode("ascii") + body + b"\nendobj\n")
+        return object_id
+
+    def finish(self, root_id):
+        xref = self.position
+        count = self.next_id
+        lines = [f"xref\n0 {count}\n", "0000000000 65535 f \n"]
+        lines += [f"{self.offsets.get(i, 0):010d} 00000 n \n" for i in range(1, count)]
+        lines.append(f"trailer\n<< /Size {count} /Root {root_id} 0 R >>\nstartxref\n{xref}\n%%EOF\n")
+        self._write("".join(lines).encode("ascii"))
+
+
+class SheetLayout:
+    """Siatka etykiet na stronie - wymiary w mm, wynik w punktach PDF"""
+
+    def __init__(self, page_size="A4", columns=3, rows=8, margin=(10, 10), gutter=(3, 3),
+                 caption_size=CAPTION_SIZE):
+        if isinstance(page_size, str):
+            page_size = PAGE_SIZES[page_size]
+        self.width, self.height = page_size
+        self.columns = columns
+        self.rows = rows
+        self.margin = (margin[0] * MM, margin[1] * MM)
+        self.gutter = (gutter[0] * MM, gutter[1] * MM)
+        self.caption_size = caption_size
+        self.cell_width = (self.width - 2 * self.margin[0] - (columns - 1) * self.gutter[0]) / columns
+        self.cell_height = (self.height - 2 * self.margin[1] - (rows - 1) * self.gutter[1]) / rows
+        if self.cell_width <= 0 or self.cell_height <= 0:
+            raise ValueError("Etykiety nie mieszczą się na stronie - zmniejsz marginesy, odstępy lub siatkę")
+
+    @property
+    def per_page(self):
+        return self.columns * self.rows
+
+    def cell(self, index):
+        """Lewy dolny róg etykiety (kolejno wierszami od góry strony)"""
+        row, column = divmod(index, self.columns)
+        x = self.margin[0] + column * (self.cell_width + self.gutter[0])
+        top = self.height - self.margin[1] - row * (self.cell_height + self.gutter[1])
+        return x, top - self.cell_height
+
+    def code_box(self, index, caption):
+        """Kwadrat kodu (x, y, bok) wyśrodkowany nad miejscem na podpis"""
+        x, y = self.cell(index)
+        caption_height = self.caption_size * 1.4 if caption else 0
+        side = min(self.cell_width, self.cell_height - caption_height)
+        if side <= 0:
+            raise ValueError("Podpis nie mieści się w etykiecie - zmniejsz czcionkę lub liczbę wierszy")
+        return x + (self.cell_width - side) / 2, y + caption_height + (self.cell_height - caption_height - side) / 2, side
+
+
+# Styl -> (ustawienia linii, ścieżka modułu o lewym górnym rogu (x, y), operator malowania).
+# Kropka to odcinek zerowej długości z okrągłymi końcami, a zaokrąglony moduł
+# to obrysowany kwadrat z okrągłymi narożnikami - krócej niż krzywymi Béziera
+GLYPHS = {
+    "Kwadraty z przerwami": ("", lambda x, y: f"{x}.1 {y}.1 .8 .8 re", "f"),  # Jak GappedSquareModuleDrawer
+    "Kropki": ("1 w 1 J", lambda x, y: f"{x}.5 {y}.5 m {x}.5 {y}.5 l", "S"),
+    "Zaokrąglone": (".5 w 1 j", lambda x, y: f"{x}.25 {y}.25 .5 .5 re", "S")  # Promień .25 jak w SVG
+}
+
+
+def module_ops(matrix, style, border):
+    """Operatory rysujące ciemne moduły w jednostkach modułu (oś y w dół, jak w macierzy)"""
+    if style in GLYPHS:
+        setup, glyph, paint = GLYPHS[style]
+        parts = [setup] if setup else []
+        for y, row in enumerate(matrix.modules, start=border):
+            parts.extend(glyph(x, y) for x, dark in enumerate(row, start=border) if dark)
+        parts.append(paint)
+        return " ".join(parts)
+    # Kwadraty łączone w poziome odcinki, jak w qr_svg
+    parts = []
+    for y, row in enumerate(matrix.modules, start=border):
+        parts.extend(f"{x + border} {y} {length} 1 re" for x, length in qr_svg.row_runs(row))
+    parts.append("f")
+    return " ".join(parts)
+
+
+class LabelDocument:
+    """Wielostronicowy PDF z etykietami - strona jest zapisywana, gdy się zapełni"""
+
+    def __init__(self, path, layout, dpi=RASTER_DPI, border=qr_engine.DEFAULT_BORDER):
+        self.layout = layout
+        self.dpi = dpi
+        self.border = border
+        self.file = open(path, "wb")
+        self.pdf = PDFWriter(self.file)
+        self.catalog_id = self.pdf.reserve()
+        self.pages_id = self.pdf.reserve()
+        self.font_id = self.pdf.add(font_object())
+        self.page_ids = []
+        self.logos = {}  # (ścieżka, piksele) -> obiekt obrazu, zapisany raz na dokument
+        self.labels = 0
+        self._start_page()
+
+    def _start_page(self):
+        self.content = []
+        self.images = {}
+        self.slot = 0
+
+    def add(self, matrix, caption="", fill_color="#000000", back_color="#FFFFFF", style="Kwadraty",
+            logo_path=None, logo_scale=qr_engine.LOGO_SCALE, fill_style=None, end_color=None, fill_image=None):
+        style = qr_engine.resolve_style(style)
+        solid = qr_engine.resolve_fill(fill_style) == qr_engine.DEFAULT_FILL
+        caption = caption.strip()
+        x, y, side = self.layout.code_box(self.slot, caption)
+        count = matrix.size + 2 * self.border
+        module = side / count
+
+        if style in VECTOR_STYLES and solid:
+            color = pdf_color(fill_color)
+            # Układ w modułach: początek w lewym górnym rogu, oś y w dół
+            self.content.append(f"q {number(module)} 0 0 {number(-module)} {number(x)} {number(y + side)} cm "
+                                f"{pdf_color(back_color)} rg 0 0 {count} {count} re f {color} rg {color} RG "
+                                f"{module_ops(matrix, style, self.border)} Q")
+        else:
+            box_size = max(1, round(module / 72 * self.dpi))
+            img = qr_engine.rasterize(matrix, fill_color, back_color, style, box_size, self.border,
+                                      fill_style, end_color, fill_image)
+            self._draw(self._add_image(img), x, y, side, side)
+        if logo_path and logo_scale:
+            self._draw_logo(logo_path, x, y, side, logo_scale)
+        if caption:
+            self._draw_caption(caption, x + side / 2, y)
+
+        self.labels += 1
+        self.slot += 1
+        if self.slot == self.layout.per_page:
+            self._finish_page()
+
+    def _draw_caption(self, caption, center, code_bottom):
+        size = self.layout.caption_size
+        text = fit_text(caption, size, self.layout.cell_width)
+        left = center - text_width(text, size) / 2
+        baseline = code_bottom - size * 1.1
+        self.content.append(f"{pdf_color(CAPTION_COLOR)} rg BT /F1 {number(size)} Tf "
+                            f"{number(left)} {number(baseline)} Td ")
+        self.content.append(pdf_string(text) + b" Tj ET")
+
+    def _draw_logo(self, logo_path, x, y, side, logo_scale):
+        # Jak paste_logo: logo w logo_scale boku kodu, z zachowaniem proporcji
+        pixels = max(1, round(side * logo_scale / 72 * self.dpi))
+        key = (logo_path, pixels)
+        if key not in self.logos:
+            logo = qr_engine.load_logo(logo_path, (pixels, pixels))
+            self.logos[key] = (self._write_image(logo), logo.size)
+        image_id, (width, height) = self.logos[key]
+        scale = side * logo_scale / max(width, height)
+        name = f"L{image_id}"
+        self.images[name] = image_id
+        self._draw(name, x + (side - width * scale) / 2, y + (side - height * scale) / 2,
+                   width * scale, height * scale)
+
+    def _add_image(self, img):
+        image_id = self._write_image(img)
+        name = f"I{image_id}"
+        self.images[name] = image_id
+        return name
+
+    def _draw(self, name, x, y, width, height):
+        self.content.append(f"q {number(width)} 0 0 {number(height)} {number(x)} {number(y)} cm /{name} Do Q")
+
+    def _write_image(self, img):
+        """Obraz PIL jako obiekt PDF (RGB, kanał alfa jako SMask)"""
+        smask = ""
+        if img.mode in ("RGBA", "LA", "P"):
+            img = img.convert("RGBA")
+            alpha_id = self.pdf.add(self._image_dict(img.size, "/DeviceGray"), img.getchannel("A").tobytes())
+            smask = f" /SMask {alpha_id} 0 R"
+        rgb = img.convert("RGB")
+        return self.pdf.add(self._image_dict(rgb.size, "/DeviceRGB", smask), rgb.tobytes())
+
+    @staticmethod
+    def _image_dict(size, color_space, extra=""):
+        return (f"<< /Type /XObject /Subtype /Image /Width {size[0]} /Height {size[1]} "
+                f"/ColorSpace {color_space} /BitsPerComponent 8{extra} >>").encode("ascii")
+
+    def _finish_page(self):
+        if not self.content:
+            return
+        stream = b"\n".join(part if isinstance(part, bytes) else part.encode("ascii") for part in self.content)
+        content_id = self.pdf.add(b"<< >>", stream)
+        xobjects = " ".join(f"/{name} {image_id} 0 R" for name, image_id in self.images.items())
+        resources = f"<< /Font << /F1 {self.font_id} 0 R >> /XObject << {xobjects} >> >>"
+        page = (f"<< /Type /Page /Parent {self.pages_id} 0 R /MediaBox [0 0 {number(self.layout.width)} "
+                f"{number(self.layout.height)}] /Resources {resources} /Contents {content_id} 0 R >>")
+        self.page_ids.append(self.pdf.add(page.encode("ascii")))
+        self._start_page()
+
+    def close(self):
+        self._finish_page()
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        self.pdf.add(f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>".encode("ascii"),
+                     object_id=self.pages_id)
+        self.pdf.add(f"<< /Type /Catalog /Pages {self.pages_id} 0 R >>".encode("ascii"),
+                     object_id=self.catalog_id)
+        self.pdf.finish(self.catalog_id)
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def save_sheet(matrix, path, fill_color="#000000", back_color="#FFFFFF", style="Kwadraty", logo_path=None,
+               caption="", layout=None, logo_scale=qr_engine.LOGO_SCALE):
+    """Jedna strona wypełniona tym samym kodem (np. arkusz naklejek z okna aplikacji)"""
+    layout = layout or SheetLayout()
+    with LabelDocument(path, layout) as document:
+        for _ in range(layout.per_page):
+            document.add(matrix, caption, fill_color, back_color, style, logo_path, logo_scale)
+
+
+class CaptionFields(dict):
+    def __missing__(self, key):
+        return ""
+
+
+def job_caption(job, data, template):
+    """Podpis z kolumny "caption" albo z szablonu z polami zadania"""
+    if "caption" in job:
+        return str(job["caption"])
+    fields = CaptionFields({key: str(value) for key, value in job.items()})
+    fields["data"] = data
+    return string.Formatter().vformat(template, (), fields)
+
+
+def fit_logo_scale(matrix, data, options, logo_path):
+    """Największe czytelne logo (--logo-scale auto) - jak w qr_batch, na rastrze z opcji zadania"""
+    img = qr_engine.rasterize(matrix, options["fill_color"], options["back_color"], options["style"],
+                              options["box_size"], fill_style=options["fill_style"],
+                              end_color=options["end_color"], fill_image=options["fill_image"])
+    scale = qr_verify.find_logo_scale(img, data, matrix.size, logo_path)
+    if not scale:
+        raise ValueError("Logo nie mieści się w kodzie przy tym poziomie korekcji")
+    return scale
+
+
+def write_labels(jobs, path, layout, defaults, caption="{data}", dpi=RASTER_DPI):
+    """Zapisuje etykiety z zadań do PDF; zwraca (liczba etykiet, błędy).
+
+    defaults jak z qr_batch.render_defaults; opcje samego pliku (format, PNG)
+    nie mają tu znaczenia.
+    """
+    errors = []
+    with LabelDocument(path, layout, dpi) as document:
+        for index, job in enumerate(jobs):
+            try:
+                data = qr_batch.job_payload(job)
+                if not data:
+                    raise ValueError("Brak danych wejściowych")
+                options = qr_batch.job_options(job, defaults)
+                matrix = qr_batch.encode_job(data, options)
+                logo_path = job.get("logo", defaults["logo"])
+                scale = qr_batch.logo_scale(job, defaults) if logo_path else None
+                if scale == "auto":
+                    scale = fit_logo_scale(matrix, data, options, logo_path)
+                document.add(matrix, job_caption(job, data, caption) if caption else "",
+                             options["fill_color"], options["back_color"], options["style"],
+                             logo_path, scale, options["fill_style"], options["end_color"], options["fill_image"])
+            except Exception as e:
+                errors.append((index, str(e)))
+    return document.labels, len(document.page_ids), errors
+
+
+def page_size(value):
+    if value in PAGE_SIZES:
+        return PAGE_SIZES[value]
+    try:
+        width, height = (float(part) * MM for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"rozmiar strony: {', '.join(PAGE_SIZES)} albo SZEROKOŚĆxWYSOKOŚĆ w mm")
+    return width, height
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Arkusze etykiet z kodami QR w PDF")
+    parser.add_argument("jobs", help="plik zadań (.csv lub .jsonl), jak w qr_batch.py")
+    parser.add_argument("-o", "--output", default="etykiety.pdf", help="plik PDF")
+    parser.add_argument("--sheet", type=page_size, default="A4", help="A4, A5, Letter, Legal albo np. 100x150 (mm)")
+    parser.add_argument("--columns", type=int, default=3)
+    parser.add_argument("--rows", type=int, default=8)
+    parser.add_argument("--margin", type=float, nargs=2, default=(10, 10), metavar=("X", "Y"),
+                        help="marginesy strony w mm")
+    parser.add_argument("--gutter", type=float, nargs=2, default=(3, 3), metavar=("X", "Y"),
+                        help="odstępy między etykietami w mm")
+    parser.add_argument("--caption", default="{data}",
+                        help="szablon podpisu z polami zadania, np. \"{ssid}\" (pusty - bez podpisów)")
+    parser.add_argument("--caption-size", type=float, default=CAPTION_SIZE, help="wielkość czcionki podpisu (pt)")
+    parser.add_argument("--dpi", type=int, default=RASTER_DPI, help="rozdzielczość pasków, gradientów i logo")
+    qr_batch.add_render_arguments(parser)
+    args = parser.parse_args(argv)
+    defaults = qr_batch.render_defaults(parser, args)
+    try:
+        layout = SheetLayout(args.sheet, args.columns, args.rows, args.margin, args.gutter, args.caption_size)
+    except ValueError as e:
+        parser.error(str(e))
+    labels, pages, errors = write_labels(qr_batch.read_jobs(args.jobs), args.output, layout, defaults,
+                                         args.caption, args.dpi)
+    for index, error in errors:
+        print(f"Zadanie {index}: błąd - {error}", file=sys.stderr)
+    print(f"Etykiety: {labels}, strony: {pages}, błędy: {len(errors)}")
+    print(f"Zapisano: {args.output}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""Test obciążeniowy usługi qr_server.py - opóźnienia p50/p99 i przepustowość.
+
+Przykład:
+    python qr_loadtest.py http://127.0.0.1:8765 -n 2000 -c 16 --distinct 100
+    python qr_loadtest.py --spawn -n 500 --format svg
+
+--distinct ustala liczbę różnych kodów (reszta to powtórzenia trafiające
+w pamięć podręczną), --revalidate wysyła If-None-Match z ETagiem.
+"""
+import argparse
+import http.client
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def request_url(base_url, index, args):
+    query = {
+        "type": "url",
+        "url": f"example.com/produkt/{index % args.distinct}",
+        "format": args.format,
+        "style": args.style,
+        "box_size": args.box_size
+    }
+    return f"{base_url.rstrip('/')}/qr?{urllib.parse.urlencode(query)}"
+
+
+def fetch(url, etags, revalidate):
+    headers = {}
+    if revalidate and url in etags:
+        headers["If-None-Match"] = etags[url]
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=60) as response:
+            response.read()
+            status = response.status
+            etags[url] = response.headers.get("ETag")
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (OSError, http.client.HTTPException) as e:
+        # Odrzucone lub zerwane połączenie (URLError, ConnectionError) to błąd zapytania, nie koniec testu
+        reason = getattr(e, "reason", None)
+        status = type(reason if isinstance(reason, BaseException) else e).__name__
+    return time.perf_counter() - start, status
+
+
+def run_load(base_url, args):
+    etags = {}
+    urls = [request_url(base_url, i, args) for i in range(args.requests)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(lambda url: fetch(url, etags, args.revalidate), urls))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency * 1000 for latency, _ in results)
+    statuses = Counter(status for _, status in results)
+    print(f"Zapytania: {len(results)}, współbieżność: {args.concurrency}, różnych kodów: {args.distinct}")
+    print(f"Statusy: {', '.join(f'{status}: {count}' for status, count in sorted(statuses.items(), key=str))}")
+    print(f"Przepustowość: {len(results) / elapsed:.1f} zapytań/s")
+    print(f"Opóźnienie: p50 {percentile(latencies, 0.50):.2f} ms, p90 {percentile(latencies, 0.90):.2f} ms, "
+          f"p99 {percentile(latencies, 0.99):.2f} ms, max {latencies[-1]:.2f} ms")
+    return 0 if set(statuses) <= {200, 304} else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Test obciążeniowy usługi QR")
+    parser.add_argument("url", nargs="?", default=None, help="adres usługi, np. http://127.0.0.1:8765")
+    parser.add_argument("--spawn", action="store_true", help="uruchom usługę w tym procesie na wolnym porcie")
+    parser.add_argument("-n", "--requests", type=int, default=1000)
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument("--distinct", type=int, default=50, help="liczba różnych kodów")
+    parser.add_argument("--format", choices=["png", "svg"], default="png")
+    parser.add_argument("--style", default="Kwadraty")
+    parser.add_argument("--box-size", type=int, default=10)
+    parser.add_argument("--revalidate", action="store_true", help="wysyłaj If-None-Match (oczekiwane 304)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="procesy usługi przy --spawn")
+    args = parser.parse_args(argv)
+
+    if not args.spawn:
+        if not args.url:
+            parser.error("podaj adres usługi lub --spawn")
+        return run_load(args.url, args)
+
+    import qr_server
+    server = qr_server.make_server(port=0, workers=args.workers, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        return run_load(f"http://127.0.0.1:{server.server_address[1]}", args)
+    finally:
+        server.shutdown()
+        server.server_close()
+        server.service.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Strumieniowy zapis PNG - obraz nie musi mieścić się w pamięci.
+
+PNGWriter przyjmuje kolejne poziome pasy pikseli (tablice NumPy
+wysokość x szerokość x kanały, od góry) i od razu kompresuje je do
+bloków IDAT. Każdy wiersz ma filtr Up (różnica z wierszem powyżej) -
+wiersze modułu kodu QR są identyczne, więc po filtrze zostają same
+zera, które zlib ściska niezależnie od szerokości obrazu (okno zlib
+to tylko 32 KiB, mniej niż jeden wiersz wydruku).
+
+Tryb "P" zapisuje indeksy palety (1, 2, 4 lub 8 bitów na piksel - wg
+liczby kolorów, z przezroczystością w tRNS), a tryb "1" czerń i biel
+(1 bit, 0 - czarny); pasy podaje się wtedy jako tablice indeksów.
+
+Przykład:
+    with open("kod.png", "wb") as f, PNGWriter(f, width, height, dpi=600) as png:
+        for band in pasy:
+            png.write(band)
+"""
+import struct
+import zlib
+
+import numpy as np
+
+SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Tryb PIL -> (typ koloru PNG, liczba kanałów)
+COLOR_TYPES = {
+    "1": (0, 1),
+    "L": (0, 1),
+    "RGB": (2, 3),
+    "P": (3, 1),
+    "RGBA": (6, 4)
+}
+FILTER_UP = 2
+IDAT_SIZE = 256 * 1024  # Bloki IDAT zapisujemy, gdy uzbiera się tyle skompresowanych bajtów
+
+
+def chunk(kind, data=b""):
+    """Blok PNG: długość, typ, dane, CRC32 typu i danych"""
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(data, zlib.crc32(kind)))
+
+
+def palette_bits(count):
+    """Najmniejsza głębia PNG (1, 2, 4, 8) mieszcząca count kolorów"""
+    for bits in (1, 2, 4):
+        if count <= 1 << bits:
+            return bits
+    return 8
+
+
+def pack_bits(indices, bits):
+    """Wiersze indeksów (wysokość x szerokość) spakowane po bits bitów, od najstarszego"""
+    if bits == 8:
+        return indices
+    per_byte = 8 // bits
+    height, width = indices.shape
+    padded = np.zeros((height, -(-width // per_byte) * per_byte), dtype=np.uint8)
+    padded[:, :width] = indices
+    groups = padded.reshape(height, -1, per_byte)
+    packed = np.zeros(groups.shape[:2], dtype=np.uint8)
+    for i in range(per_byte):
+        packed |= groups[:, :, i] << (8 - bits * (i + 1))
+    return packed
+
+
+class PNGWriter:
+    """Zapisuje PNG pasami wierszy do otwartego pliku f.
+
+    palette - lista kolorów RGB lub RGBA dla trybu "P".
+    """
+
+    def __init__(self, f, width, height, mode="RGB", dpi=None, level=6, palette=None):
+        if mode not in COLOR_TYPES:
+            raise ValueError(f"Nieobsługiwany tryb PNG: {mode} ({', '.join(COLOR_TYPES)})")
+        if (mode == "P") != (palette is not None) or palette is not None and not 0 < len(palette) <= 256:
+            raise ValueError("Tryb P wymaga palety od 1 do 256 kolorów")
+        self.f = f
+        self.width = width
+        self.height = height
+        color_type, self.channels = COLOR_TYPES[mode]
+        self.bits = 1 if mode == "1" else palette_bits(len(palette)) if palette else 8
+        self.rows = 0
+        self.previous = np.zeros(-(-width * self.channels * self.bits // 8), dtype=np.uint8)
+        self.compressor = zlib.compressobj(level)
+        self.pending = []
+        self.pending_size = 0
+        f.write(SIGNATURE)
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, self.bits, color_type, 0, 0, 0)))
+        if palette:
+            f.write(chunk(b"PLTE", bytes(value for color in palette for value in color[:3])))
+            alpha = [color[3] if len(color) > 3 else 255 for color in palette]
+            if min(alpha) < 255:
+                f.write(chunk(b"tRNS", bytes(alpha)))
+        if dpi:
+            per_meter = round(dpi / 0.0254)
+            f.write(chunk(b"pHYs", struct.pack(">IIB", per_meter, per_meter, 1)))
+
+    def write(self, band):
+        """Dopisuje pas wierszy (wysokość x szerokość [x kanały], uint8; w trybach "P" i "1" indeksy)"""
+        rows = np.ascontiguousarray(band, dtype=np.uint8).reshape(len(band), self.width * self.channels)
+        rows = pack_bits(rows, self.bits)
+        if self.rows + len(rows) > self.height:
+            raise ValueError("Więcej wierszy niż wysokość obrazu")
+        lines = np.empty((len(rows), rows.shape[1] + 1), dtype=np.uint8)
+        lines[:, 0] = FILTER_UP
+        # Filtr Up: bajt minus bajt powyżej, modulo 256
+        np.subtract(rows[:1], self.previous, out=lines[:1, 1:])
+        np.subtract(rows[1:], rows[:-1], out=lines[1:, 1:])
+        self.previous = rows[-1].copy()
+        self.rows += len(rows)
+        self._add(self.compressor.compress(lines.data))
+
+    def _add(self, data):
+        if data:
+            self.pending.append(data)
+            self.pending_size += len(data)
+        if self.pending_size >= IDAT_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if self.pending:
+            self.f.write(chunk(b"IDAT", b"".join(self.pending)))
+            self.pending = []
+            self.pending_size = 0
+
+    def close(self):
+        if self.rows != self.height:
+            raise ValueError(f"Zapisano {self.rows} z {self.height} wierszy obrazu")
+        self._add(self.compressor.flush())
+        self._flush()
+        self.f.write(chunk(b"IEND"))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
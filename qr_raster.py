@@ -0,0 +1,417 @@
+"""Szybkie rysowanie macierzy QR w NumPy.
+
+Zamiast rysować moduł po module (StyledPilImage), budujemy obraz kilkoma
+operacjami na tablicach. Kwadraty (także z przerwami) to wiersze modułów
+rozciągnięte do pełnej szerokości i powielone w pionie przez PIL, a przerwy
+w wierszach to pasy w kolorze tła. Przy dużych modułach czas to głównie
+zapis pikseli RGB, więc zysk maleje z rozmiarem modułu. Dla kropek, zaokrągleń i pasków
+każdy moduł jest jednym z kilku wzorców (zależnych od sąsiadów), które
+rysuje raz ten sam rysownik z qrcode, a potem są składane w obraz przez
+indeksowanie tablicy - wynik jest identyczny co do piksela z rysowaniem
+StyledPilImage. Gotowe wzorce trzyma SPRITE_CACHE.
+
+raster_bands rysuje to samo pasami wierszy pikseli - bardzo duże obrazy
+(wydruk wersji 40 przy module 100 px) nie muszą mieścić się w pamięci.
+
+Gradienty i wypełnienie obrazem (maski kolorów z qrcode) są liczone
+w NumPy: pokrycie pikseli modułami (wzorce narysowane farbą na tle) łączymy
+jednym działaniem z polem kolorów wg tych samych wzorów co get_fg_pixel
+masek qrcode, zamiast pytać maskę o każdy piksel.
+
+NumPy jest opcjonalny - bez niego silnik używa zwykłego rysowania.
+"""
+import math
+
+from PIL import Image, ImageDraw
+from qrcode.image.styles.colormasks import (
+    SolidFillColorMask,
+    RadialGradiantColorMask,
+    SquareGradiantColorMask,
+    HorizontalGradiantColorMask,
+    VerticalGradiantColorMask,
+    ImageColorMask
+)
+from qrcode.image.styledpil import StyledPilImage
+from qrcode.main import ActiveWithNeighbors
+from qrcode.image.styles.moduledrawers import (
+    SquareModuleDrawer,
+    GappedSquareModuleDrawer,
+    CircleModuleDrawer,
+    RoundedModuleDrawer,
+    VerticalBarsDrawer,
+    HorizontalBarsDrawer
+)
+from qr_cache import LRUCache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Rysownik -> kierunki sąsiadów, od których zależy wygląd modułu
+TILE_NEIGHBORS = {
+    SquareModuleDrawer: (),
+    GappedSquareModuleDrawer: (),
+    CircleModuleDrawer: (),
+    RoundedModuleDrawer: ("N", "E", "S", "W"),
+    VerticalBarsDrawer: ("N", "S"),
+    HorizontalBarsDrawer: ("W", "E")
+}
+
+# Maska gradientu -> (kolor początkowy, kolor końcowy, położenie 0-1 piksela x, y w obrazie o boku width),
+# wzory i kolejność działań jak w get_fg_pixel
+GRADIENTS = {
+    RadialGradiantColorMask: lambda mask, x, y, width: (
+        mask.center_color, mask.edge_color,
+        np.sqrt((x - width / 2) ** 2 + (y - width / 2) ** 2) / (math.sqrt(2) * width / 2)),
+    SquareGradiantColorMask: lambda mask, x, y, width: (
+        mask.center_color, mask.edge_color,
+        np.maximum(np.abs(x - width / 2), np.abs(y - width / 2)) / (width / 2)),
+    HorizontalGradiantColorMask: lambda mask, x, y, width: (mask.left_color, mask.right_color, x / width),
+    VerticalGradiantColorMask: lambda mask, x, y, width: (mask.top_color, mask.bottom_color, y / width)
+}
+FILL_MASKS = (SolidFillColorMask, ImageColorMask, *GRADIENTS)
+
+SPRITE_CACHE_BYTES = 32 * 1024 * 1024
+
+
+def supports(drawer_cls, color_mask=None):
+    return np is not None and drawer_cls in TILE_NEIGHBORS and (color_mask is None or type(color_mask) in FILL_MASKS)
+
+
+def module_array(matrix):
+    return np.array(matrix.modules, dtype=bool)
+
+
+def eye_mask(n):
+    """Moduły wzorców pozycyjnych - rysowane zawsze kwadratami (jak BaseImage.is_eye)"""
+    eye = np.zeros((n, n), dtype=bool)
+    eye[:7, :7] = True
+    eye[:7, n - 7:] = True
+    eye[n - 7:, :7] = True
+    return eye
+
+
+def gap_spans(n, box_size, border, drawer):
+    """Piksele (w jednym wierszu/kolumnie) pokryte przez kwadraty z przerwami.
+
+    Współrzędne są ułamkowe, a ich zaokrąglenie zależy od położenia, więc
+    rysujemy te same prostokąty co GappedSquareModuleDrawer w jednym wierszu.
+    Wiersze i kolumny mają identyczne współrzędne.
+    """
+    delta = (1 - drawer.size_ratio) * box_size / 2  # jak GappedSquareModuleDrawer.initialize
+    line = Image.new("1", ((n + 2 * border) * box_size, 1), 0)
+    draw = ImageDraw.Draw(line)
+    for i in range(n):
+        x = (i + border) * box_size
+        draw.rectangle((x + delta, 0, x + box_size - 1 - delta, 0), fill=1)
+    return np.asarray(line)[0]
+
+
+def cut_gap_rows(img, n, box_size, border, covered, back_color):
+    """Zamalowuje wiersze przerw (poza covered) kolorem tła, poza wzorcami pozycyjnymi.
+
+    Przerwy w kolumnach są już w wierszach modułów, tu zostają poziome pasy -
+    kilkaset prostokątów zamiast maski wielkości obrazu.
+    """
+    eye = 7 * box_size
+    start = border * box_size
+    end = (border + n) * box_size
+    eyes = [(start, start), (end - eye, start), (start, end - eye)]
+    saved = [img.crop((x, y, x + eye, y + eye)) for x, y in eyes]
+    edges = np.flatnonzero(np.diff(np.concatenate(([1], covered.view(np.int8), [1]))))
+    draw = ImageDraw.Draw(img)
+    for first, last in zip(edges[::2], edges[1::2] - 1):
+        draw.rectangle((0, first, img.size[0] - 1, last), fill=back_color)
+    for (x, y), block in zip(eyes, saved):
+        img.paste(block, (x, y))
+    return img
+
+
+def palette_image(canvas, colors):
+    """Obraz RGB z tablicy indeksów kolorów - rozwinięcie palety robi PIL"""
+    height, width = canvas.shape
+    img = Image.frombuffer("P", (width, height), np.ascontiguousarray(canvas), "raw", "P", 0, 1)
+    img.putpalette(np.asarray(colors, dtype=np.uint8).tobytes())
+    return img.convert("RGB")
+
+
+def neighbor_arrays(modules):
+    """Sąsiedzi każdego modułu - poza macierzą zawsze nieaktywni"""
+    padded = np.pad(modules, 1)
+    return {
+        "N": padded[:-2, 1:-1],
+        "S": padded[2:, 1:-1],
+        "W": padded[1:-1, :-2],
+        "E": padded[1:-1, 2:]
+    }
+
+
+def variant_contexts(directions):
+    """Wszystkie kombinacje aktywnych sąsiadów w danych kierunkach"""
+    contexts = []
+    for code in range(2 ** len(directions)):
+        active = {d: bool(code >> (len(directions) - 1 - i) & 1) for i, d in enumerate(directions)}
+        contexts.append(ActiveWithNeighbors(
+            NW=False, N=active.get("N", False), NE=False,
+            W=active.get("W", False), me=True, E=active.get("E", False),
+            SW=False, S=active.get("S", False), SE=False))
+    return contexts
+
+
+def draw_strip(drawer_cls, color_mask, box_size, contexts):
+    """Wzorce modułów, kwadrat wzorca pozycyjnego i samo tło narysowane obok
+    siebie rysownikiem qrcode - czarną farbą na tle maski, bez nakładania kolorów"""
+    count = len(contexts) + 2
+    img = StyledPilImage(0, count, box_size, qrcode_modules=None,
+                         module_drawer=drawer_cls(), color_mask=color_mask)
+    for i, context in enumerate(contexts):
+        img.module_drawer.drawrect(img.pixel_box(0, i), context)
+    img.eye_drawer.drawrect(img.pixel_box(0, len(contexts)), True)
+    return img.get_image().crop((0, 0, count * box_size, box_size))
+
+
+def strip_tiles(pixels, box_size):
+    """Pas wzorców (box_size x n * box_size [x kanały]) jako tablica (n, box_size, box_size, ...)"""
+    count = pixels.shape[1] // box_size
+    return np.swapaxes(pixels.reshape(box_size, count, box_size, *pixels.shape[2:]), 0, 1)
+
+
+def draw_tiles(drawer_cls, color_mask, box_size, contexts):
+    """Rysuje wzorce modułów rysownikiem qrcode i nakłada kolory.
+
+    Zwraca tablicę (len(contexts) + 2, box_size, box_size, kanały):
+    wzorce, kwadrat wzorca pozycyjnego i samo tło.
+    """
+    # Przy czarnym tle kolor rysowania jest równy tłu i StyledPilImage nic by
+    # nie narysował - wtedy rysujemy czarno na białym i kolorujemy sami
+    inverted = color_mask.back_color == (0, 0, 0)
+    strip = draw_strip(drawer_cls, SolidFillColorMask() if inverted else color_mask, box_size, contexts)
+    if inverted:
+        tiles = colorize_coverage(np.asarray(strip), color_mask.back_color, color_mask.front_color)
+    else:
+        color_mask.apply_mask(strip)
+        tiles = np.asarray(strip)
+    return strip_tiles(tiles, box_size)
+
+
+def colorize_coverage(paint, back_color, front_color):
+    """Koloruje obraz narysowany czarno na białym (wzór jak QRColorMask.apply_mask)"""
+    norm = (255.0 - paint).mean(axis=2, keepdims=True) / 255.0
+    back = np.array(back_color, dtype=np.float64)
+    front = np.array(front_color, dtype=np.float64)
+    return (front * norm + back * (1 - norm)).astype(np.uint8)
+
+
+def _sprites_bytes(sprites):
+    return sprites[1].nbytes
+
+
+# Wzorce modułów wg (rysownik, rozmiar modułu, kolory) - rysowane raz
+SPRITE_CACHE = LRUCache(maxsize=64, max_weight=SPRITE_CACHE_BYTES, weigh=_sprites_bytes)
+
+
+def sprites(drawer_cls, color_mask, box_size):
+    """Zwraca (paleta, wzorce) - wzorce jako indeksy palety lub, gdy odcieni
+    jest więcej niż 256, jako piksele z paletą None"""
+    key = (drawer_cls, box_size, color_mask.back_color, color_mask.front_color)
+
+    def build():
+        tiles = draw_tiles(drawer_cls, color_mask, box_size, variant_contexts(TILE_NEIGHBORS[drawer_cls]))
+        # Wygładzone krawędzie mają niewiele odcieni - wtedy wystarczy bajt na piksel
+        colors, pixels = np.unique(tiles.reshape(-1, tiles.shape[3]), axis=0, return_inverse=True)
+        if len(colors) <= 256:
+            return colors, pixels.reshape(tiles.shape[:3]).astype(np.uint8)
+        return None, tiles
+
+    return SPRITE_CACHE.get_or_create(key, build)
+
+
+def tile_indices(modules, directions, border):
+    """Numer wzorca dla każdego modułu i marginesu (kolejność jak w draw_tiles)"""
+    n = len(modules)
+    neighbors = neighbor_arrays(modules)
+    index = np.zeros((n, n), dtype=np.intp)
+    for direction in directions:
+        index = index * 2 + neighbors[direction]
+    eye_tile = 2 ** len(directions)
+    index[eye_mask(n)] = eye_tile
+    index[~modules] = eye_tile + 1
+    return np.pad(index, border, constant_values=eye_tile + 1)
+
+
+def assemble(tiles, index, box_size):
+    """Składa obraz z wzorców - np.take wiersz modułów po wierszu, prosto na miejsce"""
+    n = len(index)
+    channels = tiles.shape[3:]
+    rows = np.ascontiguousarray(np.swapaxes(tiles, 0, 1))  # (piksel, wzorzec, piksel, ...)
+    body = np.empty((n, box_size, n, box_size, *channels), dtype=tiles.dtype)
+    for r in range(n):
+        np.take(rows, index[r], axis=1, out=body[r])
+    return body.reshape(n * box_size, n * box_size, *channels)
+
+
+def prepare(matrix, drawer_cls, border):
+    """Część rysowania niezależna od rozmiaru modułu: macierz i numery wzorców"""
+    modules = module_array(matrix)
+    if drawer_cls in (SquareModuleDrawer, GappedSquareModuleDrawer):
+        return modules, None
+    return modules, tile_indices(modules, TILE_NEIGHBORS[drawer_cls], border)
+
+
+def band_palette(drawer_cls, color_mask, box_size):
+    """Kolory obrazu z raster_bands (tablica RGB) albo None, gdy jest ich ponad 256"""
+    if drawer_cls in (SquareModuleDrawer, GappedSquareModuleDrawer):
+        return np.array([color_mask.back_color, color_mask.front_color], dtype=np.uint8)
+    return sprites(drawer_cls, color_mask, box_size)[0]
+
+
+def fill_field(color_mask, width, top, lines):
+    """Kolory pierwszego planu wierszy top..top+lines obrazu o boku width (jak get_fg_pixel)"""
+    if isinstance(color_mask, ImageColorMask):
+        # Jak ImageColorMask.initialize - obraz przeskalowany do boku kodu; dla pasa tylko jego wycinek
+        source = color_mask.color_img.convert("RGB")
+        if lines == width:
+            return np.asarray(source.resize((width, width)))
+        scale = source.size[1] / width
+        box = (0, top * scale, source.size[0], (top + lines) * scale)
+        return np.asarray(source.resize((width, lines), box=box))
+    x = np.arange(width, dtype=np.float64)[None, :]
+    y = np.arange(top, top + lines, dtype=np.float64)[:, None]
+    start, end, t = GRADIENTS[type(color_mask)](color_mask, x, y, width)
+    t = np.broadcast_to(t, (lines, width))[:, :, None]
+    # interp_color: int(koniec * t + początek * (1 - t)), kanał po kanale
+    field = np.array(end[:3], dtype=np.float64) * t + np.array(start[:3], dtype=np.float64) * (1 - t)
+    return field.astype(np.uint8)
+
+
+def coverage_sprites(drawer_cls, back_color, box_size):
+    """Zwraca (poziomy pokrycia 0-1, wzorce jako indeksy poziomów).
+
+    Wzorce są rysowane czarną farbą na tle back_color, a pokrycie liczone
+    jak QRColorMask.extrap_color - średnia po kanałach, w których tło nie
+    jest czarne. Przy czarnym tle maski qrcode niczego nie rysują -
+    wtedy, jak w draw_tiles, rysujemy na białym.
+    """
+    back = tuple(back_color[:3]) if any(back_color[:3]) else (255, 255, 255)
+
+    def build():
+        contexts = variant_contexts(TILE_NEIGHBORS[drawer_cls])
+        pixels = np.asarray(draw_strip(drawer_cls, SolidFillColorMask(back_color=back), box_size, contexts),
+                            dtype=np.float64)
+        channels = [i for i, value in enumerate(back) if value]
+        coverage = (1 - pixels[:, :, channels] / np.array(back, dtype=np.float64)[channels]).mean(axis=2)
+        levels, index = np.unique(coverage, return_inverse=True)
+        return levels, strip_tiles(index.reshape(coverage.shape).astype(np.uint8), box_size)
+
+    return SPRITE_CACHE.get_or_create(("coverage", drawer_cls, box_size, back), build)
+
+
+def fill_bands(matrix, drawer_cls, color_mask, box_size, border, band_lines, prepared=None):
+    """Pasy obrazu z gradientem lub obrazem: pokrycie modułami złożone z polem kolorów.
+
+    Jak QRColorMask.apply_mask: piksel = int(kolor * pokrycie + tło * (1 - pokrycie)).
+    """
+    back = np.array(color_mask.back_color[:3], dtype=np.float64)
+    modules, index = prepared or prepare(matrix, drawer_cls, border)
+    if index is None:
+        # Kwadraty nie mają wygładzonych krawędzi - pokrycie to indeks koloru z czarno-białych pasów
+        levels = np.array([0.0, 1.0])
+        bands = raster_bands(matrix, drawer_cls, SolidFillColorMask(), box_size, border, band_lines,
+                             (modules, index), indexed=True)
+    else:
+        levels, tiles = coverage_sprites(drawer_cls, color_mask.back_color, box_size)
+        width = len(index) * box_size
+        height = width
+        bands = ((top, tiles[index[ys // box_size], (ys % box_size)[:, None]].reshape(len(ys), width))
+                 for top in range(0, height, band_lines)
+                 for ys in [np.arange(top, min(top + band_lines, height))])
+    for top, band in bands:
+        norm = levels[band][:, :, None]
+        field = fill_field(color_mask, band.shape[1], top, len(band))
+        # Wzorce skalowane LANCZOS mają odbicia poza tło - pokrycie bywa ujemne, a PIL przycina piksele do 0-255
+        yield top, np.clip(field * norm + back * (1 - norm), 0, 255).astype(np.uint8)
+
+
+def raster_bands(matrix, drawer_cls, color_mask, box_size, border, band_lines, prepared=None, indexed=False):
+    """Obraz jako kolejne pasy po band_lines wierszy pikseli: (y, tablica RGB).
+
+    Sklejone pasy są identyczne z rasterize(). Z indexed=True pasy są
+    indeksami kolorów z band_palette (o ile nie jest None). Wymaga tła
+    bez przezroczystości (jak rasterize). Gradienty i obraz rysuje
+    fill_bands (tylko RGB).
+    """
+    if type(color_mask) is not SolidFillColorMask:
+        yield from fill_bands(matrix, drawer_cls, color_mask, box_size, border, band_lines, prepared)
+        return
+    modules, index = prepared or prepare(matrix, drawer_cls, border)
+    n = len(modules)
+    height = (n + 2 * border) * box_size
+
+    if index is None:
+        padded = np.pad(modules, border)
+        colors = band_palette(drawer_cls, color_mask, box_size)
+        gapped = drawer_cls is GappedSquareModuleDrawer
+        if gapped:
+            # Jak cut_gaps: piksel modułu zostaje, gdy nie leży w przerwie albo należy do wzorca pozycyjnego
+            covered = gap_spans(n, box_size, border, drawer_cls()).astype(bool)
+            eyes = np.pad(eye_mask(n), border)
+        for top in range(0, height, band_lines):
+            ys = np.arange(top, min(top + band_lines, height))
+            # Wiersze pikseli jednego wiersza modułów są takie same (z przerwami - dwa rodzaje),
+            # więc kolorujemy tylko różne wiersze i kopiujemy je na miejsce
+            keys = ys // box_size * 2 + covered[ys] if gapped else ys // box_size
+            unique, inverse = np.unique(keys, return_inverse=True)
+            rows = unique // 2 if gapped else unique
+            canvas = np.repeat(padded[rows], box_size, axis=1)
+            if gapped:
+                canvas &= (unique % 2 == 1)[:, None] & covered[None, :] | np.repeat(eyes[rows], box_size, axis=1)
+            lines = canvas.view(np.uint8)
+            yield top, (lines if indexed else colors[lines])[inverse]
+        return
+
+    colors, tiles = sprites(drawer_cls, color_mask, box_size)
+    if colors is not None and not indexed:
+        tiles = colors[tiles]  # Kolory raz dla wzorców, nie dla każdego piksela obrazu
+    width = len(index) * box_size
+    for top in range(0, height, band_lines):
+        ys = np.arange(top, min(top + band_lines, height))
+        # Wiersz y wzorca każdego modułu w wierszu modułów y // box_size
+        yield top, tiles[index[ys // box_size], (ys % box_size)[:, None]].reshape(len(ys), width, -1)
+
+
+def rasterize(matrix, drawer_cls, color_mask, box_size, border, prepared=None):
+    """Rysuje macierz do obrazu PIL - ten sam wynik co StyledPilImage.
+
+    prepared to wynik prepare() - przy rysowaniu w kilku rozmiarach liczony
+    raz. Zwraca None dla tła z przezroczystością (wtedy rysuje StyledPilImage).
+    """
+    if color_mask.has_transparency:
+        return None
+    if type(color_mask) is not SolidFillColorMask:
+        height = (len(matrix.modules) + 2 * border) * box_size
+        _, pixels = next(fill_bands(matrix, drawer_cls, color_mask, box_size, border, height, prepared))
+        return Image.fromarray(pixels)
+    modules, index = prepared or prepare(matrix, drawer_cls, border)
+    n = len(modules)
+
+    if index is None:
+        # Kwadraty bez wygładzania - wiersz modułów rozciągnięty do pełnej szerokości
+        # (z przerwami w kolumnach), a w pionie NEAREST przy całkowitej skali powtarza
+        # każdy wiersz box_size razy; piksele RGB zapisuje od razu PIL
+        padded = np.pad(modules, border)
+        lines = np.repeat(padded, box_size, axis=1)
+        gapped = drawer_cls is GappedSquareModuleDrawer
+        if gapped:
+            covered = gap_spans(n, box_size, border, drawer_cls()).astype(bool)
+            lines &= covered | np.repeat(np.pad(eye_mask(n), border), box_size, axis=1)
+        img = palette_image(lines.view(np.uint8), [color_mask.back_color, color_mask.front_color])
+        img = img.resize((lines.shape[1], lines.shape[1]), Image.NEAREST)
+        if gapped:
+            cut_gap_rows(img, n, box_size, border, covered, color_mask.back_color)
+        return img
+
+    colors, tiles = sprites(drawer_cls, color_mask, box_size)
+    if colors is None:
+        return Image.fromarray(assemble(tiles, index, box_size))
+    return palette_image(assemble(tiles, index, box_size), colors)
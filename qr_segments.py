@@ -0,0 +1,342 @@
+"""Optymalny podział treści na segmenty (cyfry, alfanumeryczne, bajty, kanji).
+
+qrcode dzieli treść heurystyką (optimal_data_chunks - segment cyfr lub
+znaków alfanumerycznych dopiero od 20 znaków), przez co np. numer telefonu
+w wizytówce trafia do segmentu bajtowego, a kod bywa o wersję większy.
+Tu podział wybiera programowanie dynamiczne po znakach (jak u Nayukiego),
+osobno dla każdej grupy wersji (1-9, 10-26, 27-40), bo od niej zależy
+długość pola licznika znaków. Wybierana jest najmniejsza wersja, w której
+mieści się najkrótszy podział.
+
+Segment bajtowy to UTF-8 (jak w qrcode), segment kanji - Shift JIS.
+
+Przykład:
+    python qr_segments.py "BEGIN:VCARD..." -e Q
+    python qr_segments.py --corpus
+"""
+import argparse
+import sys
+
+from qrcode import exceptions, util
+
+MODES = (util.MODE_NUMBER, util.MODE_ALPHA_NUM, util.MODE_8BIT_BYTE, util.MODE_KANJI)
+MODE_NAMES = {
+    util.MODE_NUMBER: "cyfry",
+    util.MODE_ALPHA_NUM: "alfanum.",
+    util.MODE_8BIT_BYTE: "bajty",
+    util.MODE_KANJI: "kanji"
+}
+# Pierwsza wersja każdej grupy o tej samej długości pól licznika znaków
+VERSION_GROUPS = ((1, 9), (10, 26), (27, 40))
+ALPHA_NUM = util.ALPHA_NUM.decode('ascii')
+INFINITY = float("inf")
+
+
+class KanjiData(util.QRData):
+    """Segment kanji (13 bitów na znak Shift JIS) - qrcode.QRData go nie obsługuje"""
+
+    def __init__(self, text):
+        self.mode = util.MODE_KANJI
+        self.data = text.encode('shift_jis')
+
+    def __len__(self):
+        return len(self.data) // 2
+
+    def write(self, buffer):
+        for i in range(0, len(self.data), 2):
+            code = self.data[i] << 8 | self.data[i + 1]
+            code -= 0x8140 if code <= 0x9FFC else 0xC140
+            buffer.put((code >> 8) * 0xC0 + (code & 0xFF), 13)
+
+
+def is_kanji(char):
+    try:
+        encoded = char.encode('shift_jis')
+    except UnicodeEncodeError:
+        return False
+    if len(encoded) != 2:
+        return False
+    code = encoded[0] << 8 | encoded[1]
+    return 0x8140 <= code <= 0x9FFC or 0xE040 <= code <= 0xEBBF
+
+
+def char_costs(char, kanji):
+    """Koszt znaku w każdym trybie, w szóstych częściach bitu (inf - niedostępny)"""
+    return (
+        20 if "0" <= char <= "9" else INFINITY,     # 10 bitów na 3 cyfry
+        33 if char in ALPHA_NUM else INFINITY,      # 11 bitów na 2 znaki
+        48 * len(char.encode('utf-8')),
+        78 if kanji and is_kanji(char) else INFINITY
+    )
+
+
+def _ceil_bits(cost):
+    # Koszt w szóstych częściach bitu zaokrąglony w górę do pełnego bitu
+    return cost if cost == INFINITY else -(-cost // 6) * 6
+
+
+def mode_headers(version):
+    """Koszt nagłówka segmentu (tryb i licznik znaków) w każdym trybie, w szóstych częściach bitu"""
+    return [(4 + util.length_in_bits(mode, version)) * 6 for mode in MODES]
+
+
+def step(costs, headers, char, kanji=True):
+    """Jeden krok programowania dynamicznego: koszty zapisu tekstu zakończonego
+    w każdym trybie po dopisaniu znaku i tryb, z którego przyszliśmy"""
+    # Zmiana trybu zaokrągla dotychczasowy zapis do pełnych bitów - opłaca się tylko
+    # z trybu o najmniejszym zaokrąglonym koszcie (nagłówek jest ten sam)
+    rounded = [_ceil_bits(cost) for cost in costs]
+    lowest = min(rounded)
+    source = rounded.index(lowest)
+    new_costs = []
+    back = []
+    for m, cost in enumerate(char_costs(char, kanji)):
+        switched = lowest + headers[m]
+        if source != m and switched < costs[m]:
+            new_costs.append(switched + cost)
+            back.append(source)
+        else:
+            new_costs.append(costs[m] + cost)
+            back.append(m)
+    return new_costs, back
+
+
+def total_bits(costs):
+    """Długość najkrótszego zapisu w bitach dla kosztów z step()"""
+    return min(_ceil_bits(cost) for cost in costs) // 6
+
+
+def segment_modes(text, version, kanji=True):
+    """Tryb każdego znaku dla najkrótszego zapisu w danej wersji"""
+    headers = mode_headers(version)
+    costs = list(headers)
+    choices = []
+    for char in text:
+        costs, back = step(costs, headers, char, kanji)
+        choices.append(back)
+
+    mode = min(range(len(MODES)), key=lambda m: _ceil_bits(costs[m]))
+    modes = []
+    for back in reversed(choices):
+        modes.append(mode)
+        mode = back[mode]
+    return [MODES[m] for m in reversed(modes)]
+
+
+def build_segments(text, version, kanji=True):
+    """Lista (tryb, fragment) - długość fragmentu mieści się w liczniku znaków"""
+    segments = []
+    for char, mode in zip(text, segment_modes(text, version, kanji)):
+        if segments and segments[-1][0] == mode:
+            segments[-1][1].append(char)
+        else:
+            segments.append((mode, [char]))
+
+    result = []
+    for mode, chars in segments:
+        part = ''.join(chars)
+        limit = 2 ** util.length_in_bits(mode, version) - 1
+        while part:
+            # Licznik w bajtach dla trybu bajtowego - dzielimy po znakach
+            take = len(part)
+            while segment_length(mode, part[:take]) > limit:
+                take -= 1
+            result.append((mode, part[:take]))
+            part = part[take:]
+    return result
+
+
+def segment_length(mode, part):
+    """Wartość pola licznika znaków dla fragmentu"""
+    if mode == util.MODE_8BIT_BYTE:
+        return len(part.encode('utf-8'))
+    return len(part)
+
+
+def segment_bits(mode, part, version):
+    count = segment_length(mode, part)
+    if mode == util.MODE_NUMBER:
+        body = 10 * (count // 3) + (0, 4, 7)[count % 3]
+    elif mode == util.MODE_ALPHA_NUM:
+        body = 11 * (count // 2) + 6 * (count % 2)
+    elif mode == util.MODE_8BIT_BYTE:
+        body = 8 * count
+    else:
+        body = 13 * count
+    return 4 + util.length_in_bits(mode, version) + body
+
+
+def qr_data(segments):
+    """Segmenty jako obiekty qrcode (do QRCode.data_list)"""
+    data = []
+    for mode, part in segments:
+        if mode == util.MODE_KANJI:
+            data.append(KanjiData(part))
+        elif mode == util.MODE_8BIT_BYTE:
+            data.append(util.QRData(part.encode('utf-8'), mode, check_data=False))
+        else:
+            data.append(util.QRData(part.encode('ascii'), mode, check_data=False))
+    return data
+
+
+class SegmentPlan:
+    """Wybrany podział: wersja, segmenty i zajętość"""
+
+    def __init__(self, version, segments, bits, capacity):
+        self.version = version
+        self.segments = segments
+        self.bits = bits
+        self.capacity = capacity
+
+    @property
+    def usage(self):
+        return self.bits / self.capacity
+
+    def describe(self):
+        return " + ".join(f"{MODE_NAMES[mode]}({segment_length(mode, part)})" for mode, part in self.segments)
+
+
+def plan(text, error_correction, min_version=1, max_version=40, kanji=True, reserved_bits=0):
+    """Najmniejsza wersja (>= min_version) z najkrótszym podziałem treści.
+
+    reserved_bits - miejsce na segmenty spoza treści (np. nagłówek łączenia kodów).
+    """
+    limits = util.BIT_LIMIT_TABLE[error_correction]
+    if len(text) * 20 > (limits[max_version] - reserved_bits) * 6:
+        # Nawet same cyfry (20/6 bitu na znak) się nie zmieszczą - bez liczenia podziału
+        raise exceptions.DataOverflowError(f"Treść nie mieści się w wersjach {min_version}-{max_version}")
+    for first, last in VERSION_GROUPS:
+        low, high = max(first, min_version), min(last, max_version)
+        if low > high:
+            continue
+        segments = build_segments(text, low, kanji)
+        bits = sum(segment_bits(mode, part, low) for mode, part in segments)
+        for version in range(low, high + 1):
+            if bits + reserved_bits <= limits[version]:
+                return SegmentPlan(version, segments, bits, limits[version])
+    raise exceptions.DataOverflowError(f"Treść nie mieści się w wersjach {min_version}-{max_version}")
+
+
+def heuristic_plan(text, error_correction, min_version=1):
+    """Podział i wersja, jakie wybiera QRCode.add_data + best_fit (do porównań)"""
+    import qrcode
+    qr = qrcode.QRCode(error_correction=error_correction)
+    qr.add_data(text)
+    version = qr.best_fit(start=min_version)
+    bits = sum(4 + util.length_in_bits(data.mode, version) + _body_bits(data) for data in qr.data_list)
+    segments = [(data.mode, data.data.decode('utf-8', 'replace')) for data in qr.data_list]
+    return SegmentPlan(version, segments, bits, util.BIT_LIMIT_TABLE[error_correction][version])
+
+
+def _body_bits(data):
+    buffer = util.BitBuffer()
+    data.write(buffer)
+    return len(buffer)
+
+
+def decoded_text(segments):
+    """Tekst odczytany z segmentów (kontrola poprawności podziału)"""
+    parts = []
+    for data in qr_data(segments):
+        encoding = 'shift_jis' if data.mode == util.MODE_KANJI else 'utf-8'
+        parts.append(data.data.decode(encoding))
+    return ''.join(parts)
+
+
+def report(text, error_correction, min_version=1):
+    """Porównanie podziału optymalnego z dotychczasowym (słownik do wypisania/JSON)"""
+    current = heuristic_plan(text, error_correction, min_version)
+    optimal = plan(text, error_correction, min_version)
+    size = lambda version: 4 * version + 17
+    return {
+        "version": optimal.version,
+        "current_version": current.version,
+        "bits": optimal.bits,
+        "current_bits": current.bits,
+        "capacity_bits": optimal.capacity,
+        "usage": round(optimal.usage, 4),
+        "modules_saved": size(current.version) ** 2 - size(optimal.version) ** 2,
+        "segments": optimal.describe()
+    }
+
+
+def corpus():
+    """Typowe treści: Wi-Fi, wizytówki, adresy, SMS i e-mail (także z polskimi znakami i kanji)"""
+    import qr_engine
+    payloads = []
+    for ssid, password, security in (("Dom", "12345678", "WPA2"), ("Biuro-2.4GHz", "Zaq1@wsx", "WPA"),
+                                     ("KAWIARNIA_GOŚCIE", "", "nopass"), ("Sieć Łódź", "9834 2201 7744", "WEP"),
+                                     ("ACME-CORP-GUEST", "0048601234567", "WPA2")):
+        payloads.append(("wifi", qr_engine.wifi_payload(ssid, password, security)))
+    for fields in (("Jan", "Kowalski", "ACME Sp. z o.o.", "+48 601 234 567", "jan.kowalski@acme.pl",
+                    "https://acme.pl"),
+                   ("Zażółć", "Gęślą-Jaźń", "Łódzkie Zakłady", "+48221234567", "biuro@lodz.pl", ""),
+                   ("ANNA", "NOWAK", "ABC", "0048123456789", "ANNA@ABC.PL", "HTTP://ABC.PL"),
+                   ("太郎", "山田", "株式会社テスト", "+81312345678", "taro@example.jp", "https://example.jp")):
+        payloads.append(("vcard", qr_engine.vcard_payload(*fields)))
+    for url in ("example.com", "https://sklep.example.pl/produkt/1234567890123?utm_source=qr",
+                "HTTPS://EXAMPLE.COM/P/00012345678901", "https://example.com/ścieżka/zażółć"):
+        payloads.append(("url", qr_engine.url_payload(url)))
+    payloads.append(("sms", qr_engine.sms_payload("+48601234567", "Kod 482913")))
+    payloads.append(("sms", qr_engine.sms_payload("601234567", "")))
+    payloads.append(("email", qr_engine.email_payload("biuro@example.pl", "Zamówienie 2024/0815", "Numer 9876543210")))
+    payloads.append(("text", "1234567890" * 30))
+    return payloads
+
+
+def check_corpus(levels="LMQH", min_version=1):
+    """Sprawdza korpus: podział odtwarza treść, koduje się w qrcode i nigdy nie jest gorszy"""
+    import qr_encoder
+    import qr_engine
+    failures = 0
+    saved_versions = 0
+    print(f"{'rodzaj':<7} {'kor.':>4} {'wersja':>7} {'było':>5} {'bity':>6} {'było':>6} {'zajęte':>7}  segmenty")
+    for kind, text in corpus():
+        for level in levels:
+            constant = qr_engine.error_correction_constant(level)
+            result = report(text, constant, min_version)
+            optimal = plan(text, constant, min_version)
+            problems = []
+            if decoded_text(optimal.segments) != text:
+                problems.append("treść")
+            if result["version"] > result["current_version"] or (
+                    result["version"] == result["current_version"] and result["bits"] > result["current_bits"]):
+                problems.append("gorszy podział")
+            try:
+                qr_encoder.make_qr(text, constant, min_version, optimize=True)
+            except Exception as e:
+                problems.append(f"kodowanie: {e}")
+            failures += bool(problems)
+            saved_versions += result["current_version"] - result["version"]
+            print(f"{kind:<7} {level:>4} {result['version']:>7} {result['current_version']:>5} "
+                  f"{result['bits']:>6} {result['current_bits']:>6} {result['usage']:>7.1%}  {result['segments']}"
+                  + (f"  BŁĄD: {', '.join(problems)}" if problems else ""))
+    print(f"Zaoszczędzone wersje łącznie: {saved_versions}, błędy: {failures}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Optymalny podział treści kodu QR na segmenty")
+    parser.add_argument("text", nargs="?", help="treść do przeanalizowania")
+    parser.add_argument("-e", "--error-correction", choices=("L", "M", "Q", "H"), default="Q")
+    parser.add_argument("--min-version", type=int, default=1)
+    parser.add_argument("--corpus", action="store_true", help="sprawdź korpus typowych treści")
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        return 1 if check_corpus(min_version=args.min_version) else 0
+    if args.text is None:
+        parser.error("podaj treść albo --corpus")
+
+    import qr_engine
+    result = report(args.text, qr_engine.error_correction_constant(args.error_correction), args.min_version)
+    print(f"Wersja: {result['version']} (dotychczas {result['current_version']})")
+    print(f"Dane: {result['bits']} bitów (dotychczas {result['current_bits']}), "
+          f"zajętość {result['usage']:.1%} z {result['capacity_bits']}")
+    print(f"Mniej modułów: {result['modules_saved']}")
+    print(f"Segmenty: {result['segments']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
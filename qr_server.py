@@ -0,0 +1,267 @@
+"""Lokalna usługa HTTP renderująca kody QR (bez okna Tk).
+
+GET /qr?type=wifi&ssid=Dom&password=tajne&format=png
+POST /qr z obiektem JSON o tych samych polach
+
+Pola są takie jak w trybie wsadowym: "type" (text, url, wifi, email, sms,
+vcard) z polami treści albo gotowa treść w "data", do tego opcje
+fill_color, back_color, style, box_size, error_correction, version, mask,
+fill_style z end_color (gradient w PNG) i format (png/svg). Pola są
+sprawdzane przed renderowaniem (tekst, liczby w zakresie, kolory,
+box_size do MAX_BOX_SIZE, treść do MAX_DATA_CHARS) - błąd to 400.
+Renderowanie odbywa się w puli procesów. Odpowiedzi mają ETag
+(SHA-256 zawartości) i trafiają do pamięci podręcznej LRU, więc powtórzone
+zapytanie nie jest renderowane ponownie, a If-None-Match daje 304.
+GET /stats zwraca liczniki pamięci podręcznej.
+
+Przykład:
+    python qr_server.py --port 8765 -j 4
+    python qr_loadtest.py http://127.0.0.1:8765 -n 2000 -c 16
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from qrcode.exceptions import DataOverflowError
+
+import qr_batch
+import qr_engine
+import qr_timing
+from qr_cache import LRUCache
+
+DEFAULT_PORT = 8765
+RESPONSE_CACHE_SIZE = 1024
+RESPONSE_CACHE_BYTES = 64 * 1024 * 1024
+MAX_BODY_BYTES = 64 * 1024
+MAX_BOX_SIZE = 32  # Wersja 40 z marginesem to wtedy ~5900 px boku - więcej to setki MB na zapytanie
+MAX_DATA_CHARS = 7089  # Najdłuższa treść jednego kodu (same cyfry, wersja 40-L)
+INT_FIELDS = {
+    "box_size": (1, MAX_BOX_SIZE),
+    "version": (1, 40),
+    "mask": (0, 7)
+}
+BOOL_FIELDS = ("hidden",)
+COLOR_FIELDS = ("fill_color", "back_color", "end_color")
+CONTENT_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml"
+}
+DEFAULTS = {
+    "fill_color": "#000000",
+    "back_color": "#FFFFFF",
+    "style": "Kwadraty",
+    "box_size": 10,
+    "error_correction": "Q",
+    "logo": None,  # Usługa nie czyta plików wskazanych w zapytaniu
+    "fill_style": qr_engine.DEFAULT_FILL,
+    "end_color": qr_engine.DEFAULT_END_COLOR,
+    "fill_image": None,
+    "format": "png",
+    "png_mode": "auto",
+    "version": None,
+    "mask": None
+}
+
+
+def field_value(key, value):
+    """Sprawdzona wartość pola: liczby w zakresie, kolory jako #RRGGBB(AA), reszta tekst"""
+    if key in INT_FIELDS:
+        low, high = INT_FIELDS[key]
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            raise ValueError(f"Pole {key} musi być liczbą całkowitą")
+        try:
+            number = int(value)
+        except ValueError:
+            raise ValueError(f"Pole {key} musi być liczbą całkowitą") from None
+        if not low <= number <= high:
+            raise ValueError(f"Pole {key} poza zakresem {low}-{high}")
+        return number
+    if key in BOOL_FIELDS and isinstance(value, bool):
+        return value
+    if not isinstance(value, str):
+        raise ValueError(f"Pole {key} musi być tekstem")
+    if key in COLOR_FIELDS:
+        # Kolor trafia do atrybutów SVG - tylko postać kanoniczna, nic z zapytania dosłownie
+        from PIL import ImageColor
+        return "#" + "".join(f"{channel:02X}" for channel in ImageColor.getrgb(value))
+    return value
+
+
+def normalize_job(fields):
+    """Zadanie z pól zapytania - klucz pamięci podręcznej nie zależy od kolejności pól"""
+    job = {key: value for key, value in fields.items() if value not in (None, "")}
+    job.pop("logo", None)
+    job.pop("fill_image", None)
+    job.pop("output", None)
+    job = {key: field_value(key, value) for key, value in job.items()}
+    file_format = str(job.get("format", DEFAULTS["format"])).lower()
+    if file_format not in CONTENT_TYPES:
+        raise ValueError(f"Nieobsługiwany format: {file_format} (png, svg)")
+    job["format"] = file_format
+    if "style" in job:
+        job["style"] = qr_engine.resolve_style(job["style"])
+    if "fill_style" in job:
+        job["fill_style"] = qr_engine.resolve_fill(job["fill_style"])
+    # Długość sprawdzana przed kodowaniem - ogromna treść nie trafia do puli procesów
+    if len(qr_batch.job_payload(job)) > MAX_DATA_CHARS:
+        raise ValueError(f"Treść dłuższa niż {MAX_DATA_CHARS} znaków nie mieści się w kodzie")
+    return job
+
+
+def job_key(job):
+    return json.dumps(job, sort_keys=True, ensure_ascii=False)
+
+
+def render_response(job):
+    """Renderuje zadanie do bajtów - uruchamiane w procesie roboczym"""
+    _, _, content = qr_batch.render_output(0, job, DEFAULTS, qr_timing.StageTimer("server"))
+    return content
+
+
+class RenderService:
+    """Pula procesów, pamięć podręczna odpowiedzi i łączenie identycznych zapytań w locie"""
+
+    def __init__(self, workers=None, cache_size=RESPONSE_CACHE_SIZE, cache_bytes=RESPONSE_CACHE_BYTES):
+        workers = workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        # Procesy startują od razu i wczytują qrcode/PIL/NumPy przed pierwszym zapytaniem
+        for _ in range(workers):
+            self.executor.submit(qr_engine.warm_up)
+        self.cache = LRUCache(cache_size, max_weight=cache_bytes, weigh=lambda entry: len(entry[1]))
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def render(self, job):
+        """Zwraca (etag, bajty) - z pamięci podręcznej lub z puli procesów"""
+        key = job_key(job)
+        entry = self.cache.get(key)
+        if entry is not None:
+            return entry
+        with self._lock:
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = self.executor.submit(render_response, job)
+                self._pending[key] = future
+        try:
+            content = future.result()
+        finally:
+            if owner:
+                with self._lock:
+                    del self._pending[key]
+        entry = (f'"{hashlib.sha256(content).hexdigest()}"', content)
+        if owner:
+            self.cache.put(key, entry)
+        return entry
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+
+class QRRequestHandler(BaseHTTPRequestHandler):
+    server_version = "QRCodePro/1.0"
+    service = None  # RenderService ustawiany w make_server
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        if url.path == "/stats":
+            self.send_json(200, self.service.cache.stats())
+        elif url.path == "/qr":
+            fields = dict(urllib.parse.parse_qsl(url.query, keep_blank_values=True))
+            self.handle_render(fields)
+        else:
+            self.send_json(404, {"error": "Nieznana ścieżka"})
+
+    def do_POST(self):
+        if urllib.parse.urlsplit(self.path).path != "/qr":
+            self.send_json(404, {"error": "Nieznana ścieżka"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self.send_json(413, {"error": "Za duże zapytanie"})
+            return
+        try:
+            fields = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(fields, dict):
+                raise ValueError("Oczekiwano obiektu JSON")
+        except ValueError as e:
+            self.send_json(400, {"error": f"Nieprawidłowy JSON: {e}"})
+            return
+        self.handle_render(fields)
+
+    def handle_render(self, fields):
+        try:
+            job = normalize_job(fields)
+            etag, content = self.service.render(job)
+        except (ValueError, KeyError, TypeError, DataOverflowError) as e:
+            # Za długa treść (także dla zadanej wersji) to błąd zapytania, nie serwera
+            self.send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            self.send_json(500, {"error": str(e)})
+            return
+
+        if etag in (tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPES[job["format"]])
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "public, max-age=86400")
+        self.end_headers()
+        self.wfile.write(content)
+
+    def send_json(self, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def make_server(host="127.0.0.1", port=DEFAULT_PORT, workers=None, quiet=False):
+    service = RenderService(workers)
+    handler = type("BoundQRRequestHandler", (QRRequestHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.quiet = quiet
+    server.service = service
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lokalna usługa HTTP generująca kody QR")
+    parser.add_argument("--host", default="127.0.0.1", help="adres nasłuchu (domyślnie tylko lokalnie)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("-j", "--workers", type=int, default=None, help="liczba procesów renderujących")
+    parser.add_argument("-q", "--quiet", action="store_true", help="bez dziennika zapytań")
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, args.workers, args.quiet)
+    print(f"Nasłuch na http://{args.host}:{server.server_address[1]}/qr")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,476 @@
+"""Podział treści większej niż jeden kod QR na sekwencję kodów.
+
+Treść, która nie mieści się w jednym kodzie (wizytówka ze zdjęciem,
+plik konfiguracyjny), jest dzielona na fragmenty zapisane w kolejnych
+kodach. Do 16 kodów każdy dostaje nagłówek łączenia kodów (structured
+append: numer, liczba kodów i parzystość całej treści) - czytniki, które
+go obsługują, składają treść same. Dłuższe sekwencje (albo --indexed)
+to zwykłe kody z przedrostkiem "numer/liczba:" w treści.
+
+Cięcie liczy prawdziwy rozmiar zakodowanych danych: programowanie
+dynamiczne z qr_segments idzie znak po znaku i fragment kończy się przed
+znakiem, który przepełniłby kod. Najpierw liczymy najmniejszą liczbę
+kodów w wersji maksymalnej, potem szukamy najmniejszej wersji, która
+daje tyle samo kodów - wszystkie kody sekwencji mają ten sam rozmiar.
+Kody są kodowane równolegle w puli procesów.
+
+CapacityMeter mierzy rozmiar zakodowanej treści przyrostowo (do pola
+tekstowego w oknie programu): po dopisaniu znaku liczy tylko od
+ostatniego zapamiętanego punktu, a nie cały tekst od nowa.
+
+Przykład:
+    python qr_split.py wizytowka.vcf -o kody -e M
+    python qr_split.py konfiguracja.json -o kody --indexed --verify
+"""
+import argparse
+import bisect
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from qrcode import exceptions, util
+
+import qr_encoder
+import qr_engine
+import qr_segments
+
+MAX_VERSION = 40
+CHECKPOINT_CHARS = 64  # Co tyle znaków CapacityMeter zapamiętuje stan
+SEGMENT_MARGIN_BITS = 24  # Zapas na dodatkowy nagłówek segmentu, gdy licznik znaków się przepełni
+INDEX_PREFIX = "{index}/{total}:"
+INDEX_PATTERN = re.compile(r"(\d+)/(\d+):")
+
+
+def parity(text):
+    """Parzystość łączenia kodów: XOR wszystkich bajtów treści (UTF-8)"""
+    value = 0
+    for byte in text.encode('utf-8'):
+        value ^= byte
+    return value
+
+
+def common_prefix(a, b):
+    """Długość wspólnego początku dwóch napisów (porównania wycinków zamiast pętli po znakach)"""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def common_suffix(a, b, limit):
+    """Długość wspólnego końca dwóch napisów, najwyżej limit znaków"""
+    low, high = 0, min(len(a), len(b), limit)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle:] == b[len(b) - middle:]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _shift(old, new):
+    # Różnice kosztów w każdej grupie wersji, jeśli nowy stan to stary przesunięty o stałą
+    # podzielną przez 6 - wtedy dalsze kroki dają te same wybory, a koszty różnią się o tę stałą
+    deltas = []
+    for old_costs, new_costs in zip(old, new):
+        delta = None
+        for old_cost, new_cost in zip(old_costs, new_costs):
+            if qr_segments.INFINITY in (old_cost, new_cost):
+                if old_cost != new_cost:
+                    return None
+            elif delta is None:
+                delta = new_cost - old_cost
+            elif new_cost - old_cost != delta:
+                return None
+        if delta is None or delta % 6:
+            return None
+        deltas.append(delta)
+    return deltas
+
+
+class Part:
+    """Fragment treści zapisany w jednym kodzie sekwencji"""
+
+    def __init__(self, text, index, total, version, append=None):
+        self.text = text
+        self.index = index
+        self.total = total
+        self.version = version
+        self.append = append  # (numer, liczba kodów, parzystość) albo None
+
+    @property
+    def suffix(self):
+        """Przyrostek nazwy pliku: -01of03 (pusty dla pojedynczego kodu)"""
+        return f"-{self.index + 1:02d}of{self.total:02d}" if self.total > 1 else ""
+
+
+def codes_label(count):
+    """1 kod, 3 kody, 5 kodów, 22 kody"""
+    if count == 1:
+        return "1 kod"
+    if count % 10 in (2, 3, 4) and count % 100 not in (12, 13, 14):
+        return f"{count} kody"
+    return f"{count} kodów"
+
+
+def describe(parts, error_correction):
+    """Opis sekwencji: liczba kodów, wersja i sposób łączenia"""
+    text = f"{codes_label(len(parts))}, wersja {parts[0].version}-{error_correction}"
+    if len(parts) == 1:
+        return text
+    return f"{text} ({'łączenie kodów' if parts[0].append else 'kody numerowane'})"
+
+
+def part_path(base_path, part, extension):
+    """kod.png -> kod-01of03.png"""
+    return f"{base_path}{part.suffix}{extension}"
+
+
+def cut_points(text, error_correction, version, reserved_bits=0, limit=None, kanji=True):
+    """Granice fragmentów przy cięciu zachłannym w danej wersji: [0, ..., len(text)].
+
+    Fragment kończy się przed znakiem, po którym najkrótszy zapis nie
+    zmieściłby się w kodzie. None, gdy fragmentów byłoby więcej niż limit.
+    """
+    # Koszty są w szóstych częściach bitu - pojemność też, bez zaokrąglania w pętli
+    capacity = (util.BIT_LIMIT_TABLE[error_correction][version] - reserved_bits) * 6
+    headers = qr_segments.mode_headers(version)
+    points = [0]
+    costs = list(headers)
+    for position, char in enumerate(text):
+        new_costs, _ = qr_segments.step(costs, headers, char, kanji)
+        if min(new_costs) > capacity:
+            if position == points[-1]:
+                raise exceptions.DataOverflowError(f"Znak nie mieści się w wersji {version}")
+            points.append(position)
+            if limit is not None and len(points) > limit:
+                return None
+            new_costs, _ = qr_segments.step(list(headers), headers, char, kanji)
+        costs = new_costs
+    points.append(len(text))
+    return points
+
+
+def layout(text, error_correction, max_version, reserved_bits, limit=None):
+    """(wersja, granice): najmniej kodów, a przy tej liczbie najmniejsza wersja.
+
+    None, gdy nawet w wersji maksymalnej kodów byłoby więcej niż limit.
+    """
+    points = cut_points(text, error_correction, max_version, reserved_bits, limit)
+    if points is None:
+        return None
+    count = len(points) - 1
+    best = max_version, points
+    low, high = 1, max_version - 1
+    while low <= high:
+        version = (low + high) // 2
+        try:
+            candidate = cut_points(text, error_correction, version, reserved_bits, limit=count)
+        except exceptions.DataOverflowError:
+            candidate = None
+        if candidate is None:
+            low = version + 1
+        else:
+            best = version, candidate
+            high = version - 1
+    return best
+
+
+def _prefix_bits(total):
+    # Przedrostek jako segment bajtowy z najdłuższym licznikiem znaków
+    return 4 + 16 + 8 * len(INDEX_PREFIX.format(index=total, total=total))
+
+
+def split(text, error_correction="Q", max_version=MAX_VERSION, indexed=None):
+    """Dzieli treść na kody (lista Part); treść mieszcząca się w jednym kodzie to jeden zwykły kod.
+
+    indexed=None - łączenie kodów, gdy wystarczy 16 kodów, inaczej
+    przedrostki "numer/liczba:"; True/False wymusza tryb.
+    """
+    constant = qr_engine.error_correction_constant(error_correction)
+    if not text:
+        raise ValueError("Brak treści")
+    try:
+        single = qr_segments.plan(text, constant, max_version=max_version)
+        return [Part(text, 0, 1, single.version)]
+    except exceptions.DataOverflowError:
+        pass
+
+    if not indexed:
+        margin = 0
+        while True:
+            found = layout(text, constant, max_version, qr_encoder.STRUCTURED_APPEND_BITS + margin,
+                           qr_encoder.MAX_APPEND_SYMBOLS)
+            if found is None:
+                if indexed is False:
+                    raise ValueError(f"Treść wymaga więcej niż {qr_encoder.MAX_APPEND_SYMBOLS} kodów - tyle "
+                                     "obsługuje łączenie kodów (użyj kodów numerowanych)")
+                break
+            version, points = found
+            total = len(points) - 1
+            check = parity(text)
+            parts = [Part(text[start:end], index, total, version, (index, total, check))
+                     for index, (start, end) in enumerate(zip(points, points[1:]))]
+            if _fits(parts, constant, qr_encoder.STRUCTURED_APPEND_BITS):
+                return parts
+            margin += SEGMENT_MARGIN_BITS
+
+    margin = 0
+    total = 9
+    while True:
+        version, points = layout(text, constant, max_version, _prefix_bits(total) + margin)
+        if len(points) - 1 > total:
+            total = 10 ** len(str(total)) * 10 - 1  # Dłuższy numer - liczymy z większym przedrostkiem
+            continue
+        total = len(points) - 1
+        parts = [Part(INDEX_PREFIX.format(index=index + 1, total=total) + text[start:end], index, total, version)
+                 for index, (start, end) in enumerate(zip(points, points[1:]))]
+        if _fits(parts, constant):
+            return parts
+        margin += SEGMENT_MARGIN_BITS
+
+
+def _fits(parts, error_correction, reserved_bits=0):
+    # Cięcie liczy najkrótszy zapis, a podział na segmenty może dołożyć nagłówek,
+    # gdy licznik znaków segmentu się przepełni - sprawdzamy prawdziwym planem
+    for part in parts:
+        try:
+            qr_segments.plan(part.text, error_correction, part.version, part.version, reserved_bits=reserved_bits)
+        except exceptions.DataOverflowError:
+            return False
+    return True
+
+
+def encode_part(part, error_correction="Q"):
+    """Macierz jednego kodu sekwencji (w stałej wersji całej sekwencji)"""
+    return qr_engine.encode(part.text, error_correction, part.version, fit=False, append=part.append)
+
+
+def encode_parts(parts, error_correction="Q", workers=None):
+    """Macierze wszystkich kodów w kolejności; kilka kodów koduje pula procesów"""
+    workers = min(workers or os.cpu_count() or 1, len(parts))
+    if workers <= 1:
+        return [encode_part(part, error_correction) for part in parts]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(encode_part, parts, [error_correction] * len(parts)))
+
+
+def join(results):
+    """Treść z odczytanych kodów (qr_verify.DecodeResult) w dowolnej kolejności.
+
+    Sprawdza komplet kodów i parzystość (łączenie kodów) albo numerację
+    z przedrostków; ValueError, gdy czegoś brakuje.
+    """
+    if not results:
+        raise ValueError("Brak kodów")
+    if len(results) == 1 and results[0].sequence is None and not INDEX_PATTERN.match(results[0].text):
+        return results[0].text
+    if all(result.sequence for result in results):
+        totals = {result.sequence[1] for result in results}
+        parities = {result.sequence[2] for result in results}
+        if len(totals) != 1 or len(parities) != 1:
+            raise ValueError("Kody pochodzą z różnych sekwencji")
+        numbered = {result.sequence[0]: result.text for result in results}
+        total = totals.pop()
+        expected = parities.pop()
+    else:
+        numbered = {}
+        total = None
+        for result in results:
+            match = INDEX_PATTERN.match(result.text)
+            if not match or (total is not None and int(match.group(2)) != total):
+                raise ValueError("Kod bez numeru sekwencji albo z innej sekwencji")
+            total = int(match.group(2))
+            numbered[int(match.group(1)) - 1] = result.text[match.end():]
+        expected = None
+    missing = [index + 1 for index in range(total) if index not in numbered]
+    if missing or len(numbered) != total:
+        raise ValueError(f"Brak kodów: {', '.join(map(str, missing))}" if missing else "Powtórzone kody")
+    text = "".join(numbered[index] for index in range(total))
+    if expected is not None and parity(text) != expected:
+        raise ValueError("Parzystość złożonej treści się nie zgadza")
+    return text
+
+
+class Measurement:
+    """Rozmiar zakodowanej treści i potrzebna wersja albo szacowana liczba kodów"""
+
+    def __init__(self, bits, version, capacity, symbols, error_correction):
+        self.bits = bits
+        self.version = version  # None - treść nie mieści się w jednym kodzie
+        self.capacity = capacity
+        self.symbols = symbols
+        self.error_correction = error_correction
+
+    def describe(self):
+        size = f"Dane: {(self.bits + 7) // 8} B"
+        if self.version is not None:
+            usage = self.bits / self.capacity
+            return f"{size} - wersja {self.version}-{self.error_correction}, zajętość {usage:.0%}"
+        return f"{size} - za dużo na jeden kod, ok. {codes_label(self.symbols)}"
+
+
+class CapacityMeter:
+    """Przyrostowy pomiar rozmiaru zakodowanej treści.
+
+    Koszty programowania dynamicznego (qr_segments.step) dla każdej grupy
+    wersji są zapamiętywane co około CHECKPOINT_CHARS znaków. Po zmianie
+    tekstu liczymy od ostatniego punktu przed pierwszą różnicą, a za zmianą
+    porównujemy stan z zapamiętanym: zwykle po kilku znakach różni się już
+    tylko o stałą i resztę punktów wystarczy przesunąć. Pisanie w dowolnym
+    miejscu długiego tekstu to kilkadziesiąt kroków zamiast całej treści.
+    """
+
+    def __init__(self, kanji=True):
+        self.kanji = kanji
+        self.headers = [qr_segments.mode_headers(first) for first, _ in qr_segments.VERSION_GROUPS]
+        self.text = ""
+        self.points = [0]  # Pozycje punktów kontrolnych, rosnąco
+        self.checkpoints = [[list(headers) for headers in self.headers]]
+        self.costs = self.checkpoints[0]
+
+    def update(self, text, hint=None):
+        """Uwzględnia nowy tekst; zwraca liczbę przeliczonych znaków.
+
+        hint - pozycja, przed którą tekst na pewno się nie zmienił (np. kursor
+        przed wpisaniem znaku); sprawdzana, więc zła podpowiedź nie psuje wyniku.
+        """
+        old_text, old_points, old_checkpoints = self.text, self.points, self.checkpoints
+        if hint is not None:
+            hint = max(0, min(hint, len(old_text), len(text)))
+        if hint is not None and old_text[:hint] == text[:hint]:
+            prefix = hint
+        else:
+            prefix = common_prefix(old_text, text)
+        suffix = common_suffix(old_text, text, min(len(old_text), len(text)) - prefix)
+        shift = len(text) - len(old_text)
+        new_end = len(text) - suffix  # Za tą pozycją nowy tekst to stary przesunięty o shift
+
+        index = bisect.bisect_right(old_points, prefix) - 1
+        self.points = old_points[:index + 1]
+        self.checkpoints = old_checkpoints[:index + 1]
+        position = last = self.points[-1]
+        costs = self.checkpoints[-1]
+        # Kolejny stary punkt, z którym można porównać stan za zmianą
+        candidate = bisect.bisect_left(old_points, new_end - shift)
+        while position < len(text):
+            while candidate < len(old_points) and old_points[candidate] + shift < position:
+                candidate += 1
+            if position >= new_end and candidate < len(old_points) and old_points[candidate] + shift == position:
+                deltas = _shift(old_checkpoints[candidate], costs)
+                if deltas is not None:
+                    moved = lambda state: [[cost + delta for cost in group] for group, delta in zip(state, deltas)]
+                    self.points.extend(point + shift for point in old_points[candidate + 1:])
+                    self.checkpoints.extend(moved(state) for state in old_checkpoints[candidate + 1:])
+                    costs = moved(self.costs)
+                    break
+            costs = [qr_segments.step(group, headers, text[position], self.kanji)[0]
+                     for group, headers in zip(costs, self.headers)]
+            position += 1
+            if position - last >= CHECKPOINT_CHARS:
+                self.points.append(position)
+                self.checkpoints.append(costs)
+                last = position
+        self.text = text
+        self.costs = costs
+        return position - old_points[index]
+
+    def measure(self, error_correction="Q"):
+        """Measurement dla bieżącego tekstu i poziomu korekcji"""
+        limits = util.BIT_LIMIT_TABLE[qr_engine.error_correction_constant(error_correction)]
+        bits = 0
+        for (first, last), costs in zip(qr_segments.VERSION_GROUPS, self.costs):
+            bits = qr_segments.total_bits(costs)
+            for version in range(first, last + 1):
+                if bits <= limits[version]:
+                    return Measurement(bits, version, limits[version], 1, error_correction)
+        # Dolne oszacowanie - każdy kod traci nagłówek łączenia i koniec niepełnego segmentu
+        symbols = -(-bits // (limits[MAX_VERSION] - qr_encoder.STRUCTURED_APPEND_BITS))
+        return Measurement(bits, None, limits[MAX_VERSION], symbols, error_correction)
+
+
+def save_parts(parts, matrices, base_path, file_format="png", fill_color="#000000", back_color="#FFFFFF",
+               style="Kwadraty", box_size=10):
+    """Zapisuje kody sekwencji jako base_path-01of03.png itd.; zwraca ścieżki"""
+    paths = []
+    for part, matrix in zip(parts, matrices):
+        path = part_path(base_path, part, f".{file_format}")
+        if file_format == "png":
+            qr_engine.save_png(matrix, path, fill_color, back_color, style, box_size)
+        else:
+            qr_engine.save_svg(matrix, path, fill_color, back_color, style)
+        paths.append(path)
+    return paths
+
+
+def verify_parts(parts, matrices, text, style="Kwadraty"):
+    """Odczytuje każdy kod wbudowanym dekoderem i składa treść; ScanError/ValueError przy błędzie"""
+    import qr_verify
+    results = []
+    for part, matrix in zip(parts, matrices):
+        img = qr_engine.rasterize(matrix, style=style, box_size=4)
+        result = qr_verify.verify_image(img, part.text, matrix.size)
+        if result.sequence != part.append:
+            raise qr_verify.ScanError(f"Kod {part.index + 1}: nagłówek łączenia kodów się nie zgadza")
+        results.append(result)
+    if join(results) != text:
+        raise ValueError("Złożona treść różni się od wejściowej")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Podział dużej treści na sekwencję kodów QR")
+    parser.add_argument("source", help="plik z treścią (- czyta ze standardowego wejścia)")
+    parser.add_argument("-o", "--output-dir", default="qr_split", help="katalog wyników")
+    parser.add_argument("--name", default=None, help="początek nazw plików (domyślnie nazwa pliku treści)")
+    parser.add_argument("-e", "--error-correction", choices=qr_engine.ERROR_CORRECTION_LEVELS, default="M")
+    parser.add_argument("--max-version", type=int, default=MAX_VERSION, help="największa wersja kodu (1-40)")
+    parser.add_argument("--indexed", action="store_true", help="kody numerowane zamiast łączenia kodów")
+    parser.add_argument("--format", choices=["png", "svg", "svgz"], default="png")
+    parser.add_argument("--box-size", type=int, default=10)
+    parser.add_argument("--fill-color", default="#000000")
+    parser.add_argument("--back-color", default="#FFFFFF")
+    parser.add_argument("--style", default="Kwadraty")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="liczba procesów kodujących")
+    parser.add_argument("--verify", action="store_true", help="odczytaj kody i sprawdź złożoną treść")
+    args = parser.parse_args(argv)
+    if not 1 <= args.max_version <= MAX_VERSION:
+        parser.error("--max-version musi być od 1 do 40")
+
+    if args.source == "-":
+        text = sys.stdin.read()
+        name = args.name or "kod"
+    else:
+        with open(args.source, encoding='utf-8') as f:
+            text = f.read()
+        name = args.name or os.path.splitext(os.path.basename(args.source))[0]
+    try:
+        parts = split(text, args.error_correction, args.max_version, True if args.indexed else None)
+    except (ValueError, exceptions.DataOverflowError) as e:
+        print(f"Błąd: {e}", file=sys.stderr)
+        return 1
+    matrices = encode_parts(parts, args.error_correction, args.workers)
+    os.makedirs(args.output_dir, exist_ok=True)
+    paths = save_parts(parts, matrices, os.path.join(args.output_dir, name), args.format, args.fill_color,
+                       args.back_color, qr_engine.resolve_style(args.style), args.box_size)
+    print(describe(parts, args.error_correction))
+    for path in paths:
+        print(path)
+    if args.verify:
+        try:
+            verify_parts(parts, matrices, text, qr_engine.resolve_style(args.style))
+        except ValueError as e:
+            print(f"Weryfikacja nieudana: {e}", file=sys.stderr)
+            return 1
+        print("Weryfikacja: wszystkie kody odczytane, treść zgodna")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,372 @@
+"""Trwały magazyn zakodowanych macierzy QR na dysku.
+
+Macierze są zapisywane jako spakowane bity (wiersz po wierszu, każdy
+wiersz dopełniony do pełnego bajtu) w plikach dopisywanych na końcu.
+Rekord to nagłówek (skrót klucza, wersja, CRC32) i bity macierzy - jego
+długość wynika z wersji, więc indeks w pamięci budujemy, przeskakując
+po nagłówkach, a macierz czytamy wprost z pliku zmapowanego przez mmap.
+
+Klucz to treść z opcjami kodowania (jak w qr_engine.encode), zapisany
+jako 16-bajtowy skrót BLAKE2b. Każdy odczyt sprawdza CRC32 - uszkodzony
+rekord jest traktowany jak brak (i kodowany ponownie).
+
+Rozmiar jest ograniczony dwiema generacjami: gdy bieżący plik przekroczy
+połowę limitu, zaczynamy nowy, a najstarszy jest usuwany. Rekord
+znaleziony w starszej generacji jest przepisywany do bieżącej, więc
+często używane kody przetrwają rotację (przybliżenie LRU).
+
+Z magazynu mogą korzystać równocześnie procesy trybu wsadowego - zapis
+odbywa się pod blokadą pliku, a odczyty widzą rekordy dopisane przez
+inne procesy.
+
+Przykład:
+    QR_MATRIX_STORE=~/.qr_store python qr_batch.py etykiety.csv -o wynik
+    python qr_store.py ~/.qr_store --verify
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import zlib
+from contextlib import contextmanager
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+MAGIC = b"QRMS\x01\x00\x00\x00"
+# Skrót klucza, wersja, 3 bajty zapasu, CRC32 (nagłówka bez CRC i bitów macierzy)
+HEADER = struct.Struct("<16sB3xI")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+FILE_PATTERN = re.compile(r"^matrices-(\d{6})\.qrm$")
+LOCK_NAME = "lock"
+
+
+def key_digest(key):
+    """16-bajtowy skrót klucza (treść i opcje kodowania)"""
+    text = json.dumps(key, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+def matrix_size(version):
+    return 4 * version + 17
+
+
+def payload_size(version):
+    n = matrix_size(version)
+    return n * ((n + 7) // 8)
+
+
+def pack_modules(modules):
+    """Macierz jako bajty - każdy wiersz dopełniony do pełnego bajtu"""
+    if np is not None:
+        return np.packbits(np.asarray(modules, dtype=bool), axis=1).tobytes()
+    n = len(modules)
+    row_bytes = (n + 7) // 8
+    padding = row_bytes * 8 - n
+    packed = bytearray()
+    for row in modules:
+        value = 0
+        for module in row:
+            value = value << 1 | bool(module)
+        packed += (value << padding).to_bytes(row_bytes, 'big')
+    return bytes(packed)
+
+
+def unpack_modules(payload, version):
+    """Odwrotność pack_modules - krotki wierszy wartości bool"""
+    n = matrix_size(version)
+    row_bytes = (n + 7) // 8
+    if np is not None:
+        rows = np.frombuffer(payload, dtype=np.uint8).reshape(n, row_bytes)
+        return tuple(map(tuple, np.unpackbits(rows, axis=1, count=n).astype(bool).tolist()))
+    shift = row_bytes * 8 - 1
+    modules = []
+    for start in range(0, n * row_bytes, row_bytes):
+        value = int.from_bytes(payload[start:start + row_bytes], 'big')
+        modules.append(tuple(bool(value >> (shift - j) & 1) for j in range(n)))
+    return tuple(modules)
+
+
+def record_crc(digest, version, payload):
+    return zlib.crc32(payload, zlib.crc32(digest + bytes((version,))))
+
+
+class Generation:
+    """Jeden plik magazynu - zmapowany do odczytu, z indeksem skrót -> (pozycja, wersja)"""
+
+    def __init__(self, number, path):
+        self.number = number
+        self.path = path
+        self.identity = None
+        self.map = None
+        self.reset()
+
+    def reset(self):
+        self.size = 0
+        self.end = 0  # Koniec ostatniego kompletnego rekordu
+        self.valid = True
+        self.index = {}
+
+    def update(self):
+        """Dołącza do indeksu rekordy dopisane od ostatniego odczytu"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        identity = (stat.st_dev, stat.st_ino)
+        if identity != self.identity or stat.st_size < self.size:
+            # Plik usunięty i założony od nowa (np. po clear w innym procesie)
+            self.identity = identity
+            self.reset()
+        elif stat.st_size == self.size:
+            return True
+        self.close()
+        self.size = size = stat.st_size
+        if size == 0:
+            return True
+        with open(self.path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.end == 0:
+            if size < len(MAGIC):
+                return True  # Plik właśnie zakładany
+            if self.map[:len(MAGIC)] != MAGIC:
+                self.valid = False
+                return True
+            self.end = len(MAGIC)
+        self._scan()
+        return True
+
+    def _scan(self):
+        offset = self.end
+        while offset + HEADER.size <= self.size:
+            digest, version, _ = HEADER.unpack_from(self.map, offset)
+            if not 1 <= version <= 40:
+                self.valid = False  # Nie da się ustalić długości - dalej nie czytamy
+                break
+            end = offset + HEADER.size + payload_size(version)
+            if end > self.size:
+                break  # Rekord w trakcie zapisu albo urwany
+            self.index[digest] = (offset, version)
+            offset = end
+        self.end = offset
+
+    def read(self, digest):
+        """Zwraca (wersja, bity) albo None; False gdy rekord jest uszkodzony"""
+        entry = self.index.get(digest)
+        if entry is None:
+            return None
+        offset, version = entry
+        _, _, crc = HEADER.unpack_from(self.map, offset)
+        start = offset + HEADER.size
+        payload = self.map[start:start + payload_size(version)]
+        if record_crc(digest, version, payload) != crc:
+            del self.index[digest]
+            return False
+        return version, payload
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+
+
+class MatrixStore:
+    """Magazyn macierzy w katalogu directory, ograniczony do max_bytes"""
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = os.path.expanduser(directory)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self.corrupt = 0
+        self.errors = 0
+        self._generations = {}
+        self._lock = threading.RLock()
+        self.refresh()
+
+    def _path(self, number):
+        return os.path.join(self.directory, f"matrices-{number:06d}.qrm")
+
+    def _numbers(self):
+        numbers = []
+        for name in os.listdir(self.directory):
+            match = FILE_PATTERN.match(name)
+            if match:
+                numbers.append(int(match.group(1)))
+        return sorted(numbers)
+
+    def refresh(self):
+        """Uwzględnia pliki i rekordy dodane przez inne procesy"""
+        with self._lock:
+            numbers = self._numbers()
+            for number in list(self._generations):
+                if number not in numbers:
+                    self._generations.pop(number).close()
+            for number in numbers:
+                generation = self._generations.get(number)
+                if generation is None:
+                    generation = self._generations[number] = Generation(number, self._path(number))
+                if not generation.update():
+                    self._generations.pop(number).close()
+
+    def _newest_first(self):
+        return [self._generations[number] for number in sorted(self._generations, reverse=True)]
+
+    def _find(self, digest):
+        for generation in self._newest_first():
+            if digest in generation.index:
+                return generation
+        return None
+
+    def get(self, key):
+        """Zwraca (wersja, moduły) zapisanej macierzy albo None"""
+        digest = key_digest(key)
+        with self._lock:
+            try:
+                generation = self._find(digest)
+                if generation is None:
+                    self.refresh()
+                    generation = self._find(digest)
+                found = generation.read(digest) if generation is not None else None
+            except (OSError, ValueError):
+                self.errors += 1
+                found = None
+            if not found:
+                self.corrupt += found is False
+                self.misses += 1
+                return None
+            self.hits += 1
+            version, payload = found
+            if generation is not self._newest_first()[0]:
+                self._append(digest, version, payload)  # Przetrwa następną rotację
+        return version, unpack_modules(payload, version)
+
+    def put(self, key, version, modules):
+        with self._lock:
+            self._append(key_digest(key), version, pack_modules(modules))
+
+    def _append(self, digest, version, payload):
+        record = HEADER.pack(digest, version, record_crc(digest, version, payload)) + payload
+        try:
+            with self._file_lock():
+                self.refresh()
+                current = self._newest_first()[0] if self._generations else None
+                if (current is None or not current.valid or current.end != current.size
+                        or current.end > len(MAGIC) and current.size + len(record) > self.max_bytes // 2):
+                    # Nowy plik także wtedy, gdy bieżący ma uszkodzony koniec - nie piszemy za nim
+                    current = self._rotate(current)
+                with open(current.path, 'ab') as f:
+                    f.write(record)
+                current.update()
+        except OSError:
+            self.errors += 1
+
+    def _rotate(self, current):
+        number = current.number + 1 if current else 1
+        with open(self._path(number), 'wb') as f:
+            f.write(MAGIC)
+        # Zostaje poprzednia generacja (o ile jest poprawna), starsze usuwamy
+        for generation in list(self._generations.values()):
+            if generation is not current or not current.valid:
+                self._remove(generation)
+        generation = self._generations[number] = Generation(number, self._path(number))
+        generation.update()
+        return generation
+
+    def _remove(self, generation):
+        self._generations.pop(generation.number).close()
+        try:
+            os.remove(generation.path)
+        except OSError:
+            pass  # Windows nie usunie pliku zmapowanego przez inny proces - usuniemy przy następnej rotacji
+
+    @contextmanager
+    def _file_lock(self):
+        with open(os.path.join(self.directory, LOCK_NAME), 'a+b') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def verify(self):
+        """Sprawdza CRC wszystkich rekordów; zwraca (poprawne, uszkodzone)"""
+        good = bad = 0
+        with self._lock:
+            self.refresh()
+            for generation in self._generations.values():
+                bad += not generation.valid
+                for digest in list(generation.index):
+                    if generation.read(digest):
+                        good += 1
+                    else:
+                        bad += 1
+        return good, bad
+
+    def clear(self):
+        with self._lock, self._file_lock():
+            self.refresh()
+            for generation in list(self._generations.values()):
+                self._remove(generation)
+
+    def close(self):
+        with self._lock:
+            for generation in self._generations.values():
+                generation.close()
+            self._generations.clear()
+
+    def __len__(self):
+        return len(set().union(*(generation.index for generation in self._generations.values())))
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "corrupt": self.corrupt, "errors": self.errors,
+                    "records": len(self), "generations": len(self._generations),
+                    "bytes": sum(generation.size for generation in self._generations.values()),
+                    "max_bytes": self.max_bytes}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Magazyn zakodowanych macierzy QR na dysku")
+    parser.add_argument("directory", help="katalog magazynu")
+    parser.add_argument("--verify", action="store_true", help="sprawdź sumy kontrolne wszystkich rekordów")
+    parser.add_argument("--clear", action="store_true", help="usuń wszystkie rekordy")
+    args = parser.parse_args(argv)
+
+    store = MatrixStore(args.directory)
+    if args.clear:
+        store.clear()
+    stats = store.stats()
+    print(f"Rekordy: {stats['records']}, pliki: {stats['generations']}, "
+          f"rozmiar: {stats['bytes'] / 1024 / 1024:.1f} MB")
+    if args.verify:
+        good, bad = store.verify()
+        print(f"Poprawne: {good}, uszkodzone: {bad}")
+        return 1 if bad else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
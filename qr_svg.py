@@ -0,0 +1,74 @@
+"""Strumieniowy zapis SVG dla macierzy kodu QR.
+
+Współrzędne są w jednostkach modułów (viewBox), a rozmiar w pikselach
+ustawia atrybut width/height. Kwadraty łączone są w poziome odcinki
+jednej ścieżki <path>, a kropki i zaokrąglone moduły to jeden wzorzec
+w <defs> wstawiany przez <use>.
+"""
+import gzip
+import io
+from xml.sax.saxutils import quoteattr
+
+# Wzorce modułów dla stylów innych niż kwadratowe (w jednostkach modułu)
+GLYPHS = {
+    "Kropki": '<circle id="m" cx=".5" cy=".5" r=".5"/>',
+    "Zaokrąglone": '<rect id="m" width="1" height="1" rx=".25" ry=".25"/>'
+}
+
+
+def row_runs(row):
+    """Zwraca ciągłe odcinki ciemnych modułów w wierszu jako (początek, długość)"""
+    runs = []
+    start = None
+    for x, dark in enumerate(row):
+        if dark and start is None:
+            start = x
+        elif not dark and start is not None:
+            runs.append((start, x - start))
+            start = None
+    if start is not None:
+        runs.append((start, len(row) - start))
+    return runs
+
+
+def write_svg(matrix, out, fill_color, back_color, style, box_size):
+    """Zapisuje SVG do strumienia tekstowego, wiersz po wierszu"""
+    n = matrix.size
+    size = n * box_size
+    glyph = GLYPHS.get(style)
+    out.write(f'<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+              f'width="{size}" height="{size}" viewBox="0 0 {n} {n}">')
+    # Kolory w cudzysłowach z quoteattr - wartość z zewnątrz nie zamknie atrybutu
+    out.write(f'<rect width="100%" height="100%" fill={quoteattr(back_color)}/>')
+
+    if glyph:
+        out.write(f'<defs>{glyph}</defs><g fill={quoteattr(fill_color)}>')
+        for y, row in enumerate(matrix.modules):
+            out.write(''.join(f'<use xlink:href="#m" x="{x}" y="{y}"/>'
+                              for x, dark in enumerate(row) if dark))
+        out.write('</g>')
+    else:
+        out.write(f'<path fill={quoteattr(fill_color)} shape-rendering="crispEdges" d="')
+        for y, row in enumerate(matrix.modules):
+            out.write(''.join(f'M{x} {y}h{length}v1h-{length}z' for x, length in row_runs(row)))
+        out.write('"/>')
+
+    out.write('</svg>')
+
+
+def save_svg(matrix, path, fill_color, back_color, style, box_size, compress=None):
+    """Zapisuje SVG do pliku; dla .svgz (lub compress=True) kompresuje gzipem"""
+    if compress is None:
+        compress = path.lower().endswith(".svgz")
+    if compress:
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            write_svg(matrix, f, fill_color, back_color, style, box_size)
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            write_svg(matrix, f, fill_color, back_color, style, box_size)
+
+
+def svg_string(matrix, fill_color, back_color, style, box_size):
+    out = io.StringIO()
+    write_svg(matrix, out, fill_color, back_color, style, box_size)
+    return out.getvalue()
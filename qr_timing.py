@@ -0,0 +1,132 @@
+"""Pomiar czasu etapów generowania kodu QR.
+
+StageTimer zbiera czasy kolejnych etapów jednego renderowania (treść,
+kodowanie, rysowanie, logo, podgląd, SVG), TimingLog dopisuje je jako
+wiersze JSON do pliku, a Profiler zbiera profil cProfile z wielu wywołań.
+
+Okno aplikacji włącza zapis zmiennymi środowiskowymi:
+    QR_TIMINGS=czasy.jsonl    - czasy każdego renderowania
+    QR_PROFILE=profil.prof    - profil cProfile zapisywany przy zamknięciu
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+TIMINGS_ENV = "QR_TIMINGS"
+PROFILE_ENV = "QR_PROFILE"
+
+# Nazwy etapów wyświetlane na pasku stanu
+STAGE_LABELS = {
+    "payload": "treść",
+    "encode": "kodowanie",
+    "rasterize": "rysowanie",
+    "logo": "logo",
+    "verify": "weryfikacja",
+    "thumbnail": "skalowanie",
+    "preview": "podgląd",
+    "svg": "SVG",
+    "pdf": "PDF",
+    "save": "zapis"
+}
+
+
+class StageTimer:
+    """Czasy etapów jednego renderowania, w kolejności wykonania"""
+
+    def __init__(self, kind="render"):
+        self.kind = kind
+        self.created = time.time()
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        # Powtórzony etap sumuje się (np. kilka zapisów)
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    @property
+    def total(self):
+        return sum(self.stages.values())
+
+    def summary(self):
+        """Krótki opis do paska stanu, np. "kodowanie 2.1 ms · rysowanie 0.8 ms" """
+        parts = [f"{STAGE_LABELS.get(name, name)} {seconds * 1000:.1f} ms"
+                 for name, seconds in self.stages.items()]
+        parts.append(f"razem {self.total * 1000:.1f} ms")
+        return " · ".join(parts)
+
+    def record(self, **extra):
+        """Słownik do zapisu w JSON (czasy w milisekundach)"""
+        return {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.created)),
+            "kind": self.kind,
+            "stages_ms": {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()},
+            "total_ms": round(self.total * 1000, 3),
+            **extra
+        }
+
+
+class TimingLog:
+    """Dopisuje rekordy czasów do pliku JSON lines (bezpieczne dla wątków)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+
+
+class Profiler:
+    """Profil cProfile sumowany z wielu wywołań (także z różnych wątków,
+    ale jeden naraz), zapisywany do pliku .prof dla pstats/snakeviz"""
+
+    def __init__(self, path):
+        import cProfile
+        self.path = path
+        self.profile = cProfile.Profile()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def capture(self):
+        with self._lock:
+            self.profile.enable()
+            try:
+                yield
+            finally:
+                self.profile.disable()
+
+    def dump(self):
+        with self._lock:
+            self.profile.dump_stats(self.path)
+
+
+def log_from_env():
+    path = os.environ.get(TIMINGS_ENV)
+    return TimingLog(path) if path else None
+
+
+def profiler_from_env():
+    path = os.environ.get(PROFILE_ENV)
+    return Profiler(path) if path else None
+
+
+@contextmanager
+def maybe_capture(profiler):
+    """Profiluje blok tylko, gdy profiler jest włączony"""
+    if profiler is None:
+        yield
+    else:
+        with profiler.capture():
+            yield
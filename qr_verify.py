@@ -0,0 +1,495 @@
+"""Sprawdzanie, czy narysowany kod QR daje się odczytać.
+
+Wbudowany dekoder odczytuje obraz wygenerowany przez program: zna liczbę
+modułów i margines, więc zamiast szukać wzorców pozycyjnych próbkuje
+środek każdego modułu (kilka pikseli), progując jasność w połowie między
+jasnymi a ciemnymi próbkami. Dalej jak zwykły czytnik: informacja
+o formacie (najbliższe z 32 słów BCH), zdjęcie maski, odczyt słów
+kodowych zygzakiem, rozplecenie bloków, korekcja Reeda-Solomona
+(Berlekamp-Massey, Chien, Forney) i odczyt segmentów.
+
+Wynik mówi też, jaką część możliwości korekcji zużyły błędy (np. moduły
+przykryte logo) - kod, który ledwo się odczytuje, w druku i aparacie
+telefonu może już zawieść. Gdy zainstalowany jest OpenCV, obraz musi
+dodatkowo odczytać cv2.QRCodeDetector (prawdziwe wykrywanie kodu).
+
+find_logo_scale szuka binarnie największego logo, przy którym kod
+czyta się z zapasem korekcji.
+
+Przykład:
+    python qr_verify.py kod.png --data "https://example.com"
+"""
+import argparse
+import sys
+
+import qrcode
+from qrcode.base import rs_blocks
+from qrcode.constants import ERROR_CORRECT_H, ERROR_CORRECT_L, ERROR_CORRECT_M, ERROR_CORRECT_Q
+
+import qr_engine
+from qr_cache import LRUCache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+ERROR_CORRECTION_NAMES = {
+    ERROR_CORRECT_L: "L",
+    ERROR_CORRECT_M: "M",
+    ERROR_CORRECT_Q: "Q",
+    ERROR_CORRECT_H: "H"
+}
+ALPHANUMERIC = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ $%*+-./:"
+MIN_CONTRAST = 64  # Minimalna różnica jasności modułów ciemnych i jasnych (0-255)
+MAX_FORMAT_ERRORS = 3  # Słowa formatu różnią się co najmniej o 7 bitów
+ERROR_BUDGET = 1.0  # Sama weryfikacja - wystarczy, że kod się odczytuje
+LOGO_ERROR_BUDGET = 0.6  # Logo nie może zużyć więcej niż tyle korekcji
+MAX_LOGO_SCALE = 0.4
+MIN_LOGO_SCALE = 0.05
+LOGO_SEARCH_STEPS = 6
+
+
+class ScanError(ValueError):
+    """Kod nie daje się odczytać albo odczytana treść jest inna"""
+
+
+class DecodeResult:
+    """Odczytana treść i zużycie korekcji (najgorszy blok).
+
+    sequence - (numer od 0, liczba kodów, parzystość) z nagłówka łączenia
+    kodów albo None dla pojedynczego kodu.
+    """
+
+    def __init__(self, text, version, error_correction, mask, errors, capacity, usage, sequence=None):
+        self.text = text
+        self.version = version
+        self.error_correction = error_correction
+        self.mask = mask
+        self.errors = errors
+        self.capacity = capacity
+        self.usage = usage
+        self.sequence = sequence
+
+    def describe(self):
+        text = (f"wersja {self.version}-{self.error_correction}, maska {self.mask}, "
+                f"poprawione błędy {self.errors}, zużycie korekcji {self.usage:.0%}")
+        if self.sequence:
+            text += f", kod {self.sequence[0] + 1}/{self.sequence[1]} (parzystość {self.sequence[2]:#04x})"
+        return text
+
+
+# Arytmetyka w GF(256) z wielomianem x^8 + x^4 + x^3 + x^2 + 1 (jak w QR)
+EXP = [0] * 512
+LOG = [0] * 256
+_value = 1
+for _i in range(255):
+    EXP[_i] = _value
+    LOG[_value] = _i
+    _value <<= 1
+    if _value & 0x100:
+        _value ^= 0x11D
+for _i in range(255, 512):
+    EXP[_i] = EXP[_i - 255]
+
+
+def gf_mul(a, b):
+    return 0 if a == 0 or b == 0 else EXP[LOG[a] + LOG[b]]
+
+
+def gf_div(a, b):
+    return 0 if a == 0 else EXP[(LOG[a] + 255 - LOG[b]) % 255]
+
+
+def gf_inverse(a):
+    return EXP[255 - LOG[a]]
+
+
+def poly_value(coefficients, x):
+    """Wartość wielomianu o współczynnikach od najniższej potęgi"""
+    value = 0
+    for coefficient in reversed(coefficients):
+        value = gf_mul(value, x) ^ coefficient
+    return value
+
+
+def rs_correct(block, ec_count):
+    """Poprawia blok (dane + korekcja) w miejscu; zwraca liczbę błędów.
+
+    Słowo kodowe to wielomian o pierwszym bajcie przy najwyższej potędze,
+    pierwiastki generatora to α^0..α^(ec_count-1).
+    """
+    n = len(block)
+    syndromes = []
+    for j in range(ec_count):
+        value = 0
+        for byte in block:
+            value = gf_mul(value, EXP[j]) ^ byte
+        syndromes.append(value)
+    if not any(syndromes):
+        return 0
+
+    # Berlekamp-Massey - wielomian lokalizatora błędów
+    locator, previous = [1], [1]
+    length, shift, last = 0, 1, 1
+    for step in range(ec_count):
+        delta = syndromes[step]
+        for i in range(1, length + 1):
+            delta ^= gf_mul(locator[i], syndromes[step - i])
+        if delta == 0:
+            shift += 1
+            continue
+        factor = gf_div(delta, last)
+        updated = locator + [0] * max(0, len(previous) + shift - len(locator))
+        for i, coefficient in enumerate(previous):
+            updated[i + shift] ^= gf_mul(factor, coefficient)
+        if 2 * length <= step:
+            previous, last, length, shift = locator, delta, step + 1 - length, 1
+        else:
+            shift += 1
+        locator = updated
+    if 2 * length > ec_count:
+        raise ScanError("Za dużo błędów do poprawienia")
+
+    # Chien - pozycje błędów; Forney - ich wartości
+    positions = [i for i in range(n) if poly_value(locator, EXP[(255 - (n - 1 - i)) % 255]) == 0]
+    if len(positions) != length:
+        raise ScanError("Za dużo błędów do poprawienia")
+    evaluator = [0] * ec_count
+    for i, syndrome in enumerate(syndromes):
+        for j, coefficient in enumerate(locator[:ec_count - i]):
+            evaluator[i + j] ^= gf_mul(syndrome, coefficient)
+    derivative = [locator[i] if i % 2 else 0 for i in range(1, len(locator))]
+    for i in positions:
+        x = EXP[n - 1 - i]
+        x_inverse = gf_inverse(x)
+        denominator = poly_value(derivative, x_inverse)
+        if denominator == 0:
+            raise ScanError("Za dużo błędów do poprawienia")
+        block[i] ^= gf_mul(x, gf_div(poly_value(evaluator, x_inverse), denominator))
+    return length
+
+
+def _data_region(version):
+    # Te same wzorce stałe co QRCode.makeImpl - moduły None należą do danych
+    qr = qrcode.QRCode(version=version)
+    n = qr.modules_count = version * 4 + 17
+    qr.modules = [[None] * n for _ in range(n)]
+    qr.setup_position_probe_pattern(0, 0)
+    qr.setup_position_probe_pattern(n - 7, 0)
+    qr.setup_position_probe_pattern(0, n - 7)
+    qr.setup_position_adjust_pattern()
+    qr.setup_timing_pattern()
+    qr.setup_type_info(True, 0)
+    if version >= 7:
+        qr.setup_type_number(True)
+    return [[module is None for module in row] for row in qr.modules]
+
+
+def _format_patterns(n):
+    # Moduły informacji o formacie dla każdego poziomu korekcji i maski, osobno obie kopie
+    qr = qrcode.QRCode()
+    qr.modules_count = n
+    patterns = []
+    for error_correction in ERROR_CORRECTION_NAMES:
+        for mask in range(8):
+            qr.error_correction = error_correction
+            qr.modules = [[None] * n for _ in range(n)]
+            qr.setup_type_info(False, mask)
+            cells = [(r, c, value) for r, row in enumerate(qr.modules) for c, value in enumerate(row)
+                     if value is not None]
+            vertical = [cell for cell in cells if cell[1] == 8]
+            horizontal = [cell for cell in cells if cell[1] != 8]
+            patterns.append((error_correction, mask, vertical, horizontal))
+    return patterns
+
+
+REGIONS = LRUCache(maxsize=40)
+
+
+def data_region(version):
+    return REGIONS.get_or_create(("data", version), lambda: _data_region(version))
+
+
+def format_patterns(n):
+    return REGIONS.get_or_create(("format", n), lambda: _format_patterns(n))
+
+
+def sample_modules(img, n, border=qr_engine.DEFAULT_BORDER):
+    """Macierz n x n odczytana ze środków modułów obrazu (True - ciemny)"""
+    gray = img.convert("L")
+    count = n + 2 * border
+    box_x = gray.size[0] / count
+    box_y = gray.size[1] / count
+    if np is not None:
+        pixels = np.asarray(gray, dtype=np.float32)
+        xs = ((np.arange(n) + border + 0.5) * box_x).astype(np.intp)
+        ys = ((np.arange(n) + border + 0.5) * box_y).astype(np.intp)
+        # Średnia z okna w środku modułu (do 1/3 boku) - jak czytnik, nie jeden piksel
+        half = int(min(box_x, box_y) / 6)
+        offsets = range(-half, half + 1)
+        values = sum(pixels[np.ix_(ys + dy, xs + dx)] for dy in offsets for dx in offsets) / len(offsets) ** 2
+        low, high = np.percentile(values, (5, 95))
+        if high - low < MIN_CONTRAST:
+            raise ScanError("Za mały kontrast między modułami a tłem")
+        return (values < (low + high) / 2).tolist()
+    values = [[gray.getpixel((int((c + border + 0.5) * box_x), int((r + border + 0.5) * box_y)))
+               for c in range(n)] for r in range(n)]
+    ordered = sorted(value for row in values for value in row)
+    low, high = ordered[len(ordered) // 20], ordered[-len(ordered) // 20 - 1]
+    if high - low < MIN_CONTRAST:
+        raise ScanError("Za mały kontrast między modułami a tłem")
+    return [[value < (low + high) / 2 for value in row] for row in values]
+
+
+def read_format(modules):
+    """(poziom korekcji, maska) z kopii informacji o formacie bliższej słowu BCH"""
+    best = None
+    for error_correction, mask, vertical, horizontal in format_patterns(len(modules)):
+        distance = min(sum(modules[r][c] != value for r, c, value in copy) for copy in (vertical, horizontal))
+        if best is None or distance < best[0]:
+            best = (distance, error_correction, mask)
+    if best[0] > MAX_FORMAT_ERRORS:
+        raise ScanError("Nie można odczytać informacji o formacie")
+    return best[1], best[2]
+
+
+def read_codewords(modules, version, mask):
+    """Bajty z modułów danych w kolejności QRCode.map_data, po zdjęciu maski"""
+    n = len(modules)
+    region = data_region(version)
+    mask_func = qrcode.util.mask_func(mask)
+    codewords = []
+    byte = bits = 0
+    row, step = n - 1, -1
+    for col in range(n - 1, 0, -2):
+        if col <= 6:
+            col -= 1
+        while 0 <= row < n:
+            for c in (col, col - 1):
+                if region[row][c]:
+                    byte = byte << 1 | (modules[row][c] != mask_func(row, c))
+                    bits += 1
+                    if bits == 8:
+                        codewords.append(byte)
+                        byte = bits = 0
+            row += step
+        row -= step
+        step = -step
+    return codewords
+
+
+def correct_blocks(codewords, version, error_correction):
+    """Rozplata bloki, poprawia je i zwraca (dane, najwięcej błędów, korekcja, zużycie)"""
+    blocks = rs_blocks(version, error_correction)
+    data = [[] for _ in blocks]
+    correction = [[] for _ in blocks]
+    position = 0
+    for i in range(max(block.data_count for block in blocks)):
+        for b, block in enumerate(blocks):
+            if i < block.data_count:
+                data[b].append(codewords[position])
+                position += 1
+    for i in range(max(block.total_count - block.data_count for block in blocks)):
+        for b, block in enumerate(blocks):
+            if i < block.total_count - block.data_count:
+                correction[b].append(codewords[position])
+                position += 1
+
+    result = []
+    worst_errors, worst_capacity, usage = 0, 0, 0.0
+    for block_data, block_correction in zip(data, correction):
+        block = block_data + block_correction
+        errors = rs_correct(block, len(block_correction))
+        capacity = len(block_correction) // 2
+        if errors / capacity >= usage:
+            worst_errors, worst_capacity, usage = errors, capacity, errors / capacity
+        result.extend(block[:len(block_data)])
+    return result, worst_errors, worst_capacity, usage
+
+
+def count_bits(version):
+    """Długości pól liczby znaków: cyfry, alfanum., bajty, kanji"""
+    if version < 10:
+        return 10, 9, 8, 8
+    if version < 27:
+        return 12, 11, 16, 10
+    return 14, 13, 16, 12
+
+
+def parse_segments(data, version):
+    """Treść z ciągu bitów danych (segmenty cyfr, alfanum., bajtów i kanji).
+
+    Zwraca (treść, nagłówek łączenia kodów albo None).
+    """
+    bits = "".join(f"{byte:08b}" for byte in data)
+    position = 0
+
+    def read(count):
+        nonlocal position
+        if position + count > len(bits):
+            raise ScanError("Urwany segment danych")
+        value = int(bits[position:position + count], 2)
+        position += count
+        return value
+
+    def read_below(count, limit):
+        # Przekłamane bity (np. logo zasłania za dużo) dają wartości spoza zakresu trybu
+        value = read(count)
+        if value >= limit:
+            raise ScanError("Nieprawidłowa wartość w segmencie danych")
+        return value
+
+    numeric_bits, alphanumeric_bits, byte_bits, kanji_bits = count_bits(version)
+    text = []
+    sequence = None
+    pending = bytearray()  # Kolejne segmenty bajtowe składamy przed dekodowaniem UTF-8
+    while position + 4 <= len(bits):
+        mode = read(4)
+        if mode != 4 and pending:
+            text.append(pending.decode("utf-8", errors="replace"))
+            pending.clear()
+        if mode == 0:
+            break
+        if mode == 1:
+            count = read(numeric_bits)
+            for _ in range(count // 3):
+                text.append(f"{read_below(10, 1000):03d}")
+            if count % 3:
+                text.append(f"{read_below(4 if count % 3 == 1 else 7, 10 ** (count % 3)):0{count % 3}d}")
+        elif mode == 2:
+            count = read(alphanumeric_bits)
+            for _ in range(count // 2):
+                value = read_below(11, 45 * 45)
+                text.append(ALPHANUMERIC[value // 45] + ALPHANUMERIC[value % 45])
+            if count % 2:
+                text.append(ALPHANUMERIC[read_below(6, 45)])
+        elif mode == 4:
+            count = read(byte_bits)
+            pending.extend(read(8) for _ in range(count))
+        elif mode == 8:
+            count = read(kanji_bits)
+            for _ in range(count):
+                value = read(13)  # Każda 13-bitowa wartość daje dwa bajty - błędne znaki zamienia decode
+                code = (value // 0xC0) << 8 | value % 0xC0
+                code += 0x8140 if code + 0x8140 <= 0x9FFC else 0xC140
+                text.append(code.to_bytes(2, "big").decode("shift_jis", errors="replace"))
+        elif mode == 7:  # ECI - pomijamy numer, bajty i tak czytamy jako UTF-8
+            first = read(8)
+            if first & 0x80:
+                read(8 if first & 0x40 == 0 else 16)
+        elif mode == 3:  # Nagłówek łączenia kodów (structured append)
+            index, last, parity = read(4), read(4), read(8)
+            sequence = (index, last + 1, parity)
+        else:
+            raise ScanError(f"Nieobsługiwany tryb segmentu: {mode}")
+    if pending:
+        text.append(pending.decode("utf-8", errors="replace"))
+    return "".join(text), sequence
+
+
+def decode_modules(modules):
+    """Treść z odczytanej macierzy modułów"""
+    n = len(modules)
+    version = (n - 17) // 4
+    if not 1 <= version <= 40 or version * 4 + 17 != n:
+        raise ScanError(f"Nieprawidłowy rozmiar macierzy: {n}")
+    error_correction, mask = read_format(modules)
+    codewords = read_codewords(modules, version, mask)
+    data, errors, capacity, usage = correct_blocks(codewords, version, error_correction)
+    text, sequence = parse_segments(data, version)
+    return DecodeResult(text, version, ERROR_CORRECTION_NAMES[error_correction], mask, errors, capacity, usage,
+                        sequence)
+
+
+def decode_image(img, size, border=qr_engine.DEFAULT_BORDER):
+    """Odczytuje obraz kodu o size modułach (bez marginesu) wbudowanym dekoderem"""
+    return decode_modules(sample_modules(img, size, border))
+
+
+def decode_opencv(img):
+    """Treść odczytana przez cv2.QRCodeDetector albo None"""
+    pixels = np.asarray(img.convert("RGB"))[:, :, ::-1]
+    text, points, _ = cv2.QRCodeDetector().detectAndDecode(np.ascontiguousarray(pixels))
+    return text if points is not None and text else None
+
+
+def verify_image(img, data, size, border=qr_engine.DEFAULT_BORDER, budget=ERROR_BUDGET):
+    """Sprawdza, że obraz daje się odczytać jako data; zwraca DecodeResult albo rzuca ScanError"""
+    result = decode_image(img, size, border)
+    if result.text != data:
+        raise ScanError("Odczytana treść różni się od zakodowanej")
+    if result.usage > budget:
+        raise ScanError(f"Kod odczytany na granicy możliwości korekcji ({result.usage:.0%})")
+    if cv2 is not None and np is not None and decode_opencv(img) != data:
+        raise ScanError("OpenCV nie odczytał kodu")
+    return result
+
+
+def find_logo_scale(img, data, size, logo_path, border=qr_engine.DEFAULT_BORDER, budget=LOGO_ERROR_BUDGET,
+                    max_scale=MAX_LOGO_SCALE, steps=LOGO_SEARCH_STEPS):
+    """Największy rozmiar logo (ułamek boku obrazu), przy którym kod czyta się z zapasem.
+
+    img to kod bez logo. Zwraca 0, gdy nawet najmniejsze logo psuje odczyt.
+    """
+    def readable(scale):
+        trial = img.copy()
+        qr_engine.paste_logo(trial, logo_path, scale)
+        try:
+            verify_image(trial, data, size, border, budget)
+            return True
+        except ScanError:
+            return False
+
+    if readable(max_scale):
+        return max_scale
+    low, high = 0.0, max_scale
+    for _ in range(steps):
+        middle = (low + high) / 2
+        if readable(middle):
+            low = middle
+        else:
+            high = middle
+    return round(low, 3) if low >= MIN_LOGO_SCALE else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Odczyt i weryfikacja obrazu kodu QR wygenerowanego programem")
+    parser.add_argument("image", help="plik PNG/JPEG z kodem")
+    parser.add_argument("--data", default=None, help="oczekiwana treść (bez niej tylko odczyt)")
+    parser.add_argument("--border", type=int, default=qr_engine.DEFAULT_BORDER, help="margines w modułach")
+    parser.add_argument("--budget", type=float, default=ERROR_BUDGET,
+                        help="dopuszczalne zużycie korekcji (0-1)")
+    args = parser.parse_args(argv)
+
+    from PIL import Image
+    img = Image.open(args.image)
+    # Liczba modułów: taka wersja, przy której moduł ma całkowitą liczbę pikseli
+    sizes = [version * 4 + 17 for version in range(1, 41)
+             if img.size[0] % (version * 4 + 17 + 2 * args.border) == 0]
+    for size in sizes:
+        try:
+            result = decode_image(img, size, args.border)
+        except ScanError:
+            continue
+        print(f"Treść: {result.text}")
+        print(f"Odczyt: {result.describe()}")
+        if args.data is not None:
+            try:
+                verify_image(img, args.data, size, args.border, args.budget)
+            except ScanError as e:
+                print(f"Weryfikacja nieudana: {e}")
+                return 1
+            print("Weryfikacja: OK")
+        return 0
+    print("Nie udało się odczytać kodu", file=sys.stderr)
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
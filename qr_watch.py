@@ -0,0 +1,287 @@
+"""Katalog obserwowany: pliki zadań CSV/JSONL renderowane po wrzuceniu.
+
+Każdy plik zadań (jak w qr_batch) z katalogu wejściowego trafia do
+własnego podkatalogu wyników (nazwa pliku bez rozszerzenia). Obok
+wyników leży rejestr .qr_ledger.json: nazwa pliku wynikowego -> skrót
+BLAKE2b treści kodu i opcji, które wpływają na wygląd (z domyślnymi
+z wiersza poleceń i rozmiarem/czasem zmiany plików logo i wypełnienia). Po ponownym
+wrzuceniu lub edycji pliku renderowane są tylko zadania, których skrót
+się zmienił albo których pliku brakuje; pliki zadań usuniętych z listy
+są kasowane. Niezmieniony plik ze 100 tys. zadań to tylko odczyt
+i liczenie skrótów - bez uruchamiania puli procesów.
+
+Pliki wynikowe i rejestr zapisujemy przez plik tymczasowy i zamianę,
+więc odbiorca nie zobaczy połowy pliku, a przerwany przebieg nie psuje
+rejestru (jest zapisywany co LEDGER_SAVE_EVERY zadań). Zadania z błędem
+nie trafiają do rejestru - zostaną spróbowane ponownie.
+
+Katalog jest odpytywany co --interval sekund (działa wszędzie, także na
+dyskach sieciowych); plik jest brany, gdy jego rozmiar i czas zmiany
+nie zmieniły się między dwoma odpytaniami - nadawca zdążył go dopisać.
+Pliki ukryte oraz .tmp i .part są pomijane. Plik, którego nie da się
+przeczytać (np. uszkodzony wiersz JSONL), jest zgłaszany i pomijany do
+następnej zmiany - jego rejestr zostaje nietknięty, a obserwowanie trwa.
+
+Przykład:
+    python qr_watch.py skrzynka -o wyniki -j 8 --verify 0.05
+    python qr_watch.py skrzynka -o wyniki --once
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from contextlib import closing
+
+import qr_batch
+
+JOB_EXTENSIONS = (".csv", ".jsonl", ".ndjson")
+IGNORED_SUFFIXES = (".tmp", ".part")
+LEDGER_NAME = ".qr_ledger.json"
+LEDGER_VERSION = 1
+LEDGER_SAVE_EVERY = 1000
+DEFAULT_INTERVAL = 2.0
+# Opcje zmieniające plik wynikowy - weryfikacja i liczba procesów nie wpływają na wynik
+OUTPUT_OPTIONS = qr_batch.RENDER_OPTIONS + qr_batch.ENCODE_OPTIONS + (
+    "format", "logo", "logo_scale", "png_mode", "optimize", "compress_level")
+# Opcje wskazujące pliki - podmiana pliku też wymusza ponowne renderowanie
+FILE_OPTIONS = ("logo", "fill_image")
+# Błędy odczytu pliku zadań - plik jest pomijany, obserwowanie trwa dalej
+FILE_ERRORS = (ValueError, KeyError, OSError, csv.Error)
+
+
+def entry_hash(payload, job, defaults, file_stats):
+    """Skrót zadania: treść kodu, opcje wyniku i stan plików (logo, obraz wypełnienia)"""
+    options = {key: job.get(key, defaults.get(key)) for key in OUTPUT_OPTIONS}
+    key = [payload, options, file_stats]
+    text = json.dumps(key, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def read_ledger(path):
+    """Rejestr {nazwa pliku: skrót}; uszkodzony lub z innej wersji - pusty"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            ledger = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(ledger, dict) or ledger.get("version") != LEDGER_VERSION:
+        return {}
+    return ledger.get("entries", {})
+
+
+def write_ledger(path, entries):
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump({"version": LEDGER_VERSION, "entries": entries}, f, ensure_ascii=False,
+                  separators=(",", ":"))
+    os.replace(temporary, path)
+
+
+def existing_outputs(output_dir):
+    """Względne ścieżki plików w katalogu wyników (bez rejestru i plików tymczasowych)"""
+    found = set()
+    for root, _, files in os.walk(output_dir):
+        for name in files:
+            if name != LEDGER_NAME and not name.endswith(IGNORED_SUFFIXES):
+                found.add(os.path.relpath(os.path.join(root, name), output_dir))
+    return found
+
+
+class Ledger:
+    """Rejestr jednego katalogu wyników: co już wyrenderowano i z jakim skrótem"""
+
+    def __init__(self, output_dir):
+        self.path = os.path.join(output_dir, LEDGER_NAME)
+        self.previous = read_ledger(self.path)
+        self.entries = {}
+        self.changes = 0
+
+    def confirm(self, name, digest):
+        self.entries[name] = digest
+        self.changes += 1
+        if self.changes % LEDGER_SAVE_EVERY == 0:
+            self.save()
+
+    def save(self):
+        write_ledger(self.path, self.entries)
+
+
+class FileReport:
+    """Liczniki przebiegu jednego pliku zadań"""
+
+    def __init__(self, name):
+        self.name = name
+        self.rendered = self.unchanged = self.removed = self.failed = 0
+        self.stopped = None
+        self.error = None  # Pliku nie dało się przeczytać
+        self.started = time.perf_counter()
+
+    def describe(self):
+        if self.error is not None:
+            return f"{self.name}: pominięto - {self.error}"
+        text = (f"{self.name}: wygenerowano {self.rendered}, bez zmian {self.unchanged}, "
+                f"usunięto {self.removed}, błędy {self.failed} ({time.perf_counter() - self.started:.1f} s)")
+        if self.stopped is not None:
+            text += f" - przerwano po nieczytelnym kodzie w zadaniu {self.stopped}"
+        return text
+
+
+def plan_jobs(jobs_path, output_dir, defaults, ledger, report):
+    """Dzieli zadania na niezmienione (od razu do rejestru) i do renderowania.
+
+    Zwraca listę (indeks, zadanie, nazwa wyniku, skrót) zadań do renderowania.
+    """
+    existing = existing_outputs(output_dir)
+    stats = {}
+    names = set()
+    changed = []
+    for index, job in enumerate(qr_batch.read_jobs(jobs_path)):
+        try:
+            name = os.path.normpath(qr_batch.output_name(index, job, defaults))
+            if name in names:
+                raise ValueError(f"Powtórzona nazwa pliku: {name}")
+            names.add(name)
+            payload = qr_batch.job_payload(job)
+            paths = [job.get(key, defaults.get(key)) for key in FILE_OPTIONS]
+            for path in paths:
+                if path and path not in stats:
+                    try:
+                        stat = os.stat(path)
+                        stats[path] = (stat.st_size, stat.st_mtime_ns)
+                    except OSError:
+                        stats[path] = None
+            digest = entry_hash(payload, job, defaults, [stats.get(path) for path in paths])
+        except Exception as e:
+            report.failed += 1
+            print(f"{report.name}, zadanie {index}: błąd - {e}", file=sys.stderr)
+            continue
+        if ledger.previous.get(name) == digest and name in existing:
+            ledger.entries[name] = digest
+            report.unchanged += 1
+        else:
+            changed.append((index, job, name, digest))
+    return changed
+
+
+def remove_stale(output_dir, ledger, names):
+    """Kasuje wyniki zadań, których nie ma już w pliku zadań; zwraca ich liczbę"""
+    removed = 0
+    for name in set(ledger.previous) - names:
+        try:
+            # Rejestr leży w katalogu wyników - nazwy sprawdzamy jak nazwy z pliku zadań
+            os.remove(qr_batch.output_path(output_dir, qr_batch.output_name(0, {"output": name}, {})))
+            removed += 1
+        except FileNotFoundError:
+            pass
+        except ValueError as e:
+            print(f"Pominięto w rejestrze: {e}", file=sys.stderr)
+    return removed
+
+
+def process_file(jobs_path, output_root, defaults, workers=None):
+    """Renderuje zmienione zadania jednego pliku; zwraca FileReport"""
+    report = FileReport(os.path.basename(jobs_path))
+    output_dir = os.path.join(output_root, os.path.splitext(report.name)[0])
+    os.makedirs(output_dir, exist_ok=True)
+    ledger = Ledger(output_dir)
+    changed = plan_jobs(jobs_path, output_dir, defaults, ledger, report)
+    # Stare wyniki kasujemy przed renderowaniem - przerwany przebieg nie zostawi sierot
+    report.removed = remove_stale(output_dir, ledger, set(ledger.entries) | {name for _, _, name, _ in changed})
+    ledger.save()
+
+    digests = {index: digest for index, _, _, digest in changed}
+    tasks = ((index, job, defaults, output_dir) for index, job, _, _ in changed)
+    try:
+        if changed:
+            with closing(qr_batch.run_tasks(tasks, workers)) as results:
+                for index, path, error, _, timing, _ in results:
+                    if error:
+                        report.failed += 1
+                        print(f"{report.name}, zadanie {index}: błąd - {error}", file=sys.stderr)
+                        if timing["unreadable"]:
+                            report.stopped = index
+                            break
+                        continue
+                    report.rendered += 1
+                    ledger.confirm(os.path.relpath(path, output_dir), digests[index])
+    finally:
+        ledger.save()
+    return report
+
+
+def job_files(inbox):
+    """Pliki zadań w katalogu wejściowym: {ścieżka: (rozmiar, czas zmiany)}"""
+    found = {}
+    for entry in os.scandir(inbox):
+        if (entry.is_file() and not entry.name.startswith(".")
+                and entry.name.lower().endswith(JOB_EXTENSIONS)):
+            stat = entry.stat()
+            found[entry.path] = (stat.st_size, stat.st_mtime_ns)
+    return found
+
+
+class Watcher:
+    """Odpytuje katalog i przetwarza pliki, które przestały się zmieniać"""
+
+    def __init__(self, inbox, output_root, defaults, workers=None):
+        self.inbox = inbox
+        self.output_root = output_root
+        self.defaults = defaults
+        self.workers = workers
+        self.seen = {}  # Sygnatura z poprzedniego odpytania
+        self.done = {}  # Sygnatura ostatnio przetworzonej wersji pliku
+
+    def poll(self, settle=True):
+        """Jedno odpytanie; zwraca raporty przetworzonych plików"""
+        current = job_files(self.inbox)
+        reports = []
+        for path, signature in sorted(current.items()):
+            stable = not settle or self.seen.get(path) == signature
+            if stable and self.done.get(path) != signature:
+                try:
+                    report = process_file(path, self.output_root, self.defaults, self.workers)
+                except FILE_ERRORS as e:
+                    # Odczyt zadań poprzedza zapis rejestru - rejestr zostaje jak był
+                    report = FileReport(os.path.basename(path))
+                    report.error = str(e)
+                reports.append(report)
+                self.done[path] = signature
+        self.seen = current
+        return reports
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Renderowanie plików zadań wrzucanych do katalogu")
+    parser.add_argument("inbox", help="obserwowany katalog z plikami zadań (.csv, .jsonl)")
+    parser.add_argument("-o", "--output-dir", default="qr_output", help="katalog wyników (podkatalog na plik)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="liczba procesów roboczych")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="odstęp odpytywania (s)")
+    parser.add_argument("--once", action="store_true", help="przetwórz obecne pliki i zakończ")
+    qr_batch.add_render_arguments(parser)
+    args = parser.parse_args(argv)
+    defaults = qr_batch.render_defaults(parser, args)
+    if not os.path.isdir(args.inbox):
+        parser.error(f"Brak katalogu: {args.inbox}")
+
+    watcher = Watcher(args.inbox, args.output_dir, defaults, args.workers)
+    if args.once:
+        reports = watcher.poll(settle=False)
+        for report in reports:
+            print(report.describe(), file=sys.stderr if report.error else sys.stdout)
+        return 1 if any(report.failed or report.error for report in reports) else 0
+
+    print(f"Obserwuję {args.inbox} (co {args.interval:g} s), Ctrl+C kończy")
+    try:
+        while True:
+            for report in watcher.poll():
+                print(report.describe(), file=sys.stderr if report.error else sys.stdout, flush=True)
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())